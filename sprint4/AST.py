@@ -2,21 +2,22 @@ from __future__ import annotations
 from typing import Union, List, Literal
 from dataclasses import dataclass
 
+# Nodes are slotted to keep the trees small. Statements with a body are not
+# frozen, the parser attaches the body after the statement is created.
 class Node():
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PrimitiveType(Node):
     value: Literal['str', 'int', 'float', 'bool', 'none']
 
-    def __init__(self, value):
-        self.value = value
-        assert value in ['str', 'int', 'float', 'bool', 'none']
+    def __post_init__(self):
+        assert self.value in ['str', 'int', 'float', 'bool', 'none']
 
     def __str__(self):
         return self.value
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NonPrimitiveType(Node):
     name: Union['tuple', 'list']
     value: PrimitiveType
@@ -24,132 +25,132 @@ class NonPrimitiveType(Node):
     def __str__(self):
         return f'{self.name} of {str(self.value)}'
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Type(Node):
     value: Union[PrimitiveType, NonPrimitiveType]
 
     def __str__(self):
         return f"Type<{str(self.value)}>"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Expression(Node):
     value: Union[BinaryOperation, UnaryOperation, Id, PrimitiveLiteral, NonPrimitiveLiteral]
                # Commented out because python wants them to be defined first, which results in a circular dependency
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PrimitiveLiteral(Node):
     name: Literal['str', 'int', 'float', 'bool', 'none']
     value: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NonPrimitiveLiteral(Node):
     name: Literal['tuple', 'list']
     children: List[Union[any, None]]
 
-@dataclass(unsafe_hash=True)
+@dataclass(frozen=True, slots=True)
 class Id(Node):
     name: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BinaryOperation(Node): # Jat
     left: Expression
     operator: str
     right: Expression
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UnaryOperation(Node): # Jat
     operator: str
     right: Expression
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Assignment(Node): # Mostly done already
     left: Id
     type: Union[Type, None]
     right: Node
 
-@dataclass
+@dataclass(slots=True)
 class IfStmt(Node): # Jat
     ifCond: Expression
     body: Block
 
-@dataclass
+@dataclass(slots=True)
 class ElifStmt(Node): # Jat
     elifCond: Expression
     body: Block
 
-@dataclass
+@dataclass(slots=True)
 class ElseStmt(Node): # Jat
     body: Block
 
-@dataclass
+@dataclass(slots=True)
 class WhileStmt(Node): # Jat
     cond: Expression
     body: Block
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RangeValues(Node): # Yifei
     stop: Union[Expression, None]
     start: Union[Expression, None]
     step: Union[Expression, None]
 
-@dataclass
+@dataclass(slots=True)
 class ForLoopRange(Node): # Yifei
     var: Id
     rangeVal: RangeValues
     body: Block
 
-@dataclass
+@dataclass(slots=True)
 class ForLoopList(Node): # Yifei
     var: Id
     Lst: Expression
     body: Block
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Parameter(Node): # Jocob
     paramType: Type
     var: Id
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ParameterLst(Node): # Jocob
     lst: Union[List[Parameter], None]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ArgumentLst(Node): # Jocob
     lst: Union[List[Expression], None]
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDef(Node): # Jocob
     name: Id
     lst: ParameterLst
     body: Block
     returnType: Union[Type, None]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReturnStmt(Node): # Jocob
     stmt: Expression
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FunctionCall(Node):
     name: Id
     lst: ArgumentLst
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Block(Node):
     lst: List[Union[FunctionDef, ReturnStmt, FunctionCall, ForLoopRange, ForLoopList, WhileStmt, \
                     IfStmt, ElifStmt, ElseStmt, Assignment]]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LstAppend(Node):
     obj: Union[NonPrimitiveLiteral,Id]
     val: Expression
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NonPrimitiveIndex(Node):
     obj: Expression
     idx: Expression
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NonPrimitiveSlicing(Node):
     obj: Expression
     start: Union[Expression,None]
@@ -2,40 +2,48 @@ from __future__ import annotations
 from typing import Union, List, Literal
 from dataclasses import dataclass
 import json
+from visitor import Visitor
+from constant_folding import fold_binary, fold_unary, c_literal, is_constant
 
+# Static array of the string literals of a program. Programs can not declare
+# names that the generated code uses, see TypeChecker.check_name
+STR_POOL = '__str_pool'
+RESERVED_NAMES = frozenset({STR_POOL})
 
-@dataclass
+# Nodes are slotted to keep the trees small, and frozen except for the
+# list literals that C_AST_gen fills in after creating them.
+
+@dataclass(frozen=True, slots=True)
 class Type:
     value: Union[Literal['str_t', 'int_t', 'float_t', 'bool_t', 'none_t'],NonPrimitiveType]
 
-    def __init__(self, value):
-        if value.__class__.__name__ != 'NonPrimitiveType':
-            assert value in ['str_t', 'int_t', 'float_t', 'bool_t', 'none_t']
-        self.value = value
+    def __post_init__(self):
+        if self.value.__class__.__name__ != 'NonPrimitiveType':
+            assert self.value in ['str_t', 'int_t', 'float_t', 'bool_t', 'none_t']
 
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NonPrimitiveType:
     type: Union['list', 'tuple']
     value: Type
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Id:
     name: str
-    def __init__(self, name):
+    def __post_init__(self):
+        name = self.name
         assert isinstance(name, str), f"Got {name=}"
-        self.name = name
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Declaration:
     id: Id
     type: Type
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UnaryOperation:
     left: Id
     type: Type
@@ -43,7 +51,7 @@ class UnaryOperation:
     operand: Id
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BinaryOperation:
     left: Id
     type: Type
@@ -52,18 +60,18 @@ class BinaryOperation:
     operand_b: Id
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Parameter:
     paramType: Type
     var: Id
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ParameterLst:
     lst: List[Parameter]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FunctionDeclaration:
     name: Id
     lst: ParameterLst
@@ -71,44 +79,44 @@ class FunctionDeclaration:
     returnType: Union[Type, None]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class IfStmt:
     ifCond: Id
     body: Block
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ElifStmt:
     elifCond: Id
     body: Block
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ElseStmt:
     body: Block
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WhileStmt:
     cond: Id
     body: Block
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RangeValues:
     stop: Union[Expression, None]
     start: Union[Expression, None]
     step: Union[Expression, None]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ForLoopRange:
     var: Id
     rangeVal: RangeValues
     body: Block
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ForLoopList:
     var: Id
     indexVar : Id
@@ -117,65 +125,64 @@ class ForLoopList:
     body: Block
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Expression:
     value: Union[BinaryOperation, UnaryOperation, Id]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ArgumentLst:
     lst: Union[List[Expression], List[Id], None]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReturnStmt:
     stmt: Expression
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FunctionCall:
     name: Id
     lst: ArgumentLst
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Block:
     lst: List[Union[FunctionDeclaration, ReturnStmt, FunctionCall, ForLoopRange, ForLoopList, WhileStmt, \
                     IfStmt, ElifStmt, ElseStmt, BinaryOperation, UnaryOperation]]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Assignment:
     id: Id
     val: any
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class String:
     val: str
-    len: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReturnStatement:
     value: Id
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PrimitiveLiteral:
     id: Id
     type: Type
     value: any
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LstAdd:
     obj: Id
     value: any
     type: Type
     idx: Union[str, int]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NonPrimitiveIndex:
     result: Id
     obj: Id
@@ -183,13 +190,13 @@ class NonPrimitiveIndex:
     idx: Id
 
 
-@dataclass
+@dataclass(slots=True)
 class NonPrimitiveLiteral:
     head: Id
     type: NonPrimitiveType
     value: List[Union[Id, PrimitiveLiteral]]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NonPrimitiveSlicing:
     result_reg: Id
     obj: Id
@@ -197,7 +204,7 @@ class NonPrimitiveSlicing:
     end: Union[Id,None]
     type: NonPrimitiveType
 
-class CCodeGenerator:
+class CCodeGenerator(Visitor, prefix='gen_'):
     def __init__(self):
         self.function_declarations = []
         self.function_definitions = []
@@ -210,6 +217,9 @@ class CCodeGenerator:
         self.list_decl_dict = []
         self.list_len_dict = {}
         self.converted_str_lst = {}
+        self.string_pool = {}  # string literal to its offset in the pool
+        self.string_pool_size = 0
+        self.string_literals = {}  # C code of a literal in the pool to the literal
         self.propagation = {} # [variable_value, scope_counter, state] state being whether the variable should be propgated or not
         self.scope_counter = 0
 
@@ -218,15 +228,23 @@ class CCodeGenerator:
         self.eval_mode = True  # Optimization flag
         self.variants = []
         self.var_dict = {}
-        #self.var_dict = {'true':'true','false':'false','NONE_LITERAL':'NONE_LITERAL'}
+        # The operations left unfolded, from their C code to (type, operator, operands),
+        # so they can be folded once their operands are known
+        self.expressions = {}
+        self.slice_bounds = {}  # list_slice(...) code to its (start, end)
         self.has_if_head = False
         self.ignore_if = False
+        self.reserved_lists = set()  # lists already reserved by an enclosing loop
+        self.owned_vars = {}  # variables that own their value, to the C type of the variable
+        self.scope_exit_blocks = set()  # ids of the blocks that free their owned variables on exit
+        self.function_scope_depth = None
 
     def generate_code(self, root):
+        self.owned_vars = self.find_owned_vars(root)
         structure = self.gen(root)
         formatted = self.generate_code_formatter(structure)
         declarations_str, definitions_str = self.generate_function_code()
-        return self.code_template(declarations_str, definitions_str, formatted)
+        return self.code_template(declarations_str, definitions_str, formatted, self.string_pool_code())
 
     def generate_function_code(self):
         declarations_str = ";\n".join(self.function_declarations)
@@ -255,7 +273,15 @@ class CCodeGenerator:
                 result = result.replace(tmp, var)
         return result
 
-    def code_template(self, function_declarations, function_definitions, main_code):
+    def code_template(self, function_declarations, function_definitions, main_code, string_pool=""):
+        if string_pool:
+            string_pool = f"""
+/***** String literals *****/
+{string_pool}/***** End of string literals *****/
+            """.strip() + '\n'
+            pool_init = f"\n    str_pool_init({STR_POOL}, sizeof({STR_POOL}));"
+        else:
+            pool_init = ""
         if len(function_declarations) == 0:
             function_code = ""
         else:
@@ -270,10 +296,12 @@ class CCodeGenerator:
         """.strip() + '\n'
 
         return f"""
-#include "../starter.c"
+#include "starter.h"
 
-{function_code}
+{string_pool}{function_code}
 int main() {{
+    runtime_init();{pool_init}
+
 /***** Main *****/
 {main_code}
 /***** End of main *****/
@@ -286,12 +314,7 @@ int main() {{
         """.strip() + '\n'
 
     def gen(self, node):
-        method = 'gen_' + node.__class__.__name__
-        try:
-            return getattr(self, method)(node)
-        except AttributeError:
-            print(f"Trying to process node {node}")
-            raise
+        return self.methods[node.__class__](self, node)
 
     def gen_Block(self, node: Block):
         result = []
@@ -307,6 +330,8 @@ int main() {{
                             result.append(c+";")
                 else:
                     result.append(code)
+        if id(node) in self.scope_exit_blocks and not (node.lst and isinstance(node.lst[-1], ReturnStatement)):
+            result.extend(self.free_owned_vars(self.decl_scope[-1]))
         self.decl_scope.pop()
         self.scope_counter -= 1
         return result
@@ -330,6 +355,8 @@ int main() {{
             if name in scope:
                 return None
         self.decl_scope[-1].append(name)
+        if name in self.owned_vars:
+            return f"{type_t} {name} = NULL;"
         return f"{type_t} {name};"
 
     def gen_Type(self, node: Type):
@@ -349,13 +376,11 @@ int main() {{
                 if left[0] == "_":
                     if op[0] == "_":
                         op = self.look_up_temp(op)
-                    self.temp_dict[left] = f'({operator} {op})'
+                    self.temp_dict[left] = self.unfolded(f'({operator} {op})', node.type.value, operator, op)
                 else:
                     value = self._eval(node)
-                    if node.type.value == "int_t" and isinstance(value,float):
-                        value = int(value)
                     self.var_dict[left] = value
-                    return f"({left} = {value});"
+                    return f"({left} = {c_literal(value)});"
             elif left[0] != "_" and left not in self.variants:
                 self.variants.append(left)
         else:
@@ -374,35 +399,37 @@ int main() {{
                 if left[0] == "_":
                     op_a = self._eval(node.operand_a)
                     op_b = self._eval(node.operand_b)
-                    if node.type.value == 'int_t':
-                        if isinstance(op_a,float):
-                            op_a = int(op_a)
-                        if isinstance(op_b,float):
-                            op_b = int(op_b)
-                    if type(op_a) == type(op_b) == str and (('"' in op_a or 'input_str()' == op_a) and \
-                                                            ('"' in op_b or 'input_str()' == op_b)):
-                        self.temp_dict[left] = f'str_concat({op_a},{op_b})'
+                    if node.type.value == 'str_t' and operator == '+':
+                        if self.is_str_literal(op_a) and self.is_str_literal(op_b):
+                            # The concatenation of two literals is a literal too
+                            value = self.string_literals[op_a] + self.string_literals[op_b]
+                            self.temp_dict[left] = self.gen_String(String(val=value))
+                        else:
+                            self.temp_dict[left] = f'str_concat({op_a},{op_b})'
                         return
-                    if node.type.value == 'int_t' and isinstance(op_a,(int,float,bool)) and isinstance(op_b,(int,float,bool)):
-                        self.temp_dict[left] = int(eval(f'{op_a} {operator} {op_b}'))
-                    elif node.type.value == 'float_t' and isinstance(op_a,(int,float,bool)) and isinstance(op_b,(int,float,bool)):
-                        self.temp_dict[left] = float(eval(f'{op_a} {operator} {op_b}'))
-                    else:
-                        self.temp_dict[left] = f'({op_a} {operator} {op_b})'
+                    value = None
+                    # Comparisons are folded when they are used, the C code of
+                    # the temporary has to stay a C expression
+                    if node.type.value in ('int_t', 'float_t'):
+                        value = fold_binary(node.type.value, operator, op_a, op_b)
+                    if value is None:
+                        value = self.unfolded(f'({op_a} {operator} {op_b})', node.type.value, operator, op_a, op_b)
+                    self.temp_dict[left] = value
                 else:
                     value = self._eval(node)
-                    if node.type.value == 'int_t' and isinstance(value,float):
-                        value = int(value)
                     self.var_dict[left] = value
-                    return f"{left} = {value};"
+                    return self.gen_owned_assignment(left, f"{left} = {c_literal(value)};")
             elif left[0] != "_" and left not in self.variants:
                 self.variants.append(left)
         else:
-            value = f"({op_a} {operator} {op_b})"
+            if node.type.value == 'str_t' and operator == '+':
+                value = f"str_concat({op_a},{op_b})"
+            else:
+                value = f"({op_a} {operator} {op_b})"
             if left[0] == "_":
                 self.temp_dict[left] = value
             else:
-                return f"{left} = {value};"
+                return self.gen_owned_assignment(left, f"{left} = {value};")
 
     def gen_Parameter(self, node: Parameter):
         return f"{self.gen(node.paramType)} {self.gen(node.var)}"
@@ -415,11 +442,18 @@ int main() {{
         function_declaration = f"{self.gen(node.returnType)} {self.gen(node.name)}({self.gen(node.lst)})"
         self.function_declarations.append(function_declaration)
         self.state_in_function_declaration = True
+        main_owned_vars = self.owned_vars
+        self.owned_vars = self.find_owned_vars(node.body)
+        self.scope_exit_blocks.add(id(node.body))
+        self.function_scope_depth = len(self.decl_scope)
+        self.function_return_type = self.gen(node.returnType)
         self.function_definitions.append((
             function_declaration + " {",
             self.gen(node.body),
             "} " f"/* End of {self.gen(node.name)} */",
         ))
+        self.owned_vars = main_owned_vars
+        self.function_scope_depth = None
         self.state_in_function_declaration = False
         return None
 
@@ -570,7 +604,18 @@ int main() {{
             "}",
         )
     def gen_ForLoopRange(self, node: ForLoopRange):
-
+        # Lists appended to a known number of times get their capacity reserved before the loop
+        reserve = {} if self.pre_run else self.count_list_appends(node)
+        self.reserved_lists.update(reserve)
+        try:
+            loop = self.gen_range_loop(node)
+        finally:
+            self.reserved_lists.difference_update(reserve)
+        if loop is None or not reserve:
+            return loop
+        return tuple(f"list_reserve({name}, {count});" for name, count in reserve.items()) + loop
+
+    def gen_range_loop(self, node: ForLoopRange):
         stop_val = node.rangeVal.stop
         step_val = node.rangeVal.step
         if stop_val in self.temp_dict.keys():
@@ -584,6 +629,10 @@ int main() {{
             ranges = self._eval(node.rangeVal)
             if type(ranges[0]) == type(ranges[2]) == int and  ranges[0] >= ranges[2]:
                 return None
+            # The loop variable is only known before the first iteration
+            self.var_dict[node.var.name] = node.var.name
+            if node.var.name in self.propagation:
+                self.propagation[node.var.name][2] = False
             if not self.is_inloop:
                 self.is_inloop = True
                 self.pre_run = True
@@ -671,6 +720,9 @@ int main() {{
                 if temp_var:
                     self.temp_dict[assign_var] = assign_value
                     if isinstance(node.val, FunctionCall) and node.val.name[:6] == "print_":
+                        # Nothing else can see a string created just to be printed
+                        if node.val.name == "print_str" and self.is_fresh_str(assign_value[len("print_str("):-1]):
+                            return f"print_str_and_free{assign_value[len('print_str'):]};"
                         return f"{assign_value};"
                     return None
 
@@ -723,34 +775,58 @@ int main() {{
                         self.list_decl_dict.append(assign_var)
                         type_t = self.list_type_dict[assign_var]
                         if "list_slice" in assign_value:
-                            params = assign_value.split("(")[1].split(")")[0].split(",")
-                            self.list_len_dict[assign_var] = eval(f"{params[2]}-{params[1]}")
+                            start, end = self.slice_bounds[assign_value]
+                            length = fold_binary('int_t', '-', self.constant(end), self.constant(start))
+                            self.list_len_dict[assign_var] = f"({end} - {start})" if length is None else length
                         else:
                             self.list_len_dict[assign_var] = self.list_len_dict[assign_value]
+                        if assign_var in self.owned_vars:
+                            self.decl_scope[-1].append(assign_var)
+                            return f"{type_t} {assign_var} = {assign_value};"
                         return "".join([f"{type_t} {assign_var};", f"{assign_var} = {assign_value}"])
                 assign_value = self.get_prop_val(assign_value)
                 self.set_prop_val(assign_var, assign_value)
-                result = f"{assign_var} = {assign_value}"
-        if not temp_var and assign_var not in self.variants:
+                result = f"{assign_var} = {assign_value};"
+        if self.eval_mode and not temp_var and assign_var not in self.variants:
             if self.pre_run:
                 self.variants.append(assign_var)
             else:
                 if type(node.val) == str and node.val != '_':
                     value = self._eval(node)
                     self.var_dict[assign_var] = value
-                    result = f"{assign_var} = {value};"
+                    result = f"{assign_var} = {c_literal(value)};"
                 else:
                     self.var_dict[assign_var] = assign_value
-        return result
+        return self.gen_owned_assignment(assign_var, result)
 
     def gen_String(self, node: String):
+        # Every literal is stored once in the pool, see string_pool_code
+        offset = self.string_pool.get(node.val)
+        if offset is None:
+            offset = self.string_pool[node.val] = self.string_pool_size
+            # json.dumps escapes non ascii characters, which C stores as utf-8
+            self.string_pool_size += len(node.val.encode()) + 1
+        code = f"({STR_POOL} + {offset})"
+        self.string_literals[code] = node.val
+        return code
+
+    def is_str_literal(self, value):
+        return isinstance(value, str) and value.startswith(f"({STR_POOL} + ")
+
+    def string_pool_code(self):
+        if not self.string_pool:
+            return ""
         # Using json.dumps to do string escape
-        import json
-        return json.dumps(node.val)
+        lines = "\n".join(f'    {json.dumps(val)[:-1]}\\0"' for val in self.string_pool)
+        return f"static char {STR_POOL}[] =\n{lines};\n"
 
     def gen_ReturnStatement(self, node: ReturnStatement):
         assert self.state_in_function_declaration, "Cannot have return statement outside of a function declaration"
         value = self.get_val(self.gen(node.value))
+        free = self.free_owned_vars(name for scope in self.decl_scope[self.function_scope_depth:] for name in scope)
+        if free:
+            # The returned value may be computed from the variables being freed
+            return (f"{self.function_return_type} _return_value = {value};", *free, "return _return_value;")
         return f"return {value};"
 
     def gen_LstAdd(self, node: LstAdd):
@@ -798,6 +874,7 @@ int main() {{
         else:
             end = self.list_len_dict[obj]
         result = f"list_slice({obj},{start},{end})"
+        self.slice_bounds[result] = (start, end)
         self.temp_dict[result_reg] = result
         return None
 
@@ -814,6 +891,166 @@ int main() {{
         else:
             return 'list_v'
 
+    def count_list_appends(self, node: ForLoopRange):
+        """
+        Returns {list name: number of appends} for the lists that the loop
+        appends to a number of times known at compile time. Lists created or
+        reassigned inside the loop are left out.
+        """
+        counts, local = {}, set()
+        self.collect_list_appends(Block([node]), counts, local, {}, 1)
+        return {name: count for name, count in counts.items()
+                if count and name not in local and name not in self.reserved_lists}
+
+    def collect_list_appends(self, block: Block, counts, local, consts, times):
+        for x in block.lst:
+            if isinstance(x, Assignment):
+                local.add(x.id.name)
+                if x.id.name[0] == '_' and type(x.val) in (int, str):
+                    consts[x.id.name] = x.val
+            elif isinstance(x, Declaration):
+                local.add(x.id.name)
+            elif isinstance(x, NonPrimitiveLiteral):
+                local.add(x.head.name)
+            elif isinstance(x, LstAdd):
+                name = x.obj.name
+                if times is None or counts.get(name, 0) is None:
+                    counts[name] = None
+                else:
+                    counts[name] = counts.get(name, 0) + times
+            elif isinstance(x, ForLoopRange):
+                local.add(x.var.name)
+                trip = self.range_trip_count(x.rangeVal, consts)
+                self.collect_list_appends(x.body, counts, local, consts, None if trip is None or times is None else times * trip)
+            elif isinstance(x, (ForLoopList, WhileStmt, IfStmt, ElifStmt, ElseStmt)):
+                # Runs an unknown number of times
+                self.collect_list_appends(x.body, counts, local, consts, None)
+
+    def range_trip_count(self, range_val: RangeValues, consts):
+        values = []
+        for value in (range_val.start, range_val.stop, range_val.step):
+            # Follow the temporaries assigned in the loop or before it
+            while isinstance(value, str) and value[0] == '_':
+                if value in consts:
+                    value = consts[value]
+                elif value in self.temp_dict:
+                    value = self.temp_dict[value]
+                else:
+                    break
+            if type(value) != int:
+                return None
+            values.append(value)
+        start, stop, step = values
+        if step <= 0:
+            return None
+        return max(0, (stop - start + step - 1) // step)
+
+    def find_owned_vars(self, block: Block):
+        """
+        Returns {name: C type} of the string and list variables of a function
+        (or of the main code) that own their value: they are only assigned
+        newly created values (concatenations, slices and inputs) or string
+        literals, which are never freed, and their value never escapes into a
+        list, another variable, a return value or a call to a user function.
+        A value owned by a variable is freed when the variable is reassigned
+        and when its loop or function body ends.
+        """
+        types, sources, aliases, escaped = {}, {}, {}, set()
+
+        def resolve(name):
+            while name in aliases:
+                name = aliases[name]
+            return name
+
+        def escape(value):
+            if isinstance(value, Id):
+                value = value.name
+            if isinstance(value, str):
+                escaped.add(resolve(value))
+
+        def visit(block):
+            for x in block.lst:
+                if isinstance(x, Declaration):
+                    types[x.id.name] = self.gen(x.type)
+                elif isinstance(x, BinaryOperation):
+                    fresh = x.type.value == 'str_t' and x.operator == '+'
+                    sources.setdefault(x.left.name, set()).add('fresh' if fresh else 'other')
+                elif isinstance(x, NonPrimitiveSlicing):
+                    sources.setdefault(x.result_reg.name, set()).add('fresh')
+                elif isinstance(x, NonPrimitiveLiteral):
+                    sources.setdefault(x.head.name, set()).add('other')
+                    for item in x.value:
+                        escape(item)
+                elif isinstance(x, NonPrimitiveIndex):
+                    sources.setdefault(x.result.name, set()).add('other')
+                elif isinstance(x, LstAdd):
+                    escape(x.value)
+                elif isinstance(x, ReturnStatement):
+                    escape(x.value)
+                elif isinstance(x, Assignment):
+                    name, val = x.id.name, x.val
+                    if isinstance(val, String):
+                        kind = 'literal'
+                    elif isinstance(val, FunctionCall):
+                        kind = 'fresh' if val.name.startswith('input_str') else 'other'
+                        if not val.name.startswith(('print_', 'input_')):
+                            for arg in val.lst:
+                                escape(arg)
+                    elif isinstance(val, (Id, str)) and val != 'none-placeholder':
+                        val = val.name if isinstance(val, Id) else val
+                        if name[0] == '_':
+                            aliases[name] = val
+                            continue
+                        source = resolve(val)
+                        if source[0] == '_':
+                            kind = ' '.join(sorted(sources.get(source, {'other'})))
+                        else:
+                            kind = 'other'
+                            escape(source)
+                    else:
+                        kind = 'other'
+                    sources.setdefault(name, set()).add(kind)
+                elif isinstance(x, ForLoopList):
+                    sources.setdefault(x.var.name, set()).add('other')
+                    visit(x.body)
+                elif isinstance(x, (ForLoopRange, WhileStmt)):
+                    visit(x.body)
+                elif isinstance(x, (IfStmt, ElifStmt, ElseStmt)):
+                    visit(x.body)
+                if isinstance(x, (ForLoopRange, ForLoopList, WhileStmt)):
+                    self.scope_exit_blocks.add(id(x.body))
+
+        visit(block)
+        allowed = {'str_t': {'fresh', 'literal'}, 'list_t *': {'fresh'}}
+        owned = {}
+        for name, type_t in types.items():
+            if name[0] == '_' or type_t not in allowed or name in escaped:
+                continue
+            kinds = set(' '.join(sources.get(name, ())).split())
+            if kinds and kinds <= allowed[type_t]:
+                owned[name] = type_t
+        return owned
+
+    def is_fresh_str(self, value):
+        return isinstance(value, str) and value.startswith(('str_concat(', 'str_init(', 'input_str'))
+
+    def gen_owned_assignment(self, name, assignment):
+        """ Rewrites `name = value;` so that the old value of an owned variable is freed. """
+        if assignment is None or name not in self.owned_vars:
+            return assignment
+        value = assignment[len(f"{name} = "):].rstrip(';')
+        if self.owned_vars[name] == 'str_t':
+            if not self.is_fresh_str(value) and not self.is_str_literal(value):
+                # Folded constants are copied so the variable can free them,
+                # literals are shared and str_free skips them
+                value = f"str_init({value})"
+            return f"{name} = str_reassign({name}, {value});"
+        return f"{name} = list_reassign({name}, {value});"
+
+    def free_owned_vars(self, names):
+        free = {'str_t': 'str_free', 'list_t *': 'list_free'}
+        return [f"{free[self.owned_vars[name]]}({name});" for name in names if name in self.owned_vars]
+
     def get_temp_val(self, tmp):
         if tmp in self.temp_dict.keys():
             return self.get_temp_val(self.temp_dict[tmp])
@@ -870,47 +1107,27 @@ int main() {{
         left = self.get_prop_val(left)
         right = self.get_prop_val(right)
         operator = self.convert_operator(node.operator)
-        if self.gen(node.left) not in self.variants and isinstance(left, (bool, int, float))\
-                and isinstance(right, (bool, int, float)):
-            temp_dict = self.var_dict.copy()
-            for var in self.variants:
-                temp_dict.pop(var,None)
-            if node.type.value == "int_t":
-                return int(eval(f"{left} {operator} {right}",temp_dict))
-            return eval(f"{left} {operator} {right}",temp_dict)
+        if self.gen(node.left) not in self.variants:
+            value = fold_binary(node.type.value, operator, left, right)
+            if value is not None:
+                return value
         return f"{left} {operator} {right}"
 
     def eval_UnaryOperation(self, node: UnaryOperation):
         operand = self._eval(node.operand)
         operator = self.convert_operator(node.operator)
         if self.gen(node.left) not in self.variants:
-            temp_dict = self.var_dict.copy()
-            for var in self.variants:
-                temp_dict.pop(var,None)
             operand = self.get_prop_val(operand)
-            if node.type.value == "int_t":
-                return int(eval(f"{operator} {operand}",temp_dict))
-            return eval(f"{operator} {operand}",temp_dict)
+            value = fold_unary(node.type.value, operator, operand)
+            if value is not None:
+                return value
         return f"{operator} {operand}"
 
     def eval_Id(self, node: Id):
         if node.name[0] == "_":
-            expr = self.look_up_temp(node.name)
-            try:
-                if node.name in self.converted_str_lst:
-                    return self.converted_str_lst[node.name]
-                temp_dict = self.var_dict.copy()
-                for var in self.variants:
-                    temp_dict.pop(var,None)
-                result = eval(f"{expr}",temp_dict)
-                if type(result) == str and result not in self.var_dict:
-                    import json
-                    result = json.dumps(result)
-                    self.converted_str_lst[node.name] = result
-                    return result
-            except:
-                result = expr
-            return result
+            if node.name in self.converted_str_lst:
+                return self.converted_str_lst[node.name]
+            return self.fold(self.look_up_temp(node.name))
         else:
             if node.name not in self.variants and node.name in self.var_dict:
                 return self.var_dict[node.name]
@@ -923,27 +1140,41 @@ int main() {{
         return self.gen(node)
 
     def eval_Assignment(self,node:Assignment):
-        expr = self.look_up_temp(node.val)
-        name = self.gen(node.id)
-        try:
-            if node.val in self.converted_str_lst:
-                result = self.converted_str_lst[node.val]
-                self.converted_str_lst[name] = result
-                return result
-            temp_dict = self.var_dict.copy()
-            for var in self.variants:
-                temp_dict.pop(var,None)
-            result = eval(f"{expr}", temp_dict)
-            if type(result) == str and result not in self.var_dict:
-                result = json.dumps(result)
-                self.converted_str_lst[name] = result
-                return json.dumps(result)
-        except:
-            result = expr
-        return result
+        if node.val in self.converted_str_lst:
+            result = self.converted_str_lst[node.val]
+            self.converted_str_lst[self.gen(node.id)] = result
+            return result
+        return self.fold(self.look_up_temp(node.val))
 
     def eval_RangeValues(self,node:RangeValues):
-        start = self.look_up_temp(node.start)
-        step = self.look_up_temp(node.step)
-        stop = self.look_up_temp(node.stop)
-        return [eval(f"{start}",self.var_dict),eval(f"{step}",self.var_dict),eval(f"{stop}",self.var_dict)]
+        return [self.fold(self.look_up_temp(value)) for value in (node.start, node.step, node.stop)]
+
+    def unfolded(self, code, type_t, operator, *operands):
+        """ Remembers the operation of code, which could not be folded yet. """
+        self.expressions[code] = (type_t, operator, operands)
+        return code
+
+    def constant(self, value):
+        """
+        The constant value of value, a constant, the name of a variable or the
+        code of an operation, or None when it is not known.
+        """
+        if is_constant(value):
+            return value
+        if not isinstance(value, str):
+            return None
+        if value in self.expressions:
+            type_t, operator, operands = self.expressions[value]
+            operands = [self.constant(operand) for operand in operands]
+            if len(operands) == 1:
+                return fold_unary(type_t, operator, *operands)
+            return fold_binary(type_t, operator, *operands)
+        if value not in self.variants:
+            value = self.var_dict.get(value)
+            if is_constant(value):
+                return value
+        return None
+
+    def fold(self, value):
+        constant = self.constant(value)
+        return value if constant is None else constant
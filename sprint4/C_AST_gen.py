@@ -3,17 +3,19 @@ from ir_gen import *
 from symbol_table import SymbolTable
 from typing import List
 from AST import Type as A_Type, NonPrimitiveType
+from type_table import c_type, c_non_primitive_type, to_c_type
+from visitor import Visitor
+from backend import RUNTIME_NAMES
 
 
-class CASTGenerator:
-    def __init__(self):
-        self.seen_labels = []  # Labels have seen
+class CASTGenerator(Visitor, prefix='gen_'):
+    def __init__(self, builtins=None):
+        self.seen_labels = set()  # Labels have seen
         self.waiting_labels = []  # Labels have not seen
-        self.temp_st = SymbolTable()  # Keep track of declared variables
+        self.temp_st = SymbolTable(builtins)  # Keep track of declared variables
+        self.temp_st.taken_names = RUNTIME_NAMES
         self.result_AST = []
         self.end_if_labels = []  # value is a tuple (label name, head of if)
-        self.current_str = None
-        self.current_str_count = 0
         self.argument_list_stack = []
         self.argument_list_dict = {}
         # For loop variables
@@ -28,39 +30,39 @@ class CASTGenerator:
 
 
     def generate_AST(self, ir, st=None):
-        self.ir = ir[:]
+        if st is not None:
+            # The program is type checked, so all its names are known, including
+            # the ones declared after a function
+            self.temp_st.taken_names = RUNTIME_NAMES | st.declared_names
+        # Instructions are decoded one at a time while reading
+        self.ir = IRCursor(ir)
         while self.ir:
-            ir_line = self.ir.pop(0)
+            ir_line = self.ir.popleft()
             generated_line = self.gen(ir_line, st)
             if generated_line != None:
                 self.result_AST += generated_line
         return C_AST.Block(self.result_AST)
 
     def gen(self, ir_line, st=None):
-        method = 'gen_' + ir_line.__class__.__name__
-        try:
-            return getattr(self, method)(ir_line, st)
-        except AttributeError:
-            print(f"Trying to process ir {ir_line}")
-            raise
+        return self.methods[ir_line.__class__](self, ir_line, st)
 
     def gen_IR_Label(self, ir_node: IR_Label, st=None):
         if "FORRANGE" in ir_node.value:
             # do something for FOR
             #pass
-            return self._gen_IR_For_Range(self.ir.pop(0), st)
+            return self._gen_IR_For_Range(self.ir.popleft(), st)
         elif "FORLIST" in ir_node.value:
-            return self._gen_IR_For_List(self.ir.pop(0), st)
+            return self._gen_IR_For_List(self.ir.popleft(), st)
         elif "WHILE" in ir_node.value:
             # do something for WHILE
-            return self._gen_IR_While(self.ir.pop(0), st)
+            return self._gen_IR_While(self.ir.popleft(), st)
         elif 'FUNC' in ir_node.value:
             # This is a function, we need the label at the top of waiting
             # to find the end of declaration
             # Based on our Function IR, return statement is required.
             # Also, assume functions are declared in global scope
             end_func_idx = ir_node.value.rfind("_")
-            return self._gen_IR_Func(self.ir.pop(0), ir_node.value[7:end_func_idx], st)
+            return self._gen_IR_Func(self.ir.popleft(), ir_node.value[7:end_func_idx], st)
         else:
             # other cases
             return ir_node.value
@@ -87,16 +89,16 @@ class CASTGenerator:
             assert False, f"Unexpected type_val {type_val} for {ir_node}"
 
         # Primitive Literal Reg will not be assigned again
-        self.temp_st.declare_variable(name=ir_node.reg, type=C_AST.Type(value=type_val))
+        self.temp_st.declare_variable(name=ir_node.reg, type=c_type(type_val))
         id_node = C_AST.Id(name=ir_node.reg)
-        decl_node = C_AST.Declaration(id=id_node, type=C_AST.Type(value=type_val))
+        decl_node = C_AST.Declaration(id=id_node, type=c_type(type_val))
         return [decl_node, C_AST.Assignment(id=id_node, val=ir_node.val)]
 
     def gen_IR_BinaryOperation(self, ir_node: IR_BinaryOperation, st=None):
         result_node = C_AST.Id(name=ir_node.result_reg)
         left_node = C_AST.Id(name=ir_node.left_reg)
         right_node = C_AST.Id(name=ir_node.right_reg)
-        if ir_node.result_reg not in self.temp_st.scope_stack[-1]:
+        if not self.temp_st.declared_in_scope(ir_node.result_reg):
             # need assignment
             # should we consider string here?
             if ir_node.operator in ["<", "<=", "=>", ">", "=="]:
@@ -110,18 +112,18 @@ class CASTGenerator:
                     type_t = 'str_t'
                 else:
                     type_t = 'int_t'
-            self.temp_st.declare_variable(name=ir_node.result_reg, type=C_AST.Type(value=type_t))
+            self.temp_st.declare_variable(name=ir_node.result_reg, type=c_type(type_t))
             operation_node = C_AST.BinaryOperation(left=result_node,
-                                                   type=C_AST.Type(type_t),
+                                                   type=c_type(type_t),
                                                    operator=ir_node.operator,
                                                    operand_a=left_node,
                                                    operand_b=right_node)
-            decl_node = C_AST.Declaration(id=result_node, type=C_AST.Type(value=type_t))
+            decl_node = C_AST.Declaration(id=result_node, type=c_type(type_t))
             return [decl_node, operation_node]
         else:
             type_t = self.temp_st.lookup_variable(ir_node.result_reg)
             operation_node = C_AST.BinaryOperation(left=result_node,
-                                                   type=C_AST.Type(type_t),
+                                                   type=c_type(type_t),
                                                    operator=ir_node.operator,
                                                    operand_a=left_node,
                                                    operand_b=right_node)
@@ -130,18 +132,18 @@ class CASTGenerator:
     def gen_IR_UnaryOperation(self, ir_node: IR_UnaryOperation, st=None):
         result_node = C_AST.Id(name=ir_node.result_reg)
         operand_node = C_AST.Id(name=ir_node.operand_reg)
-        if ir_node.result_reg not in self.temp_st.scope_stack[-1]:
+        if not self.temp_st.declared_in_scope(ir_node.result_reg):
             if ir_node.operator == "!":
                 type_t = "bool_t"
             else:
                 type_t = self.temp_st.lookup_variable(ir_node.operand_reg).value
-            decl_node = C_AST.Declaration(id=result_node, type=C_AST.Type(value=type_t))
-            self.temp_st.declare_variable(ir_node.result_reg,C_AST.Type(type_t))
-            operation_node = C_AST.UnaryOperation(left=result_node,type=C_AST.Type(type_t), operator=ir_node.operator, operand=operand_node)
+            decl_node = C_AST.Declaration(id=result_node, type=c_type(type_t))
+            self.temp_st.declare_variable(ir_node.result_reg,c_type(type_t))
+            operation_node = C_AST.UnaryOperation(left=result_node,type=c_type(type_t), operator=ir_node.operator, operand=operand_node)
             return [decl_node, operation_node]
         else:
             type_t = self.temp_st.lookup_variable(ir_node.result_reg)
-            operation_node = C_AST.UnaryOperation(left=result_node,type=C_AST.Type(type_t),operator=ir_node.operator, operand=operand_node)
+            operation_node = C_AST.UnaryOperation(left=result_node,type=c_type(type_t),operator=ir_node.operator, operand=operand_node)
         return [operation_node]
 
     def gen_IR_FunctionCall(self, ir_node: IR_FunctionCall, st=None):
@@ -154,24 +156,12 @@ class CASTGenerator:
 
         function_call_node = C_AST.FunctionCall(name=c_name, lst=args)
 
-        # Assume return types are PrimitiveType
-        if type_val.value.value == 'int':
-            type_val = 'int_t'
-        elif type_val.value.value == 'float':
-            type_val = 'float_t'
-        elif type_val.value.value == 'bool':
-            type_val = 'bool_t'
-        elif type_val.value.value == 'str':
-            type_val = 'str_t'
-        elif type_val.value.value == 'none':
-            type_val = 'none_t'
-        else:
-            assert False, f"{type_val=}"
+        type_val = to_c_type(type_val)
         # return always immediately follows the function call
-        ret_reg = self.gen(self.ir.pop(0))
-        self.temp_st.declare_variable(name=ret_reg, type=C_AST.Type(value=type_val))
+        ret_reg = self.gen(self.ir.popleft())
+        self.temp_st.declare_variable(name=ret_reg, type=type_val)
         id_node = C_AST.Id(name=ret_reg)
-        decl_node = C_AST.Declaration(id=id_node, type=C_AST.Type(value=type_val))
+        decl_node = C_AST.Declaration(id=id_node, type=type_val)
 
         return [decl_node, C_AST.Assignment(id=id_node, val=function_call_node)]
 
@@ -183,44 +173,33 @@ class CASTGenerator:
 
     def gen_IR_IfStmt(self, ir_node: IR_IfStmt, st=None):
         false_label = ir_node.if_false.label
-        idx = 0
-        prev_node = None
-        next_node = self.ir[idx]
-        # if next node is not label or not the false label, then it is in body
-        while not (next_node.__class__.__name__ == 'IR_Label' and next_node.value == false_label):
-            idx += 1
-            prev_node = next_node
-            next_node = self.ir[idx]
+        # everything up to the false label is in body
+        false_idx = self.ir.find_label(false_label)
         # based on the if stmt structure in IR, the end of if label must be before false label
-        self.end_if_labels.append([prev_node.label, 0])
+        self.end_if_labels.append([self.ir.peek(false_idx - 1).label, 0])
         if_node = C_AST.IfStmt(ifCond=C_AST.Id(name=ir_node.cond_reg), body=C_AST.Block([]))
         # signal is set to false when reaching the false label
         continue_sig = True
         while continue_sig:
-            node = self.ir.pop(0)
+            node = self.ir.popleft()
             val = self.gen(node, st)
             if val and val == false_label:
                 continue_sig = False
             elif val:
-                if_node.body.lst += val
+                if_node.body.lst.extend(val)
         # call elif to check if we have following elif
-        if_stmt = self._gen_IR_ElifStmt(self.ir.pop(0), [if_node], st)
+        if_stmt = self._gen_IR_ElifStmt(self.ir.popleft(), [if_node], st)
         return if_stmt
 
     def _gen_IR_ElifStmt(self, ir_node: any, if_stmt=None, st=None):
-        idx = 0
-        prev_node = None
-        next_node = ir_node
         continue_sig = True
-        while not (next_node.__class__.__name__ == 'IR_ElifStmt' or \
-                   (next_node.__class__.__name__ == 'IR_Label' and next_node.value == self.end_if_labels[-1][0])):
-            # it has to reach one of the condition without reaching the end of ir
-            prev_node = next_node
-            next_node = self.ir[idx]
-            idx += 1
-        if next_node.__class__.__name__ == 'IR_Label':
+        # ir_node is already read, it is at offset -1. The next elif or the end
+        # of if label, whichever comes first, tells what follows the if.
+        end_idx = self.ir.find_label(self.end_if_labels[-1][0])
+        elif_idx = self.ir.find_elif(-1)
+        if elif_idx is None or end_idx < elif_idx:
             # if stmts is empty, there is not trailing if statements
-            if not prev_node:
+            if end_idx == -1:
                 self.end_if_labels.pop()
                 return if_stmt
             result_stmt = C_AST.ElseStmt(body=C_AST.Block([]))
@@ -230,9 +209,9 @@ class CASTGenerator:
                 if val and val == self.end_if_labels[-1][0]:
                     continue_sig = False
                 elif val:
-                    result_stmt.body.lst += val
+                    result_stmt.body.lst.extend(val)
                 if continue_sig:
-                    cur_node = self.ir.pop(0)
+                    cur_node = self.ir.popleft()
         else:
             # reach elif, stmts are the conditional expression, need to be inserted before if head`
             cond_ast = []
@@ -241,29 +220,29 @@ class CASTGenerator:
                 temp_val = self.gen(cur_node,st)
                 if temp_val:
                     cond_ast += temp_val
-                cur_node = self.ir.pop(0)
+                cur_node = self.ir.popleft()
             if_stmt = if_stmt[:self.end_if_labels[-1][1]] + cond_ast + if_stmt[self.end_if_labels[-1][1]:]
             self.end_if_labels[-1][1] += len(cond_ast)
             result_stmt = C_AST.ElifStmt(elifCond=C_AST.Id(cur_node.cond_reg), body=C_AST.Block([]))
-            false_label = next_node.elif_false.label
+            false_label = cur_node.elif_false.label
             while continue_sig:
-                node = self.ir.pop(0)
+                node = self.ir.popleft()
                 val = self.gen(node, st)
                 if val and val == false_label:
                     continue_sig = False
                 elif val:
-                    result_stmt.body.lst += val
+                    result_stmt.body.lst.extend(val)
         if_stmt.append(result_stmt)
         if result_stmt.__class__.__name__ == "ElseStmt":
             self.end_if_labels.pop()
             return if_stmt
-        if_stmt = self._gen_IR_ElifStmt(self.ir.pop(0), if_stmt, st)
+        if_stmt = self._gen_IR_ElifStmt(self.ir.popleft(), if_stmt, st)
         return if_stmt
 
     def gen_IR_Assignment(self, ir_node: IR_Assignment, st=None):
         id_node = C_AST.Id(name=ir_node.name)
         stmt_node = C_AST.Assignment(id=id_node, val=ir_node.val)
-        if ir_node.name not in self.temp_st.scope_stack[-1]:
+        if not self.temp_st.declared_in_scope(ir_node.name):
             try:
                 type_t = self.temp_st.lookup_variable(name=ir_node.val)
             except Exception:
@@ -282,12 +261,12 @@ class CASTGenerator:
                     Exception(f'C_AST_Gen Error: {ir_node.name} is not previously defined as non-primitive')
                 while self.empty_non_prim:
                     obj = self.empty_non_prim.pop()
-                    obj.type = C_AST.Type(type_t)
-                    self.temp_st.update_variable(name=obj.head.name,type=C_AST.Type(type_t))
+                    obj.type = c_type(type_t)
+                    self.temp_st.update_variable(name=obj.head.name,type=c_type(type_t))
             else:
                 type_t = type_t.value
-            self.temp_st.declare_variable(name=ir_node.name, type=C_AST.Type(type_t))
-            decl_node = C_AST.Declaration(id=id_node, type=C_AST.Type(type_t))
+            self.temp_st.declare_variable(name=ir_node.name, type=c_type(type_t))
+            decl_node = C_AST.Declaration(id=id_node, type=c_type(type_t))
             return [decl_node, stmt_node]
         return [stmt_node]
 
@@ -307,7 +286,7 @@ class CASTGenerator:
         continue_sig = True
         decl_stmt = []
         while continue_sig and length > 0:
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
             if cur_node.__class__.__name__ == "IR_List_VAL":
                 lst.append(C_AST.Id(cur_node.reg))
                 length -= 1
@@ -319,9 +298,9 @@ class CASTGenerator:
             if length == 0:
                 continue_sig = False
         if ir_node.operator == 'LIST':
-            type_t = C_AST.Type(C_AST.NonPrimitiveType(type='list',value=val_type))
+            type_t = c_non_primitive_type('list', val_type)
         else:
-            type_t = C_AST.Type(C_AST.NonPrimitiveType(type='tuple',value=val_type))
+            type_t = c_non_primitive_type('tuple', val_type)
         self.temp_st.declare_variable(ir_node.reg,type_t)
         self.list_len[ir_node.reg] = ir_node.length
         result = C_AST.NonPrimitiveLiteral(head=head,type = type_t,value=lst)
@@ -330,46 +309,35 @@ class CASTGenerator:
         return decl_stmt+[result]
 
     def gen_IR_LoopStart(self, ir_node: IR_LoopStart, st=None):
-        self.temp_st.declare_variable(name=ir_node.reg, type=C_AST.Type("int_t"))
+        self.temp_st.declare_variable(name=ir_node.reg, type=c_type("int_t"))
         id_node = C_AST.Id(name=ir_node.reg)
-        decl_node = C_AST.Declaration(id=id_node, type=C_AST.Type("int_t"))
+        decl_node = C_AST.Declaration(id=id_node, type=c_type("int_t"))
         assign = C_AST.Assignment(id=id_node, val=ir_node.val)
         self.loop_start = ir_node.reg
         return [decl_node, assign]
 
     def gen_IR_LoopStop(self, ir_node: IR_LoopStop, st=None):
-        self.temp_st.declare_variable(name=ir_node.reg, type=C_AST.Type("int_t"))
+        self.temp_st.declare_variable(name=ir_node.reg, type=c_type("int_t"))
         id_node = C_AST.Id(name=ir_node.reg)
-        decl_node = C_AST.Declaration(id=id_node, type=C_AST.Type("int_t"))
+        decl_node = C_AST.Declaration(id=id_node, type=c_type("int_t"))
         assign = C_AST.Assignment(id=id_node, val=ir_node.val)
         self.loop_stop = ir_node.reg
         return [decl_node, assign]
 
     def gen_IR_LoopStep(self, ir_node: IR_LoopStep, st=None):
-        self.temp_st.declare_variable(name=ir_node.reg, type=C_AST.Type("int_t"))
+        self.temp_st.declare_variable(name=ir_node.reg, type=c_type("int_t"))
         id_node = C_AST.Id(name=ir_node.reg)
-        decl_node = C_AST.Declaration(id=id_node, type=C_AST.Type("int_t"))
+        decl_node = C_AST.Declaration(id=id_node, type=c_type("int_t"))
         assign = C_AST.Assignment(id=id_node, val=ir_node.val)
         self.loop_step = ir_node.reg
         return [decl_node, assign]
 
-    def gen_IR_String(self,ir_node:IR_String,st=None):
-        self.current_str = C_AST.String(val="", len=ir_node.length)
-        self.current_str_count = 0
-
+    def gen_IR_String(self, ir_node: IR_String, st=None):
         type_val = "str_t"
-        self.temp_st.declare_variable(name=ir_node.reg, type=C_AST.Type(value=type_val))
+        self.temp_st.declare_variable(name=ir_node.reg, type=c_type(type_val))
         id_node = C_AST.Id(name=ir_node.reg)
-        decl_node = C_AST.Declaration(id=id_node, type=C_AST.Type(value=type_val))
-        return [decl_node, C_AST.Assignment(id=id_node, val=self.current_str)]
-
-    def gen_IR_String_char(self,ir_node:IR_String_char,st=None):
-        self.current_str.val = self.current_str.val + ir_node.val
-        self.current_str_count += 1
-        if self.current_str_count == self.current_str.len:
-            self.current_str_count = 0
-            self.current_str = None
-        return None
+        decl_node = C_AST.Declaration(id=id_node, type=c_type(type_val))
+        return [decl_node, C_AST.Assignment(id=id_node, val=C_AST.String(val=ir_node.val))]
 
     def gen_IR_Parameter_VAL(self, ir_node: IR_Parameter_VAL, st=None):
         return ir_node.name
@@ -392,7 +360,7 @@ class CASTGenerator:
         # get params
         length = ir_node.length
         for i in range(length):
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
             val = self.gen(cur_node)
             params.append(val)
             param_regs.append(cur_node.reg)
@@ -413,42 +381,36 @@ class CASTGenerator:
         continue_sig = True
         #  get function body
         while continue_sig:
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
             val = self.gen(cur_node, st)
             # check if reached the end of function
             if val and val == self.waiting_labels[-1]:
-                self.seen_labels.append(self.waiting_labels.pop())
+                self.seen_labels.add(self.waiting_labels.pop())
                 continue_sig = False
             elif val:
-                func_node.body.lst += val
+                func_node.body.lst.extend(val)
         self.temp_st.pop_scope()
         return [func_node]
 
     def convert_types(self, param_types: List[A_Type]):
-        converted_types = []
-        for type in param_types:
-            if type.value.__class__.__name__ == "PrimitiveType":
-                converted_types.append(C_AST.Type(type.value.value + "_t"))
-            else:
-                converted_types.append(C_AST.Type(C_AST.NonPrimitiveType(type.value.name)))
-        return converted_types
+        return [to_c_type(type) for type in param_types]
 
     def _gen_IR_While(self, ir_node: any, st=None):
         head = []
         cur_node = ir_node
         while cur_node.__class__.__name__ != "IR_IfStmt":
             head += self.gen(cur_node, st)
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
         false_label = cur_node.if_false.label
         result_stmt = C_AST.WhileStmt(cond=C_AST.Id(cur_node.cond_reg),body=C_AST.Block([]))
         continue_sig = True
         while continue_sig:
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
             val = self.gen(cur_node,st)
             if val and val == false_label:
                 continue_sig = False
             elif val:
-                result_stmt.body.lst+= val
+                result_stmt.body.lst.extend(val)
         if head:
             result_stmt.body.lst.append(head[-1])
         return head + [result_stmt]
@@ -471,18 +433,18 @@ class CASTGenerator:
             else:
                 head += self.gen(cur_node, st)
 
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
 
         false_label = cur_node.if_false.label
         result_stmt = C_AST.ForLoopRange(rangeVal=C_AST.RangeValues(stop=cur_loop_stop, start=cur_loop_start, step=cur_loop_step),var=cur_id, body=C_AST.Block([]))
         continue_sig = True
         while continue_sig:
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
             val = self.gen(cur_node, st)
             if val and val == false_label:
                 continue_sig = False
             elif val:
-                result_stmt.body.lst+= val
+                result_stmt.body.lst.extend(val)
         return head + [result_stmt]
 
     def _gen_IR_For_List(self, ir_node: any , st=None):
@@ -505,7 +467,7 @@ class CASTGenerator:
                 cur_index = cur_node.idx_reg
                 list_t = self.temp_st.lookup_variable(cur_node.obj_reg)
                 if list_t.value.__class__.__name__ == "NonPrimitiveType" and list_t.value.value.__class__.__name__ == "Type":
-                    if cur_id not in self.temp_st.scope_stack[-1]:
+                    if not self.temp_st.declared_in_scope(cur_id):
                         self.temp_st.declare_variable(cur_id, list_t.value.value)
                         decl_stmt = C_AST.Declaration(id=C_AST.Id(cur_id),type=list_t.value.value)
                 else:
@@ -513,19 +475,19 @@ class CASTGenerator:
             else:
                 head += self.gen(cur_node, st)
 
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
 
         false_label = cur_node.if_false.label
         result_stmt = C_AST.ForLoopList(var=C_AST.Id(name=cur_id), indexVar=C_AST.Id(cur_index), length=cur_list_len, Lst=C_AST.Id(cur_list_reg), body=C_AST.Block([]))
 
         continue_sig = True
         while continue_sig:
-            cur_node = self.ir.pop(0)
+            cur_node = self.ir.popleft()
             val = self.gen(cur_node, st)
             if val and val == false_label:
                 continue_sig = False
             elif val:
-                result_stmt.body.lst += val
+                result_stmt.body.lst.extend(val)
 
         if decl_stmt:
             return head + [decl_stmt] + [result_stmt]
@@ -538,7 +500,7 @@ class CASTGenerator:
         obj = C_AST.Id(ir_node.obj_reg)
         value = C_AST.Id(ir_node.val_reg)
         type_t = self.temp_st.lookup_variable(ir_node.obj_reg)
-        type_t = C_AST.Type(type_t.value.value.value)
+        type_t = c_type(type_t.value.value.value)
         return [C_AST.LstAdd(obj=obj,value=value,type=type_t, idx=ir_node.idx)]
 
     def gen_IR_NonPrimitiveIndex(self,ir_node:IR_NonPrimitiveIndex,st=None):
@@ -546,7 +508,7 @@ class CASTGenerator:
         obj = C_AST.Id(ir_node.obj_reg)
         idx = C_AST.Id(ir_node.idx_reg)
         type_t = self.temp_st.lookup_variable(ir_node.obj_reg)
-        type_t = C_AST.Type(type_t.value.value.value)
+        type_t = c_type(type_t.value.value.value)
         self.temp_st.declare_variable(ir_node.result_reg,type_t)
         return [C_AST.NonPrimitiveIndex(result,obj,type_t,idx)]
 
@@ -566,6 +528,4 @@ class CASTGenerator:
 
     # Used for non primitive type from st
     def convert_NonPrimitive_Type(self,node:A_Type):
-        if node.value.__class__.__name__ == "PrimitiveType":
-            return node.value.value+"_t"
-        return C_AST.NonPrimitiveType(type=node.value.name,value=C_AST.Type(self.convert_NonPrimitive_Type(node.value.value)))
+        return to_c_type(node).value
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import re
+import subprocess
+from dataclasses import dataclass, field
+from yacc import default_cache_dir
+
+compiler_dir = os.path.dirname(os.path.abspath(__file__))
+
+# The runtime every generated program links against
+RUNTIME_HEADER = os.path.join(compiler_dir, 'starter.h')
+RUNTIME_SOURCE = os.path.join(compiler_dir, 'starter.c')
+
+
+def read_runtime_names():
+    """ Every identifier of the runtime header, which generated names must not reuse. """
+    with open(RUNTIME_HEADER) as f:
+        return frozenset(re.findall(r'[A-Za-z_]\w*', f.read()))
+
+
+RUNTIME_NAMES = read_runtime_names()
+
+# Optimization level used for the C code when the compiler's optimization is on
+DEFAULT_OPT_LEVEL = 2
+
+# Runtime objects already built by this process, by key
+_runtime_objects = {}
+
+
+def default_cc():
+    return os.environ.get('CC') or 'gcc'
+
+
+@dataclass(frozen=True)
+class BackendConfig:
+    """
+    How the generated C code is turned into an executable. The runtime is
+    built with the same compiler and flags as the program, so that LTO can
+    inline runtime functions into the generated code.
+    """
+    cc: str = field(default_factory=default_cc)
+    opt_level: int = 0
+    native: bool = False
+    lto: bool = False
+    max_heap: int = 0  # bytes, 0 means unlimited
+    heap_stats: bool = False
+
+    @classmethod
+    def for_opt(cls, opt_on, **kwargs):
+        return cls(opt_level=DEFAULT_OPT_LEVEL if opt_on else 0, **kwargs)
+
+    def cflags(self):
+        flags = [f'-O{self.opt_level}']
+        if self.native:
+            flags.append('-march=native')
+        if self.lto:
+            flags.append('-flto')
+        if self.max_heap:
+            flags.append(f'-DMAX_HEAP_BYTES={self.max_heap}')
+        if self.heap_stats:
+            flags.append('-DHEAP_STATS=1')
+        return flags
+
+    def describe(self):
+        return ' '.join([self.cc] + self.cflags())
+
+
+def add_backend_arguments(parser):
+    parser.add_argument('-O', '--opt-level', type=int, choices=range(4), default=None, help=f'Optimization level of the C compiler (default: {DEFAULT_OPT_LEVEL} with --opt, else 0)')
+    parser.add_argument('--native', help='Tune the executables for this machine (-march=native)', action='store_true')
+    parser.add_argument('--lto', help='Link time optimization across the program and the runtime', action='store_true')
+    parser.add_argument('--max-heap', type=parse_size, default=0, help='Stop the program when its heap grows over this many bytes (e.g. 64M)')
+    parser.add_argument('--heap-stats', help='Print heap statistics to stderr when the program exits', action='store_true')
+
+
+def parse_size(s):
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    s = s.strip().upper().rstrip('B')
+    if s and s[-1] in units:
+        return int(float(s[:-1]) * units[s[-1]])
+    return int(s)
+
+
+def backend_from_args(args):
+    options = dict(native=args.native, lto=args.lto, max_heap=args.max_heap, heap_stats=args.heap_stats)
+    if args.opt_level is None:
+        return BackendConfig.for_opt(args.opt, **options)
+    return BackendConfig(opt_level=args.opt_level, **options)
+
+
+def runtime_sources():
+    return [RUNTIME_HEADER, RUNTIME_SOURCE]
+
+
+def runtime_key(config):
+    h = hashlib.sha256()
+    for filename in runtime_sources():
+        with open(filename, 'rb') as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    h.update(config.describe().encode())
+    return h.hexdigest()
+
+
+def run(command):
+    proc = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert proc.returncode == 0, f"{command[0]} return code was {proc.returncode}\n{proc.stderr}"
+
+
+def build_runtime(config=None, cache_dir=None):
+    """
+    Compile the runtime once into an object file and return its path. The
+    object is keyed by the runtime sources and the backend configuration, so
+    it is rebuilt only when either changes, and is shared by every program
+    compiled afterwards.
+    """
+    config = config or BackendConfig()
+    key = runtime_key(config)
+    if key in _runtime_objects:
+        return _runtime_objects[key]
+    directory = os.path.join(cache_dir or default_cache_dir(), 'runtime')
+    obj = os.path.join(directory, f'starter-{key[:16]}.o')
+    if not os.path.exists(obj):
+        os.makedirs(directory, exist_ok=True)
+        # Other processes may build the same object, the last rename wins
+        tmp_obj = f'{obj}.{os.getpid()}.tmp.o'
+        run([config.cc, *config.cflags(), '-c', RUNTIME_SOURCE, '-I', compiler_dir, '-o', tmp_obj])
+        os.replace(tmp_obj, obj)
+    _runtime_objects[key] = obj
+    return obj
+
+
+def compile_program(filename, output, config=None):
+    """ Compile a generated C file and link it with the prebuilt runtime. """
+    config = config or BackendConfig()
+    run([config.cc, *config.cflags(), filename, '-I', compiler_dir, build_runtime(config), '-o', output])
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""
+Measures how fast the executables run when the generated C code is compiled
+with different backend configurations. By default it uses the loop-heavy
+programs in tests/compile. Those only run a handful of iterations, so the
+bounds of every range() can be multiplied with --scale to get run times that
+are not dominated by process startup.
+
+Programs are translated to C with the front end optimizations on, falling
+back to translating them without when that fails. Only the C compiler flags
+change between the measurements of a program.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import tempfile
+import time
+from backend import BackendConfig
+from compiler import CompilerSession, compiler
+
+CONFIGS = [
+    BackendConfig(opt_level=0),
+    BackendConfig(opt_level=2),
+    BackendConfig(opt_level=3),
+    BackendConfig(opt_level=3, native=True, lto=True),
+]
+
+
+def loop_heavy_tests(d='./tests/compile'):
+    result = []
+    for name in sorted(os.listdir(d)):
+        if not name.endswith('.py'):
+            continue
+        with open(os.path.join(d, name)) as f:
+            source = f.read()
+        if re.search(r'^\s*(for|while) ', source, re.M) and 'input(' not in source:
+            result.append(os.path.join(d, name))
+    return result
+
+
+def scale_ranges(source, scale):
+    def scale_args(match):
+        args = re.sub(r'-?\d+', lambda n: str(int(n.group()) * scale), match.group(1))
+        return f'range({args})'
+    return re.sub(r'range\(([^)]*)\)', scale_args, source)
+
+
+def best_run_time(executable, repeat, timeout):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([executable], stdout=subprocess.DEVNULL, check=True, timeout=timeout)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark executables built with different C compiler flags')
+    parser.add_argument('inputs', nargs='*', help='Programs to benchmark (default: loop-heavy tests in tests/compile)')
+    parser.add_argument('--scale', type=int, default=1000, help='Multiply the bounds of every range() by this')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per executable, the best is reported')
+    parser.add_argument('--timeout', type=float, default=30, help='Seconds before a run is abandoned')
+    args = parser.parse_args(argv)
+
+    session = CompilerSession()
+    with tempfile.TemporaryDirectory() as d:
+        for input_file in args.inputs or loop_heavy_tests():
+            name = os.path.basename(input_file)[:-len('.py')]
+            with open(input_file) as f:
+                source = scale_ranges(f.read(), args.scale)
+            scaled = os.path.join(d, name + '.py')
+            with open(scaled, 'w') as f:
+                f.write(source)
+
+            print(name)
+            baseline = None
+            opt_on = True
+            for config in CONFIGS:
+                executable = os.path.join(d, name)
+                try:
+                    compiler(scaled, executable + '.c', executable, opt_on=opt_on, session=session, use_cache=False, backend=config)
+                except Exception:
+                    if not opt_on:
+                        raise
+                    opt_on = False
+                    compiler(scaled, executable + '.c', executable, opt_on=opt_on, session=session, use_cache=False, backend=config)
+                try:
+                    t = best_run_time(executable, args.repeat, args.timeout)
+                except subprocess.SubprocessError as e:
+                    print(f'    {config.describe():40} failed: {e}')
+                    continue
+                baseline = baseline or t
+                print(f'    {config.describe():40} {t * 1000:9.2f}ms  {baseline / t:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+Measures how the translation of the IR to C scales with the size of the
+program. The programs are generated by repeating a block with a function,
+ifs, loops and a list, and are parsed, type checked and translated to IR
+before the measurement. The time per IR instruction of both the IR to C AST
+translation and the C code generation should stay the same as the programs
+get larger.
+"""
+
+import argparse
+import time
+from compiler import CompilerSession
+from type_checker import TypeChecker, SymbolTable
+from ir_gen import IRGen
+from C_AST_gen import CASTGenerator
+from C_AST import CCodeGenerator
+
+BLOCK = '''def f{n}(a: int, b: int) -> int:
+	c: int = a * 2 + b
+	return c
+x{n}: int = 0
+if x{n} > 10:
+	x{n} = x{n} - 10
+elif x{n} > 5:
+	x{n} = x{n} * 2
+else:
+	x{n} = x{n} + 1
+for i in range(10):
+	x{n} = x{n} + i
+	while x{n} > 100:
+		x{n} = x{n} - 100
+y{n}: int = f{n}(x{n}, {n})
+lst{n}: [int] = [1, 2, 3]
+for v in lst{n}:
+	print(v + y{n})
+'''
+BLOCK_LINES = BLOCK.count('\n')
+
+
+def generate_program(lines):
+    return ''.join(BLOCK.format(n=n) for n in range(lines // BLOCK_LINES))
+
+
+def generate_ir(session, source):
+    st = SymbolTable(session.builtins)
+    tc = TypeChecker()
+    ir_generator = IRGen()
+    for block in session.parser.parse_stream(source.splitlines(True)):
+        tc.typecheck(block, st)
+        ir_generator.generate(block)
+    return ir_generator.IR, st
+
+
+def time_c_gen(session, ir, st):
+    start = time.perf_counter()
+    c_ast = CASTGenerator(session.builtins).generate_AST(ir, st)
+    c_ast_time = time.perf_counter() - start
+    start = time.perf_counter()
+    CCodeGenerator().generate_code(c_ast)
+    return c_ast_time, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the translation of the IR of generated programs to C')
+    parser.add_argument('--lines', type=int, default=16000, help='Size of the largest program')
+    parser.add_argument('--steps', type=int, default=4, help='Number of sizes, each half of the next one')
+    args = parser.parse_args(argv)
+
+    session = CompilerSession()
+    print(f'{"lines":>8} {"ir":>8} {"c ast":>9} {"code":>9} {"c ast/ir":>10} {"code/ir":>9}')
+    for step in reversed(range(args.steps)):
+        source = generate_program(args.lines >> step)
+        ir, st = generate_ir(session, source)
+        c_ast_time, code_time = time_c_gen(session, ir, st)
+        print(f'{source.count(chr(10)):8} {len(ir):8} {c_ast_time:8.3f}s {code_time:8.3f}s '
+              f'{c_ast_time / len(ir) * 1e6:8.2f}us {code_time / len(ir) * 1e6:7.2f}us')
+
+
+if __name__ == '__main__':
+    main()
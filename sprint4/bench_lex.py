@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""
+Measures how many tokens per second the lexer produces, and how long it takes
+to build the lexer. The program is generated the same way as in bench_parse,
+and is lexed a few times, the best time is reported.
+"""
+
+import argparse
+import time
+from lex import pythonLexer
+from bench_parse import generate_program
+
+
+def time_build(repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pythonLexer().build()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_lexing(lexer, source):
+    lexer = lexer.clone()
+    lexer.input(source)
+    token = lexer.lexer.token
+    count = 0
+    start = time.perf_counter()
+    while token():
+        count += 1
+    return count, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the lexer')
+    parser.add_argument('--lines', type=int, default=20000, help='Size of the program')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs, the best is reported')
+    args = parser.parse_args(argv)
+
+    lexer = pythonLexer()
+    lexer.build()
+    source = generate_program(args.lines)
+    best = None
+    for _ in range(args.repeat):
+        count, elapsed = time_lexing(lexer, source)
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'build:  {time_build(args.repeat) * 1000:8.2f}ms')
+    print(f'lexing: {count} tokens in {best:.3f}s, {count / best:,.0f} tokens/s')
+
+
+if __name__ == '__main__':
+    main()
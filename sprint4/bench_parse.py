@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Measures how lexing and parsing scale with the size of the program. The
+programs are generated by repeating a block of functions, loops and ifs, so
+that both the number of lines and the amount of indentation grow with the
+size. The time per line should stay the same as the programs get larger.
+The cyclic garbage collector rescans the growing AST while a large program
+is parsed, --no-gc shows the time without it.
+"""
+
+import argparse
+import gc
+import time
+from yacc import pythonParser
+
+BLOCK = '''def f{n}(a: int, b: int) -> int:
+	c: int = a + b
+	if c > 10:
+		c = c - 10
+	elif c > 5:
+		c = c * 2
+	else:
+		c = c + 1
+	return c
+x{n}: int = 0
+for i in range(10):
+	x{n} = x{n} + f{n}(i, {n})
+	while x{n} > 100:
+		x{n} = x{n} - 100
+lst{n}: [int] = [1, 2, 3]
+for v in lst{n}:
+	print(v + x{n})
+'''
+BLOCK_LINES = BLOCK.count('\n')
+
+
+def generate_program(lines):
+    return ''.join(BLOCK.format(n=n) for n in range(lines // BLOCK_LINES))
+
+
+def time_lexing(parser, source):
+    lexer = parser.lexer.clone()
+    lexer.lexer.input(source)
+    start = time.perf_counter()
+    while lexer.lexer.token():
+        pass
+    return time.perf_counter() - start
+
+
+def time_parsing(parser, source):
+    start = time.perf_counter()
+    parser.parse(source)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark lexing and parsing of generated programs')
+    parser.add_argument('--lines', type=int, default=100000, help='Size of the largest program')
+    parser.add_argument('--steps', type=int, default=4, help='Number of sizes, each half of the next one')
+    parser.add_argument('--no-gc', action='store_true', help='Disable the garbage collector while benchmarking')
+    args = parser.parse_args(argv)
+    if args.no_gc:
+        gc.disable()
+
+    p = pythonParser()
+    p.build()
+    print(f'{"lines":>8} {"lex":>9} {"parse":>9} {"lex/line":>10} {"parse/line":>11}')
+    for step in reversed(range(args.steps)):
+        source = generate_program(args.lines >> step)
+        lines = source.count('\n')
+        lex_time = time_lexing(p, source)
+        parse_time = time_parsing(p, source)
+        print(f'{lines:8} {lex_time:8.3f}s {parse_time:8.3f}s {lex_time / lines * 1e6:8.2f}us {parse_time / lines * 1e6:9.2f}us')
+
+
+if __name__ == '__main__':
+    main()
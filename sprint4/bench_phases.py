@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+Measures how many nodes per second each visitor phase processes: type
+checking and IR generation visit the AST, the C AST generation visits the IR
+instructions and the C code generation visits the C AST. The program is
+generated the same way as in bench_c_gen and parsed once, every phase is run
+a few times on the same input and the best time is reported.
+"""
+
+import argparse
+import dataclasses
+import time
+from compiler import CompilerSession
+from type_checker import TypeChecker, SymbolTable
+from ir_gen import IRGen
+from C_AST_gen import CASTGenerator
+from C_AST import CCodeGenerator
+from bench_c_gen import generate_program
+
+
+def count_nodes(o):
+    if isinstance(o, list):
+        return sum(count_nodes(x) for x in o)
+    if dataclasses.is_dataclass(o):
+        return 1 + sum(count_nodes(getattr(o, f.name)) for f in dataclasses.fields(o))
+    return 0
+
+
+def best_time(run, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the nodes per second of every visitor phase')
+    parser.add_argument('--lines', type=int, default=8000, help='Size of the program')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs, the best is reported')
+    args = parser.parse_args(argv)
+
+    session = CompilerSession()
+    blocks = session.parser.parse(generate_program(args.lines))
+
+    def typecheck():
+        st = SymbolTable(session.builtins)
+        tc = TypeChecker()
+        for block in blocks:
+            tc.typecheck(block, st)
+        return st
+
+    def ir_gen():
+        return IRGen().generate_IR(blocks)
+
+    typecheck_time, st = best_time(typecheck, args.repeat)
+    ir_time, ir = best_time(ir_gen, args.repeat)
+    c_ast_time, c_ast = best_time(lambda: CASTGenerator(session.builtins).generate_AST(ir, st), args.repeat)
+    code_time, _ = best_time(lambda: CCodeGenerator().generate_code(c_ast), args.repeat)
+
+    ast_nodes = count_nodes(blocks)
+    phases = [
+        ('typecheck', 'AST nodes', ast_nodes, typecheck_time),
+        ('ir', 'AST nodes', ast_nodes, ir_time),
+        ('c ast', 'IR instructions', len(ir), c_ast_time),
+        ('code', 'C AST nodes', count_nodes(c_ast), code_time),
+    ]
+    for phase, unit, count, elapsed in phases:
+        print(f'{phase:10} {count:8} {unit:16} {elapsed * 1000:9.2f}ms {count / elapsed:12,.0f} nodes/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import glob
+import hashlib
+import os
+import shutil
+from yacc import default_cache_dir
+from backend import runtime_sources
+
+# Default upper bound for the size of the compilation cache
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+compiler_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Hash of the compiler sources, computed once per process
+_compiler_version = None
+
+
+def compiler_version():
+    """
+    The compiler is identified by a hash of its own sources, so any change to
+    the compiler invalidates everything it compiled before.
+    """
+    global _compiler_version
+    if _compiler_version is None:
+        h = hashlib.sha256()
+        sources = glob.glob(os.path.join(compiler_dir, '*.py')) + glob.glob(os.path.join(compiler_dir, 'ply', '*.py'))
+        for filename in sorted(sources):
+            if os.path.basename(filename).startswith('test'):
+                continue
+            h.update(os.path.relpath(filename, compiler_dir).encode())
+            with open(filename, 'rb') as f:
+                h.update(f.read())
+        _compiler_version = h.hexdigest()
+    return _compiler_version
+
+
+class CompileCache:
+    """
+    On-disk cache of compiled programs. An entry is keyed by a hash of the
+    source, the optimization flag, the C compiler command line, the compiler
+    version and the runtime, and holds the generated C code, the IR dump and
+    the executable. When the cache grows over max_bytes the least recently
+    used entries are removed.
+    """
+
+    C_FILE = 'code.c'
+    IR_FILE = 'ir.txt'
+    EXECUTABLE = 'executable'
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.path.join(default_cache_dir(), 'compile')
+        self.max_bytes = max_bytes
+
+    def key(self, source: str, opt_on: bool, backend: str = ''):
+        h = self.hasher(opt_on, backend)
+        h.update(source.encode())
+        return h.hexdigest()
+
+    def file_key(self, input_file, opt_on: bool, backend: str = '', chunk_size=1 << 16):
+        """ Same as key() of the file's contents, without reading all of it at once. """
+        h = self.hasher(opt_on, backend)
+        with open(input_file) as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                h.update(chunk.encode())
+        return h.hexdigest()
+
+    def hasher(self, opt_on, backend):
+        h = hashlib.sha256()
+        h.update(compiler_version().encode())
+        for filename in runtime_sources():
+            with open(filename, 'rb') as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        h.update(b'opt_on' if opt_on else b'opt_off')
+        h.update(backend.encode())
+        return h
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key, c, executable, ir_tmp=None):
+        """
+        Copy the cached artifacts to the given paths. Returns the generated C
+        code, or None if the entry is missing.
+        """
+        entry = self.entry_path(key)
+        try:
+            with open(os.path.join(entry, self.C_FILE)) as f:
+                code = f.read()
+            shutil.copyfile(os.path.join(entry, self.C_FILE), c)
+            shutil.copy2(os.path.join(entry, self.EXECUTABLE), executable)
+            if ir_tmp:
+                shutil.copyfile(os.path.join(entry, self.IR_FILE), ir_tmp)
+            # Mark the entry as recently used
+            os.utime(entry)
+        except OSError:
+            # Not cached, or evicted by another process while copying
+            return None
+        return code
+
+    def put(self, key, c, executable, ir_str):
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self.entry_path(key)
+        # Build the entry under a temporary name so readers never see half of it
+        tmp_entry = f'{entry}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        os.makedirs(tmp_entry)
+        shutil.copyfile(c, os.path.join(tmp_entry, self.C_FILE))
+        shutil.copy2(executable, os.path.join(tmp_entry, self.EXECUTABLE))
+        with open(os.path.join(tmp_entry, self.IR_FILE), 'w') as f:
+            f.write(ir_str)
+        try:
+            os.rename(tmp_entry, entry)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self.evict()
+
+    def entries(self):
+        """ Returns (last used time, size, path) of every complete entry. """
+        result = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.tmp') or not os.path.isdir(path):
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                result.append((os.path.getmtime(path), size, path))
+            except OSError:
+                continue
+        return result
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
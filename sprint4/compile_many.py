@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Union
+from backend import add_backend_arguments, backend_from_args
+from compiler import CompilerSession, compiler
+
+# One session per worker process, created by init_worker
+session = None
+
+
+@dataclass
+class CompileOutcome:
+    input_file: str
+    error: Union[str, None]
+    elapsed: float
+    timings: Dict[str, float] = field(default_factory=dict)
+    backend: str = ''
+
+
+def init_worker():
+    global session
+    session = CompilerSession()
+
+
+def compile_file(input_file, opt_on=False, use_cache=True, backend=None):
+    """
+    Compile one program to C and then to an executable next to it. Runs in a
+    worker process and never raises, errors are reported in the outcome.
+    """
+    base = input_file[:-len('.py')]
+    c_file, executable = base + '.c', base
+    start = time.perf_counter()
+    try:
+        result = compiler(input_file, c_file, executable, opt_on=opt_on, session=session, use_cache=use_cache, backend=backend)
+    except Exception as e:
+        return CompileOutcome(input_file, error=str(e) or repr(e), elapsed=time.perf_counter() - start)
+    return CompileOutcome(input_file, error=None, elapsed=time.perf_counter() - start, timings=result.timings, backend=result.backend)
+
+
+def collect_inputs(patterns):
+    """
+    Expand each directory (all .py files directly inside), glob pattern or file
+    name into a sorted list of input files.
+    """
+    inputs = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, '*.py'))
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        inputs.extend(sorted(f for f in matches if f.endswith('.py') and os.path.isfile(f)))
+    # Keep the first occurrence when patterns overlap
+    return list(dict.fromkeys(inputs))
+
+
+def format_outcome(outcome):
+    if outcome.error is None:
+        phases = ' '.join(f'{phase}={t * 1000:.1f}ms' for phase, t in outcome.timings.items())
+        return f'OK    {outcome.elapsed:7.3f}s  {outcome.input_file}  ({phases})  [{outcome.backend}]'
+    first_line = outcome.error.split('\n')[0]
+    return f'FAIL  {outcome.elapsed:7.3f}s  {outcome.input_file}  {first_line}'
+
+
+def compile_many(inputs, jobs=None, opt_on=False, use_cache=True, report=print, backend=None):
+    """
+    Compile all inputs on a pool of worker processes and return the outcomes
+    in the order of the inputs.
+    """
+    outcomes = {}
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(), initializer=init_worker) as executor:
+        futures = [executor.submit(compile_file, input_file, opt_on, use_cache, backend) for input_file in inputs]
+        for future in as_completed(futures):
+            outcome = future.result()
+            outcomes[outcome.input_file] = outcome
+            report(format_outcome(outcome))
+    return [outcomes[input_file] for input_file in inputs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='compile-many', description='Compile many python programs to C and executables in parallel')
+    parser.add_argument('inputs', nargs='+', help='Directories, glob patterns or files to compile')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of worker processes (default: number of cores)')
+    parser.add_argument('-o', '--opt', help='Enable optimization', action='store_true')
+    parser.add_argument('--no-cache', help='Always recompile instead of using the compilation cache', action='store_true')
+    add_backend_arguments(parser)
+    args = parser.parse_args(argv)
+    backend = backend_from_args(args)
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print('No input files found')
+        return 1
+
+    jobs = args.jobs or os.cpu_count()
+    start = time.perf_counter()
+    outcomes = compile_many(inputs, jobs=jobs, opt_on=args.opt, use_cache=not args.no_cache, backend=backend)
+    elapsed = time.perf_counter() - start
+
+    failed = [outcome for outcome in outcomes if outcome.error is not None]
+    print(f'{len(outcomes) - len(failed)} compiled, {len(failed)} failed in {elapsed:.3f}s using {jobs} jobs ({backend.describe()})')
+    for outcome in failed:
+        print(f'Failed: {outcome.input_file}\n{outcome.error}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -1,13 +1,19 @@
 from os import execl
+from dataclasses import dataclass, field
+from typing import List, Dict
+import time
 from yacc import pythonParser
 from type_checker import TypeChecker, SymbolTable
+from symbol_table import generate_builtins_scope
 from ir_gen import IRGen
+from build_cache import CompileCache
+from backend import BackendConfig, compile_program, add_backend_arguments, backend_from_args
 from C_AST_gen import CASTGenerator
 from C_AST import CCodeGenerator
 
 def py_parser():
     p = pythonParser()
-    p.build()
+    p.build(strict_indentation=True)
     return p
 
 def read(filename):
@@ -21,16 +27,12 @@ def write(filename, s):
 def ir_to_str(ir):
     return '\n'.join(repr(ir_line) for ir_line in ir) + '\n'
 
-def remove_comments(input_str):
-    # A dirty but quick way to implement comments
-    return '\n'.join(line for line in input_str.split('\n') if not line.startswith('#'))
+def parse_from_code_to_blocks(input_str, parser=None):
+    return (parser or py_parser()).parse(input_str)
 
-def parse_from_code_to_blocks(input_str):
-    return py_parser().parse(input_str)
-
-def type_check_from_blocks_to_st(blocks):
+def type_check_from_blocks_to_st(blocks, st=None):
     tc = TypeChecker()
-    st = SymbolTable()
+    st = st or SymbolTable()
     for block in blocks:
         tc.typecheck(block, st)
     return st
@@ -40,52 +42,151 @@ def from_blocks_to_ir(blocks):
     ir_generator.generate_IR(blocks)
     return ir_generator.IR
 
-def from_ir_st_to_c(ir, st, opt_on):
-    c_ast_generator = CASTGenerator()
+def from_ir_st_to_c(ir, st, opt_on, builtins=None):
+    c_ast_generator = CASTGenerator(builtins)
     c_ast = c_ast_generator.generate_AST(ir, st)
     c_code_generator = CCodeGenerator()
     c_code_generator.eval_mode = opt_on
     return c_code_generator.generate_code(c_ast)
 
-def compiler(input_file, c, executable, opt_on=False, ir_tmp=None):
-    input_str = read(input_file)
-    input_str = remove_comments(input_str)
-
-    for index, s in enumerate(input_str.split('\n')):
-        if s.startswith(' ') and len(s.strip()) != 0:
-            raise Exception(f"Leading spaces detected at line {index}\nIndentation using spaces are not supported. Did you mean to use tabs?")
-
-    try:
-        blocks = parse_from_code_to_blocks(input_str)
-    except Exception as e:
-        raise Exception("Parser Error: " + e.args[0])
-    try:
-        st = type_check_from_blocks_to_st(blocks)
-    except Exception as e:
-        raise Exception("Type Checker Error: " + e.args[0])
 
+@dataclass
+class CompileResult:
+    blocks: List
+    st: SymbolTable
+    ir: List
+    code: str
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds spent in each phase
+    cached: bool = False  # True if the artifacts were taken from the compilation cache
+    backend: str = ''  # C compiler command line used to build the executable
+
+
+class CompilerSession:
+    """
+    Holds the parts of the compiler that are expensive to set up (the lexer,
+    the parser tables and the builtin functions scope) so that many programs
+    can be compiled one after another. Everything that belongs to a single
+    program is created fresh by compile_source().
+    """
+
+    def __init__(self):
+        self.parser = py_parser()
+        self.builtins = generate_builtins_scope()
+
+    def compile_source(self, input_str, opt_on=False) -> CompileResult:
+        return self.compile_statements(self.parser.parse_stream(input_str.splitlines(True)), opt_on=opt_on)
+
+    def compile_file(self, input_file, opt_on=False) -> CompileResult:
+        """
+        Compile a program while reading it. Each top level statement is type
+        checked and translated to IR as soon as it is parsed, and dropped
+        afterwards, so the AST of the whole program is never in memory.
+        """
+        with open(input_file) as f:
+            return self.compile_statements(self.parser.parse_stream(f), opt_on=opt_on, keep_blocks=False)
+
+    def compile_statements(self, statements, opt_on=False, keep_blocks=True) -> CompileResult:
+        timings = {'parse': 0, 'typecheck': 0, 'ir': 0}
+        blocks = [] if keep_blocks else None
+        tc = TypeChecker()
+        st = SymbolTable(self.builtins)
+        ir_generator = IRGen()
+        statements = iter(statements)
+        while True:
+            start = time.perf_counter()
+            try:
+                block = next(statements, None)
+            except Exception as e:
+                raise Exception("Parser Error: " + e.args[0])
+            start = add_time(timings, 'parse', start)
+            if block is None:
+                break
+            if keep_blocks:
+                blocks.append(block)
+            try:
+                tc.typecheck(block, st)
+            except Exception as e:
+                raise Exception("Type Checker Error: " + e.args[0])
+            start = add_time(timings, 'typecheck', start)
+
+            try:
+                ir_generator.generate(block)
+            except Exception as e:
+                raise Exception("IR Translation Error: ", e.args[0])
+            add_time(timings, 'ir', start)
+
+        start = time.perf_counter()
+        ir = ir_generator.IR
+        try:
+            code = from_ir_st_to_c(ir, st, opt_on=opt_on, builtins=self.builtins)
+        except Exception as e:
+            raise Exception("Unable to generate target: " + e.args[0])
+        record_time(timings, 'c', start)
+
+        return CompileResult(blocks=blocks, st=st, ir=ir, code=code, timings=timings)
+
+
+def add_time(timings, phase, start):
+    now = time.perf_counter()
+    timings[phase] += now - start
+    return now
+
+
+def record_time(timings, phase, start):
+    now = time.perf_counter()
+    timings[phase] = now - start
+    return now
+
+
+default_session = None
+
+def get_default_session():
+    global default_session
+    if default_session is None:
+        default_session = CompilerSession()
+    return default_session
+
+default_cache = None
+
+def get_default_cache():
+    global default_cache
+    if default_cache is None:
+        default_cache = CompileCache()
+    return default_cache
+
+def compiler(input_file, c, executable, opt_on=False, ir_tmp=None, session=None, use_cache=True, backend=None):
+    backend = backend or BackendConfig.for_opt(opt_on)
+    if use_cache:
+        start = time.perf_counter()
+        cache = get_default_cache()
+        key = cache.file_key(input_file, opt_on, backend.describe())
+        code = cache.get(key, c, executable, ir_tmp)
+        if code is not None:
+            timings = {}
+            record_time(timings, 'cache', start)
+            return CompileResult(blocks=None, st=None, ir=None, code=code, timings=timings, cached=True, backend=backend.describe())
+
+    session = session or get_default_session()
+    result = session.compile_file(input_file, opt_on=opt_on)
+    result.backend = backend.describe()
+    ir_str = ir_to_str(result.ir)
+    if ir_tmp: write(ir_tmp, ir_str)
+    write(c, result.code)
+
+    start = time.perf_counter()
     try:
-        ir = from_blocks_to_ir(blocks)
-    except Exception as e:
-        raise Exception("IR Translation Error: ", e.args[0])
-    if ir_tmp: write(ir_tmp, ir_to_str(ir))
-    try:
-        code = from_ir_st_to_c(ir, st, opt_on=opt_on)
-    except Exception as e:
-        raise Exception("Unable to generate target: " + e.args[0])
-
-    write(c, code)
-
-    try:
-        check_if_code_compiles(c, executable)
+        check_if_code_compiles(c, executable, backend)
     except Exception as e:
         raise Exception("Unable to compile output: ", e)
+    record_time(result.timings, 'cc', start)
 
+    if use_cache:
+        cache.put(key, c, executable, ir_str)
+    return result
 
-def check_if_code_compiles(filename, output):
-    import subprocess
-    proc = subprocess.run(f'gcc {filename} -o {output}', shell=True, stdout=subprocess.PIPE, universal_newlines=True)
-    assert proc.returncode == 0, f"gcc return code was {proc.returncode}\n{proc.stderr}"
+
+def check_if_code_compiles(filename, output, backend=None):
+    compile_program(filename, output, backend)
 
 
 def execute_program(filename, input=""):
@@ -99,7 +200,10 @@ if __name__ == '__main__':
     parser.add_argument('input', help='The python program to compile')
     parser.add_argument('-o', '--opt', help='Enable optimization', action='store_true')
     parser.add_argument('-r', '--run', help='Run the code if successfully compiled', action='store_true')
+    parser.add_argument('--no-cache', help='Always recompile instead of using the compilation cache', action='store_true')
+    add_backend_arguments(parser)
     args = parser.parse_args()
+    backend = backend_from_args(args)
 
     name = args.input
     input_file = f'./playground/{name}.py'
@@ -110,20 +214,12 @@ if __name__ == '__main__':
     print(f"Compiling {input_file} to {c_file}. Optimization: {'on' if args.opt else 'off'}")
 
     try:
-        compiler(input_file, c_file, output_file, opt_on=args.opt, ir_tmp=ir_tmp_file)
+        result = compiler(input_file, c_file, output_file, opt_on=args.opt, ir_tmp=ir_tmp_file, use_cache=not args.no_cache, backend=backend)
     except Exception as e:
         raise
     else:
         print('Successfully compiled to C code')
-
-    try:
-        check_if_code_compiles(c_file, output_file)
-    except Exception as e:
-        print('Unable to compile the output c code to executable')
-        print(e)
-        exit(1)
-    else:
-        print('Successfully compiled to executable')
+        print(f'Successfully compiled to executable with: {result.backend}')
 
     if args.run:
         print('Running the program now...')
@@ -0,0 +1,115 @@
+"""
+Constant folding over typed operands. The optimizer of the C code generator
+folds the operations whose operands are known: Python ints, floats and bools.
+An operation is folded the way the C program would compute it for the C type
+of its result. int_t is a long long, so ints wrap around on overflow, / rounds
+towards zero and % has the sign of the dividend. None means the operation is
+not folded and is left to the program, e.g. a division by zero.
+"""
+
+import math
+import operator
+
+INT_MIN = -2 ** 63
+INT_MAX = 2 ** 63 - 1
+
+_COMPARISONS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+_ARITHMETIC = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+}
+
+
+def is_constant(value):
+    return isinstance(value, (bool, int, float))
+
+
+def to_int(value) -> int:
+    """ The int_t value of value, floats are truncated and ints wrap around like in C. """
+    return (int(value) - INT_MIN) % 2 ** 64 + INT_MIN
+
+
+def c_literal(value) -> str:
+    """ The C code of a folded value, anything else is already C code. """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value == INT_MIN and isinstance(value, int):
+        # -9223372036854775808 negates 9223372036854775808, which does not fit in a long long
+        return f'({INT_MIN + 1} - 1)'
+    return str(value)
+
+
+def _convert(type_t, value):
+    if type_t == 'int_t':
+        return to_int(value)
+    if type_t == 'float_t':
+        return float(value)
+    if type_t == 'bool_t':
+        return bool(value)
+    return None
+
+
+def _divide(a: int, b: int) -> int:
+    quotient = abs(a) // abs(b)
+    return -quotient if (a < 0) != (b < 0) else quotient
+
+
+def _fold_int(op, a: int, b: int):
+    if op in _ARITHMETIC:
+        return to_int(_ARITHMETIC[op](a, b))
+    if op in ('/', '%') and b == 0:
+        return None
+    if op == '/':
+        return to_int(_divide(a, b))
+    if op == '%':
+        return to_int(a - b * _divide(a, b))
+    if op == '^':
+        return to_int(a ^ b)
+    return None
+
+
+def _fold_float(op, a: float, b: float):
+    if op in _ARITHMETIC:
+        result = _ARITHMETIC[op](a, b)
+    elif op == '/' and b != 0:
+        result = a / b
+    else:
+        return None
+    # inf and nan have no literal in C
+    return result if math.isfinite(result) else None
+
+
+def fold_binary(type_t, op, a, b):
+    """ The value of `a op b` for an operation of C type type_t, op being a C operator. """
+    if not (is_constant(a) and is_constant(b)):
+        return None
+    if op in _COMPARISONS:
+        return _convert(type_t, _COMPARISONS[op](a, b))
+    if op == '&&':
+        return _convert(type_t, bool(a) and bool(b))
+    if op == '||':
+        return _convert(type_t, bool(a) or bool(b))
+    if type_t == 'int_t':
+        return _fold_int(op, to_int(a), to_int(b))
+    if type_t == 'float_t':
+        return _fold_float(op, float(a), float(b))
+    return None
+
+
+def fold_unary(type_t, op, a):
+    """ The value of `op a` for an operation of C type type_t. """
+    if not is_constant(a):
+        return None
+    if op == '!':
+        return _convert(type_t, not a)
+    if op == '-':
+        return _convert(type_t, -a)
+    return None
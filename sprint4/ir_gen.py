@@ -1,9 +1,11 @@
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass
 from typing import Union
+import struct
+import sys
 import AST
-
-# self.cond_label_stack = []
-# self.cond_label_idx_stack = []
+from visitor import Visitor
 
 
 @dataclass
@@ -123,12 +125,6 @@ class IR_LoopStep:
 
 @dataclass
 class IR_String:
-    reg: int
-    length: int
-
-
-@dataclass
-class IR_String_char:
     reg: int
     val: str
 
@@ -184,13 +180,293 @@ class IR_NonPrimitiveSlicing:
     start_reg: Union[str,None]
     end_reg: Union[str,None]
 
-class IRGen:
+# The IR of a program is kept in an IRCode. Instead of a list of the objects
+# above, every instruction is an opcode and a fixed number of operands, each
+# in its own array. Registers are stored as their number, and every other
+# string (variable names, operators, labels) as its index in a table shared
+# by the whole program, so an instruction takes 17 bytes however long the
+# names are. Instructions are turned back into the objects above when read.
+
+# How a field of an instruction is stored in its operand column
+REG = 0    # register ("_t<n>_") or variable name, or None
+STR = 1    # operator, label or function name, index in the string table
+INT = 2    # count, stored as it is
+CONST = 3  # literal value, index in the constant table
+GOTO = 4   # IR_Goto, stored as the index of its label in the string table
+ID = 5     # AST.Id, stored as the index of its name in the string table
+
+# The position of an instruction in this list is its opcode. New instructions
+# go at the end, and IR_FORMAT_VERSION changes when existing ones change.
+INSTRUCTIONS = [
+    (IR_Label, (STR,)),
+    (IR_Goto, (STR,)),
+    (IR_PrimitiveLiteral, (REG, CONST)),
+    (IR_BinaryOperation, (REG, REG, REG, STR)),
+    (IR_UnaryOperation, (REG, STR, REG)),
+    (IR_PushParam, (REG,)),
+    (IR_PopParam, (REG,)),
+    (IR_FunctionCall, (STR, REG)),
+    (IR_FunctionReturn, (REG,)),
+    (IR_ReturnStmt, (REG,)),
+    (IR_IfStmt, (GOTO, REG)),
+    (IR_ElifStmt, (GOTO, REG)),
+    (IR_Assignment, (REG, REG)),
+    (IR_List, (REG, STR, INT)),
+    (IR_List_VAL, (REG,)),
+    (IR_LoopStart, (REG, REG)),
+    (IR_LoopStop, (REG, REG)),
+    (IR_LoopStep, (REG, REG)),
+    (IR_String, (REG, CONST)),
+    (IR_Parameter, (REG, INT)),
+    (IR_Parameter_VAL, (REG, ID)),
+    (IR_Argument, (REG, REG, INT)),
+    (IR_Argument_VAL, (REG,)),
+    (IR_GetLength, (REG, REG)),
+    (IR_LstAdd, (REG, REG, CONST)),
+    (IR_NonPrimitiveIndex, (REG, REG, REG)),
+    (IR_ForLoopVar, (REG,)),
+    (IR_NonPrimitiveSlicing, (REG, REG, REG, REG)),
+]
+OPCODES = {cls: opcode for opcode, (cls, kinds) in enumerate(INSTRUCTIONS)}
+FIELDS = [[field for field in cls.__dataclass_fields__] for cls, kinds in INSTRUCTIONS]
+OPERAND_COLUMNS = max(len(kinds) for cls, kinds in INSTRUCTIONS)
+
+# Operand of a REG field that is None, names are stored below it
+NO_REG = -1
+
+IR_MAGIC = b'PCIR'
+IR_FORMAT_VERSION = 2
+IR_HEADER = struct.Struct('<4sHIII')  # magic, version, instructions, strings, constants
+IR_LENGTH = struct.Struct('<I')
+
+
+class IRCode:
     def __init__(self):
-        self.IR = []
+        self.opcodes = array('B')
+        self.operands = [array('i') for _ in range(OPERAND_COLUMNS)]
+        # (list, {value: index}) pairs
+        self.strings = ([], {})
+        self.constants = ([], {})
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __iter__(self):
+        for i in range(len(self.opcodes)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        cls, kinds = INSTRUCTIONS[self.opcodes[i]]
+        decode = self.decode
+        return cls(*[decode(kind, column[i]) for kind, column in zip(kinds, self.operands)])
+
+    def __eq__(self, other):
+        if not isinstance(other, IRCode):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f'IRCode({list(self)!r})'
+
+    def append(self, instruction):
+        opcode = OPCODES[instruction.__class__]
+        kinds = INSTRUCTIONS[opcode][1]
+        self.opcodes.append(opcode)
+        operands = self.operands
+        for column, field in enumerate(FIELDS[opcode]):
+            operands[column].append(self.encode(kinds[column], getattr(instruction, field)))
+        for column in range(len(kinds), OPERAND_COLUMNS):
+            operands[column].append(0)
+
+    def pop(self):
+        """ Remove the last instruction and return it. """
+        instruction = self[-1]
+        self.opcodes.pop()
+        for column in self.operands:
+            column.pop()
+        return instruction
+
+    def encode(self, kind, value):
+        if kind == REG:
+            if value is None:
+                return NO_REG
+            number = value[2:-1]
+            if value.startswith('_t') and value.endswith('_') and number.isdigit() and str(int(number)) == number:
+                return int(number)
+            return NO_REG - 1 - self.index(self.strings, value, value)
+        if kind == INT:
+            return value
+        if kind == CONST:
+            # 1, 1.0 and True are different literals, and so are 0.0 and -0.0
+            return self.index(self.constants, (value.__class__, value.hex() if isinstance(value, float) else value), value)
+        if kind == GOTO:
+            value = value.label
+        elif kind == ID:
+            value = value.name
+        return self.index(self.strings, value, value)
+
+    def decode(self, kind, operand):
+        if kind == REG:
+            if operand >= 0:
+                return "_t{}_".format(operand)
+            if operand == NO_REG:
+                return None
+            return self.strings[0][NO_REG - 1 - operand]
+        if kind == INT:
+            return operand
+        if kind == CONST:
+            return self.constants[0][operand]
+        value = self.strings[0][operand]
+        if kind == GOTO:
+            return IR_Goto(value)
+        if kind == ID:
+            return AST.Id(value)
+        return value
+
+    def positions(self, cls):
+        """ Indices of all the instructions of a class, in order. """
+        opcode = OPCODES[cls]
+        return [i for i, op in enumerate(self.opcodes) if op == opcode]
+
+    def labels(self):
+        """ Index of every label in the code, by label. """
+        strings, values = self.strings[0], self.operands[0]
+        return {strings[values[i]]: i for i in self.positions(IR_Label)}
+
+    @staticmethod
+    def index(table, key, value):
+        values, indices = table
+        i = indices.get(key)
+        if i is None:
+            i = indices[key] = len(values)
+            values.append(value)
+        return i
+
+    def write(self, f):
+        """ Write the code to a binary file. """
+        strings, constants = self.strings[0], self.constants[0]
+        f.write(IR_HEADER.pack(IR_MAGIC, IR_FORMAT_VERSION, len(self), len(strings), len(constants)))
+        for column in [self.opcodes] + self.operands:
+            if sys.byteorder == 'big':
+                column = array(column.typecode, column)
+                column.byteswap()
+            column.tofile(f)
+        for value in strings:
+            write_string(f, value)
+        for value in constants:
+            tag, text = encode_constant(value)
+            f.write(tag)
+            write_string(f, text)
+
+    @classmethod
+    def read(cls, f):
+        """ Read code written with write() from a binary file. """
+        magic, version, length, string_count, constant_count = IR_HEADER.unpack(f.read(IR_HEADER.size))
+        if magic != IR_MAGIC or version != IR_FORMAT_VERSION:
+            raise ValueError(f'Not an IR file of version {IR_FORMAT_VERSION}')
+        code = cls()
+        for column in [code.opcodes] + code.operands:
+            column.fromfile(f, length)
+            if sys.byteorder == 'big':
+                column.byteswap()
+        for _ in range(string_count):
+            value = read_string(f)
+            cls.index(code.strings, value, value)
+        for _ in range(constant_count):
+            value = decode_constant(f.read(1), read_string(f))
+            cls.index(code.constants, (value.__class__, value.hex() if isinstance(value, float) else value), value)
+        return code
+
+
+class IRCursor:
+    """
+    Reads an IRCode from the front, like a deque that is only ever popped on
+    the left, but without moving the instructions that are left. Labels and
+    elifs are indexed up front so that looking for the next one does not
+    scan the code.
+    """
+
+    def __init__(self, code):
+        if not isinstance(code, IRCode):
+            instructions, code = code, IRCode()
+            for instruction in instructions:
+                code.append(instruction)
+        self.code = code
+        self.pos = 0
+        self.end = len(code)
+        self.label_index = code.labels()
+        self.elif_positions = code.positions(IR_ElifStmt)
+
+    def __bool__(self):
+        return self.pos < self.end
+
+    def __len__(self):
+        return self.end - self.pos
+
+    def popleft(self):
+        if self.pos >= self.end:
+            raise IndexError('pop from an empty IR cursor')
+        instruction = self.code[self.pos]
+        self.pos += 1
+        return instruction
+
+    def peek(self, offset=0):
+        """ The instruction offset places after the next one. """
+        return self.code[self.pos + offset]
+
+    def find_label(self, label):
+        """ Offset from the next instruction to a label that has not been read yet. """
+        return self.label_index[label] - self.pos
+
+    def find_elif(self, offset=0):
+        """ Offset from the next instruction to the first IR_ElifStmt at offset or after, None if there is none. """
+        i = bisect_left(self.elif_positions, self.pos + offset)
+        if i == len(self.elif_positions):
+            return None
+        return self.elif_positions[i] - self.pos
+
+
+def write_string(f, s):
+    data = s.encode('utf-8')
+    f.write(IR_LENGTH.pack(len(data)))
+    f.write(data)
+
+
+def read_string(f):
+    length, = IR_LENGTH.unpack(f.read(IR_LENGTH.size))
+    return f.read(length).decode('utf-8')
+
+
+def encode_constant(value):
+    # bool before int, True is an int too
+    if isinstance(value, bool):
+        return b'b', str(value)
+    if isinstance(value, int):
+        return b'i', str(value)
+    if isinstance(value, float):
+        return b'f', value.hex()
+    if isinstance(value, str):
+        return b's', value
+    raise ValueError(f'Cannot write constant {value!r}')
+
+
+def decode_constant(tag, text):
+    if tag == b'b':
+        return text == 'True'
+    if tag == b'i':
+        return int(text)
+    if tag == b'f':
+        return float.fromhex(text)
+    if tag == b's':
+        return text
+    raise ValueError(f'Unknown constant tag {tag!r}')
+
+
+class IRGen(Visitor, prefix='gen_'):
+    def __init__(self):
+        self.IR = IRCode()
         self.register_count = 0
         self.label_count = 0
-        self.cond_label_stack = []
-        self.cond_label_idx_stack = []
 
 
     def generate_IR(self, nodes):
@@ -199,8 +475,7 @@ class IRGen:
         return self.IR
 
     def generate(self, node):
-        method = 'gen_' + node.__class__.__name__
-        return getattr(self, method)(node)
+        return self.methods[node.__class__](self, node)
 
     def add_code(self, code):
         self.IR.append(code)
@@ -340,10 +615,8 @@ class IRGen:
     def gen_PrimitiveLiteral(self, node: AST.PrimitiveLiteral):
         prim_reg = self.inc_register()
         if node.name == "str":
-            self.add_code(IR_String(reg=prim_reg, length=len(node.value)))
-            for c in node.value:
-                string_reg = self.inc_register()
-                self.add_code(IR_String_char(reg=string_reg, val=c))
+            # The value goes into the constant table, equal literals share it
+            self.add_code(IR_String(reg=prim_reg, val=node.value))
         else:
             self.add_code(IR_PrimitiveLiteral(reg=prim_reg, val=node.value))
         return prim_reg
@@ -380,54 +653,44 @@ class IRGen:
         cond = self.generate(node.ifCond)
 
         fbranch_label = self.inc_label()
-        self.cond_label_stack.append(self.inc_label())  # record the
+        end_label = self.inc_label()
 
         # Skip to the false_body if the condition is not met
         self.add_code(IR_IfStmt(if_false=IR_Goto(fbranch_label), cond_reg=cond))
         for stmt in node.body.lst:
             self.generate(stmt)
         # End of true body
-        self.add_code(IR_Goto(self.cond_label_stack[-1]))
+        self.add_code(IR_Goto(end_label))
 
         # mark false and true labels
-        # record the idx of true label for elif and else insertion
         # it is possible that false label has no content
         self.mark_label(fbranch_label)
-        self.cond_label_idx_stack.append(len(self.IR))
-        self.mark_label(self.cond_label_stack[-1])
+        self.mark_label(end_label)
+
+    def pop_end_label(self):
+        # An elif or else comes right after the if or elif before it, which
+        # ends with the label at the end of the whole if. It is taken off, the
+        # elif or else is emitted in its place and the label is put back.
+        end_label = self.IR.pop()
+        assert isinstance(end_label, IR_Label), f"elif or else without an if, got {end_label}"
+        return end_label
 
     def gen_ElifStmt(self, node: AST.ElifStmt):
-        # copy the whole IR to make sure that
-        # subsequent conditional stmts are in place
-        ir_copy = self.IR[:]
-        # reset IR
-        self.IR = []
+        end_label = self.pop_end_label()
         cond = self.generate(node.elifCond)
         fbranch_label = self.inc_label()
         self.add_code(IR_ElifStmt(elif_false=IR_Goto(fbranch_label), cond_reg=cond))
         for stmt in node.body.lst:
             self.generate(stmt)
-        self.add_code(IR_Goto(self.cond_label_stack[-1]))
+        self.add_code(IR_Goto(end_label.value))
         self.mark_label(fbranch_label)
-        len_elif = len(self.IR)
-        # insert elif IR
-        self.IR = ir_copy[:self.cond_label_idx_stack[-1]] + self.IR + ir_copy[self.cond_label_idx_stack[-1]:]
-        # update the true label index
-        self.cond_label_idx_stack[-1] += len_elif
+        self.add_code(end_label)
 
     def gen_ElseStmt(self, node: AST.ElseStmt):
-        # copy the whole IR to make sure that
-        # subsequent conditional stmts are in place
-        ir_copy = self.IR[:]
-        # reset IR
-        self.IR = []
+        end_label = self.pop_end_label()
         for stmt in node.body.lst:
             self.generate(stmt)
-        # insert else IR
-        self.IR = ir_copy[:self.cond_label_idx_stack[-1]] + self.IR + ir_copy[self.cond_label_idx_stack[-1]:]
-        # pop cond_label and cond_label_idx
-        self.cond_label_idx_stack.pop(-1)
-        self.cond_label_stack.pop(-1)
+        self.add_code(end_label)
 
     def gen_LstAppend(self, node: AST.LstAppend):
         obj_reg = self.generate(node.obj)
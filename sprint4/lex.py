@@ -1,4 +1,7 @@
 import argparse
+import operator
+import os
+import re
 from ply import lex
 
 reserved = {
@@ -52,6 +55,18 @@ tokens = [
     'DOT'
 ] + list(reserved.values())
 
+
+def default_cache_dir():
+    # Generated files (e.g. the lexer and parser tables) are kept here so they
+    # can be reused by later runs. Can be overridden with the PCC_CACHE_DIR variable.
+    return os.environ.get('PCC_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+
+# Lines without code followed by the indentation of the next line. They are
+# skipped entirely so they never produce tokens, only the tabs are counted.
+LINE_START = r'(?:[ \t]*(?:\#[^\n]*)?\n)*\t*'
+LINE_START_RE = re.compile(LINE_START)
+
 class pythonLexer():
     t_PLUS = r'\+'
     t_MINUS = r'-'
@@ -73,24 +88,26 @@ class pythonLexer():
     t_COLON = r':'
     t_DOT = r'\.'
     t_ignore_COMMENT = r'\#.*'
-    t_ignore = ' '
+    t_ignore = ' \t'
     literals = "!@-`~\\|/{}?'\""
 
-    #keeps track number of tabs for each line number
-    tab_list = []
-    # lexLineNo[0] is the current line number
-    # lexLineNo[1] is the line number after counting newline
-    lexLineNo = [1,1]
-
+    def __init__(self, strict_indentation=False):
+        # Reject lines indented with spaces instead of ignoring the spaces
+        self.strict_indentation = strict_indentation
+        #keeps track number of tabs for each line number
+        self.tab_counts = {}
+        # lexLineNo[0] is the current line number
+        # lexLineNo[1] is the line number after counting newline
+        self.lexLineNo = [1,1]
+
+    # Rules decorated with @lex.VALUE or @lex.KEYWORDS have no code: the lexer
+    # converts the value with the given converter, or looks the type up in the
+    # given mapping, and never calls the function. Change the decorator to
+    # change what the rule does.
+
+    @lex.VALUE('True'.__eq__)
     def t_BOOL(self,t):
         r'(True)|(False)'
-        if t.value == 'True':
-            t.value = True
-        elif t.value == 'False':
-            t.value = False
-        else:
-            assert False
-        return t
 
     def t_NOTEQUAL(self,t):
         r'\!='
@@ -108,37 +125,38 @@ class pythonLexer():
         r'(not)|!'
         return t
 
-    # NOT HANDLE ESCAPE STRING YET
+    # NOT HANDLE ESCAPE STRING YET, the value is the text between the quotes
+    @lex.VALUE(operator.itemgetter(slice(1, -1)))
     def t_STRING(self,t):
         r'("(?:\\.|[^"\\])*")|(\'(?:\\.|[^\'\\])*\')'
-        t.value = str(t.value[1:-1])
-        return t
 
+    @lex.VALUE(float)
     def t_FLOAT(self,t):
         r'-?(([1-9]\d*)|(0))\.\d*'
-        t.value = float(t.value)
-        return t
 
+    @lex.VALUE(int)
     def t_INTEGER(self,t):
         r'-?(([1-9]\d*)|0)'
-        t.value = int(t.value)
-        return t
 
+    @lex.KEYWORDS(reserved)
     def t_ID(self,t):
         r'[a-zA-Z_][a-zA-Z_0-9]*'
-        t.type = reserved.get(t.value, 'ID')  # Check for reserved words
-        return t
 
+    @lex.TOKEN(r'\n' + LINE_START)
     def t_NEWLINE(self,t):
-        r'\n+'
-        t.lexer.lineno += len(t.value)
-        self.lexLineNo[1] = t.lexer.lineno
+        # Blank and comment lines are part of the newline before them, and
+        # the tabs after it are the indentation of the next line
+        lexer, value = t.lexer, t.value
+        lexer.lineno += value.count('\n')
+        self.lexLineNo[1] = lexer.lineno
+        # Same as startLine, inlined since this runs for every line
+        tabs = len(value) - len(value.rstrip('\t'))
+        if tabs:
+            self.tab_counts[lexer.lineno] = tabs
+        elif self.strict_indentation:
+            self.startLine(lexer, value)
         return t
 
-    def t_TAB(self, t):
-        r'\t+'
-        self.tab_list.append([t.lexer.lineno, len(t.value)])
-
     def t_FUNCTIONANNOTATION(self, t):
         r'(-\>)'
         return t
@@ -148,21 +166,49 @@ class pythonLexer():
         print("Illegal character '%s'" % t.value[0])
         t.lexer.skip(1)
 
+    def startLine(self, lexer, skipped):
+        # Called at the start of every line with code, after its indentation
+        tabs = len(skipped) - len(skipped.rstrip('\t'))
+        if tabs:
+            self.tab_counts[lexer.lineno] = tabs
+        elif self.strict_indentation:
+            data, pos = lexer.lexdata, lexer.lexpos
+            if pos < len(data) and data[pos] == ' ':
+                end = data.find('\n', pos)
+                if data[pos:end if end != -1 else len(data)].strip():
+                    raise Exception(f"Leading spaces detected at line {lexer.lineno}\nIndentation using spaces are not supported. Did you mean to use tabs?")
+
+    def input(self, data):
+        self.lexer.input(data)
+        # Skip the blank and comment lines before the first line with code
+        skipped = LINE_START_RE.match(data).group()
+        self.lexer.lexpos = len(skipped)
+        self.lexer.lineno += skipped.count('\n')
+        self.lexLineNo = [self.lexer.lineno, self.lexer.lineno]
+        self.startLine(self.lexer, skipped)
+
     def getTabCount(self, lineNo):
-        for i in self.tab_list:
-            if i[0] == lineNo:
-                return i[1]
-        return 0
+        return self.tab_counts.get(lineNo, 0)
 
     def clearTabCount(self):
-        self.tab_list.clear()
+        self.tab_counts.clear()
 
-    def build(self, **kwargs):
+    def build(self, cache_dir=None, **kwargs):
         self.tokens = tokens
-        self.lexer = lex.lex(module=self, **kwargs)
+        # The dispatch tables are written to cache_dir/lextab.py and reused as
+        # long as the rules stay the same
+        self.lexer = lex.lex(module=self, optimize=True, outputdir=cache_dir or default_cache_dir(), **kwargs)
+
+    def clone(self):
+        # A lexer sharing the compiled rules of this one but with its own state
+        other = pythonLexer(self.strict_indentation)
+        other.tokens = self.tokens
+        other.lexer = self.lexer.clone(other)
+        other.lexer.lineno = 1
+        return other
 
     def test(self, data):
-        self.lexer.input(data)
+        self.input(data)
         result = []
         while True:
             tok = self.lexer.token()
@@ -39,6 +39,13 @@ import types
 import copy
 import os
 import inspect
+import hashlib
+import importlib.util
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:     # Python < 3.11
+    import sre_parse, sre_constants
 
 # This tuple contains acceptable string types
 StringTypes = (str, bytes)
@@ -101,6 +108,10 @@ class Lexer:
         self.lexstatere = {}          # Dictionary mapping lexer states to master regexs
         self.lexstateretext = {}      # Dictionary mapping lexer states to regex strings
         self.lexstaterenames = {}     # Dictionary mapping lexer states to symbol names
+        self.lexstatedispatch = {}    # Dictionary mapping lexer states to dispatch tables
+        self.lexdispatch = {}         # Master regexs to try for each first character
+        self.lexstatechars = {}       # Dictionary mapping lexer states to single character tokens
+        self.lexchars = {}            # Token types of characters that are always a token by themselves
         self.lexstate = 'INITIAL'     # Current lexer state
         self.lexstatestack = []       # Stack of lexer states
         self.lexstateinfo = None      # State information
@@ -121,29 +132,39 @@ class Lexer:
 
     def clone(self, object=None):
         c = copy.copy(self)
+        # The clone gets its own generator of tokens when it is first used
+        c.__dict__.pop('token', None)
 
         # If the object parameter has been supplied, it means we are attaching the
         # lexer to a new object.  In this case, we have to rebind all methods in
         # the lexstatere and lexstateerrorf tables.
 
         if object:
-            newtab = {}
-            for key, ritem in self.lexstatere.items():
-                newre = []
-                for cre, findex in ritem:
-                    newfindex = []
-                    for f in findex:
-                        if not f or not f[0]:
-                            newfindex.append(f)
-                            continue
-                        newfindex.append((getattr(object, f[0].__name__), f[1]))
-                newre.append((cre, newfindex))
-                newtab[key] = newre
-            c.lexstatere = newtab
+            rebound = {}
+            def rebind(ritem):
+                # Dispatch tables share their regexs, rebind each list only once
+                if id(ritem) not in rebound:
+                    newre = []
+                    for cre, findex in ritem:
+                        newfindex = []
+                        for f in findex:
+                            if not f or not f[0]:
+                                newfindex.append(f)
+                                continue
+                            newfindex.append((getattr(object, f[0].__name__),) + f[1:])
+                        newre.append((cre, newfindex))
+                    rebound[id(ritem)] = newre
+                return rebound[id(ritem)]
+
+            c.lexstatere = {key: rebind(ritem) for key, ritem in self.lexstatere.items()}
+            c.lexstatedispatch = {key: {ch: rebind(ritem) for ch, ritem in dispatch.items()}
+                                  for key, dispatch in self.lexstatedispatch.items()}
             c.lexstateerrorf = {}
             for key, ef in self.lexstateerrorf.items():
                 c.lexstateerrorf[key] = getattr(object, ef.__name__)
             c.lexmodule = object
+            # Pick up the rebound rules for the current state
+            c.begin(c.lexstate)
         return c
 
     # ------------------------------------------------------------
@@ -153,6 +174,7 @@ class Lexer:
         self.lexdata = s
         self.lexpos = 0
         self.lexlen = len(s)
+        self.token = self.scan().__next__
 
     # ------------------------------------------------------------
     # begin() - Changes the lexing state
@@ -162,6 +184,8 @@ class Lexer:
             raise ValueError(f'Undefined state {state!r}')
         self.lexre = self.lexstatere[state]
         self.lexretext = self.lexstateretext[state]
+        self.lexdispatch = self.lexstatedispatch.get(state, {})
+        self.lexchars = self.lexstatechars.get(state, {})
         self.lexignore = self.lexstateignore.get(state, '')
         self.lexerrorf = self.lexstateerrorf.get(state, None)
         self.lexeoff = self.lexstateeoff.get(state, None)
@@ -195,113 +219,172 @@ class Lexer:
     # ------------------------------------------------------------
     # token() - Return the next token from the Lexer
     #
+    # Tokens are produced by the generator from scan().  input() stores its
+    # __next__ as the token attribute of the lexer, so getting a token resumes
+    # the generator instead of calling a function that has to load all the
+    # lexer state first.  This method is only reached when there is no such
+    # generator (before input() or after the end of the input), it starts one
+    # at the current position.
+    # ------------------------------------------------------------
+    def token(self):
+        self.token = self.scan().__next__
+        return self.token()
+
+    # ------------------------------------------------------------
+    # scan() - Generator of the tokens from the current position
+    #
     # Note: This function has been carefully implemented to be as fast
     # as possible.  Don't make changes unless you really know what
-    # you are doing
+    # you are doing.  The position is reloaded after every token, in case
+    # it was changed with skip(), and so is the state after begin().
     # ------------------------------------------------------------
-    def token(self):
+    def scan(self):
         # Make local copies of frequently referenced attributes
-        lexpos    = self.lexpos
+        lexdata   = self.lexdata
         lexlen    = self.lexlen
+        lexpos    = self.lexpos
+        lexstate  = self.lexstate
         lexignore = self.lexignore
-        lexdata   = self.lexdata
-
-        while lexpos < lexlen:
-            # This code provides some short-circuit code for whitespace, tabs, and other ignored characters
-            if lexdata[lexpos] in lexignore:
-                lexpos += 1
-                continue
+        lexdispatch = self.lexdispatch
+        lexchars  = self.lexchars
+
+        while True:
+            while lexpos < lexlen:
+                # This code provides some short-circuit code for whitespace, tabs, and other ignored characters
+                c = lexdata[lexpos]
+                if c in lexignore:
+                    lexpos += 1
+                    continue
 
-            # Look for a regular expression match
-            for lexre, lexindexfunc in self.lexre:
-                m = lexre.match(lexdata, lexpos)
-                if not m:
+                # Characters that are always a token by themselves
+                if c in lexchars:
+                    tok = LexToken()
+                    tok.value = c
+                    tok.type = lexchars[c]
+                    tok.lineno = self.lineno
+                    tok.lexpos = lexpos
+                    self.lexpos = lexpos + 1
+                    yield tok
+                    lexpos = self.lexpos
+                    if self.lexstate != lexstate:
+                        break
                     continue
 
-                # Create a token for return
-                tok = LexToken()
-                tok.value = m.group()
-                tok.lineno = self.lineno
-                tok.lexpos = lexpos
+                # Look for a regular expression match. Only the rules that can start
+                # with the current character are tried, if it is in the dispatch table.
+                for lexre, lexindexfunc in lexdispatch.get(c, self.lexre):
+                    m = lexre.match(lexdata, lexpos)
+                    if not m:
+                        continue
 
-                i = m.lastindex
-                func, tok.type = lexindexfunc[i]
+                    # Create a token for return
+                    tok = LexToken()
+                    tok.value = value = m.group()
+                    tok.lineno = self.lineno
+                    tok.lexpos = lexpos
 
-                if not func:
-                    # If no token type was set, it's an ignored token
-                    if tok.type:
-                        self.lexpos = m.end()
-                        return tok
-                    else:
-                        lexpos = m.end()
+                    i = m.lastindex
+                    func, tok.type, keywords, convert = lexindexfunc[i]
+
+                    if not func:
+                        # If no token type was set, it's an ignored token
+                        if tok.type:
+                            if keywords is not None:
+                                tok.type = keywords.get(value, tok.type)
+                            elif convert is not None:
+                                tok.value = convert(value)
+                            self.lexpos = m.end()
+                            yield tok
+                            lexpos = self.lexpos
+                        else:
+                            lexpos = m.end()
                         break
 
-                lexpos = m.end()
+                    # If token is processed by a function, call it
 
-                # If token is processed by a function, call it
+                    tok.lexer = self      # Set additional attributes useful in token rules
+                    self.lexmatch = m
+                    self.lexpos = m.end()
+                    newtok = func(tok)
+                    del tok.lexer
+                    del self.lexmatch
 
-                tok.lexer = self      # Set additional attributes useful in token rules
-                self.lexmatch = m
-                self.lexpos = lexpos
-                newtok = func(tok)
-                del tok.lexer
-                del self.lexmatch
-
-                # Every function must return a token, if nothing, we just move to next token
-                if not newtok:
-                    lexpos    = self.lexpos         # This is here in case user has updated lexpos.
-                    lexignore = self.lexignore      # This is here in case there was a state change
+                    # Every function must return a token, if nothing, we just move to next token
+                    if newtok:
+                        yield newtok
+                    lexpos = self.lexpos        # This is here in case user has updated lexpos.
                     break
-                return newtok
-            else:
-                # No match, see if in literals
-                if lexdata[lexpos] in self.lexliterals:
-                    tok = LexToken()
-                    tok.value = lexdata[lexpos]
-                    tok.lineno = self.lineno
-                    tok.type = tok.value
-                    tok.lexpos = lexpos
-                    self.lexpos = lexpos + 1
-                    return tok
+                else:
+                    # No match, see if in literals
+                    if lexdata[lexpos] in self.lexliterals:
+                        tok = LexToken()
+                        tok.value = lexdata[lexpos]
+                        tok.lineno = self.lineno
+                        tok.type = tok.value
+                        tok.lexpos = lexpos
+                        self.lexpos = lexpos + 1
+                        yield tok
+                        lexpos = self.lexpos
+
+                    # No match. Call t_error() if defined.
+                    elif self.lexerrorf:
+                        tok = LexToken()
+                        tok.value = self.lexdata[lexpos:]
+                        tok.lineno = self.lineno
+                        tok.type = 'error'
+                        tok.lexer = self
+                        tok.lexpos = lexpos
+                        self.lexpos = lexpos
+                        newtok = self.lexerrorf(tok)
+                        if lexpos == self.lexpos:
+                            # Error method didn't change text position at all. This is an error.
+                            raise LexError(f"Scanning error. Illegal character {lexdata[lexpos]!r}",
+                                           lexdata[lexpos:])
+                        if newtok:
+                            yield newtok
+                        lexpos = self.lexpos
 
-                # No match. Call t_error() if defined.
-                if self.lexerrorf:
-                    tok = LexToken()
-                    tok.value = self.lexdata[lexpos:]
-                    tok.lineno = self.lineno
-                    tok.type = 'error'
-                    tok.lexer = self
-                    tok.lexpos = lexpos
-                    self.lexpos = lexpos
-                    newtok = self.lexerrorf(tok)
-                    if lexpos == self.lexpos:
-                        # Error method didn't change text position at all. This is an error.
-                        raise LexError(f"Scanning error. Illegal character {lexdata[lexpos]!r}",
+                    else:
+                        self.lexpos = lexpos
+                        raise LexError(f"Illegal character {lexdata[lexpos]!r} at index {lexpos}",
                                        lexdata[lexpos:])
-                    lexpos = self.lexpos
-                    if not newtok:
-                        continue
-                    return newtok
 
+                # This is here in case there was a state change
+                if self.lexstate != lexstate:
+                    break
+
+            if lexpos < lexlen:
+                lexstate  = self.lexstate
+                lexignore = self.lexignore
+                lexdispatch = self.lexdispatch
+                lexchars  = self.lexchars
+                continue
+
+            if self.lexeoff:
+                tok = LexToken()
+                tok.type = 'eof'
+                tok.value = ''
+                tok.lineno = self.lineno
+                tok.lexpos = lexpos
+                tok.lexer = self
                 self.lexpos = lexpos
-                raise LexError(f"Illegal character {lexdata[lexpos]!r} at index {lexpos}",
-                               lexdata[lexpos:])
-
-        if self.lexeoff:
-            tok = LexToken()
-            tok.type = 'eof'
-            tok.value = ''
-            tok.lineno = self.lineno
-            tok.lexpos = lexpos
-            tok.lexer = self
-            self.lexpos = lexpos
-            newtok = self.lexeoff(tok)
-            return newtok
-
-        self.lexpos = lexpos + 1
-        if self.lexdata is None:
-            raise RuntimeError('No input string given with input()')
-        return None
+                newtok = self.lexeoff(tok)
+                yield newtok
+                # The eof rule may have given more input
+                lexdata = self.lexdata
+                lexlen  = self.lexlen
+                lexpos  = self.lexpos
+                continue
+
+            self.lexpos = lexpos + 1
+            if self.lexdata is None:
+                raise RuntimeError('No input string given with input()')
+            # The lexer refers to this generator and the generator to the lexer,
+            # dropping the first reference frees both without the garbage collector.
+            # Another call to token() starts scanning again.
+            self.__dict__.pop('token', None)
+            yield None
+            lexpos = self.lexpos
 
     # Iterator interface
     def __iter__(self):
@@ -361,14 +444,20 @@ def _form_master_re(relist, reflags, ldict, toknames):
         for f, i in lexre.groupindex.items():
             handle = ldict.get(f, None)
             if type(handle) in (types.FunctionType, types.MethodType):
-                lexindexfunc[i] = (handle, toknames[f])
+                keywords = getattr(handle, 'keywords', None)
+                convert = getattr(handle, 'convert', None)
+                if keywords is not None or convert is not None:
+                    # The function only sets the type or value, which the lexer does itself
+                    lexindexfunc[i] = (None, toknames[f], keywords, convert)
+                else:
+                    lexindexfunc[i] = (handle, toknames[f], None, None)
                 lexindexnames[i] = f
             elif handle is not None:
                 lexindexnames[i] = f
                 if f.find('ignore_') > 0:
-                    lexindexfunc[i] = (None, None)
+                    lexindexfunc[i] = (None, None, None, None)
                 else:
-                    lexindexfunc[i] = (None, toknames[f])
+                    lexindexfunc[i] = (None, toknames[f], None, None)
 
         return [(lexre, lexindexfunc)], [regex], [lexindexnames]
     except Exception:
@@ -403,6 +492,168 @@ def _statetoken(s, names):
     return (states, tokenname)
 
 
+# -----------------------------------------------------------------------------
+#                           === Dispatch tables ===
+#
+# Trying every rule of the master regex at each position is slow when there
+# are many rules.  Most rules can only start with a few characters, so for
+# every ASCII character a smaller master regex is built from the rules that
+# can start with it.  The rules keep their order, so the first rule that
+# matches is the same as with the full master regex.
+# -----------------------------------------------------------------------------
+
+_dispatch_chars = [chr(i) for i in range(128)]
+
+_category_res = {
+    sre_constants.CATEGORY_DIGIT: re.compile(r'\d'),
+    sre_constants.CATEGORY_NOT_DIGIT: re.compile(r'\D'),
+    sre_constants.CATEGORY_SPACE: re.compile(r'\s'),
+    sre_constants.CATEGORY_NOT_SPACE: re.compile(r'\S'),
+    sre_constants.CATEGORY_WORD: re.compile(r'\w'),
+    sre_constants.CATEGORY_NOT_WORD: re.compile(r'\W'),
+}
+
+# Returns the set of characters a match of the regex can start with, or None
+# if any character can (including when the regex can match the empty string
+# or uses something the analysis does not understand)
+def _first_chars(regex, reflags):
+    if reflags & re.IGNORECASE:
+        return None
+    try:
+        first, nullable = _first_of_sequence(sre_parse.parse(regex, reflags))
+    except Exception:
+        return None
+    return None if nullable else first
+
+def _first_of_sequence(items):
+    result = set()
+    for op, av in items:
+        first, nullable = _first_of_item(op, av)
+        if first is None:
+            return None, True
+        result |= first
+        if not nullable:
+            return result, False
+    return result, True
+
+def _first_of_item(op, av):
+    if op is sre_constants.LITERAL:
+        return {chr(av)}, False
+    if op is sre_constants.NOT_LITERAL:
+        return set(_dispatch_chars) - {chr(av)}, False
+    if op is sre_constants.ANY:
+        return set(_dispatch_chars), False
+    if op is sre_constants.IN:
+        return _first_of_charset(av), False
+    if op is sre_constants.AT:
+        return set(), True
+    if op is sre_constants.SUBPATTERN:
+        group, add_flags, del_flags, p = av
+        if add_flags & re.IGNORECASE:
+            return None, True
+        return _first_of_sequence(p)
+    if op is sre_constants.BRANCH:
+        result, nullable = set(), False
+        for p in av[1]:
+            first, n = _first_of_sequence(p)
+            if first is None:
+                return None, True
+            result |= first
+            nullable = nullable or n
+        return result, nullable
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+              getattr(sre_constants, 'POSSESSIVE_REPEAT', None)):
+        lo, hi, p = av
+        first, nullable = _first_of_sequence(p)
+        return first, nullable or lo == 0
+    return None, True
+
+def _first_of_charset(items):
+    chars = set()
+    negate = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_constants.RANGE:
+            chars.update(_dispatch_chars[av[0]:av[1] + 1])
+        elif op is sre_constants.CATEGORY and av in _category_res:
+            chars.update(c for c in _dispatch_chars if _category_res[av].match(c))
+        else:
+            return None
+    return set(_dispatch_chars) - chars if negate else chars
+
+# For every ASCII character, the indices of the rules that can start with it.
+# Also returns the characters that only a rule matching exactly that character
+# can start with, the lexer turns them into tokens without using a regex.
+def _dispatch_indices(regexs, reflags):
+    firsts = [_first_chars(r, reflags) for r in regexs]
+    indices = {c: tuple(i for i, first in enumerate(firsts) if first is None or c in first)
+               for c in _dispatch_chars}
+    singles = {}
+    for c, rules in indices.items():
+        if len(rules) == 1 and not reflags & re.IGNORECASE:
+            try:
+                parsed = list(sre_parse.parse(regexs[rules[0]], reflags))
+            except Exception:
+                continue
+            if parsed == [(sre_constants.LITERAL, ord(c))]:
+                singles[c] = rules[0]
+    return indices, singles
+
+def _form_dispatch(relist, indices, reflags, ldict, toknames):
+    masters = {}
+    dispatch = {}
+    for c, rules in indices.items():
+        if rules not in masters:
+            masters[rules] = _form_master_re([relist[i] for i in rules], reflags, ldict, toknames)[0]
+        dispatch[c] = masters[rules]
+    return dispatch
+
+# -----------------------------------------------------------------------------
+#                           === Table module support ===
+#
+# Working out the dispatch tables and validating the rules is only needed when
+# the rules change.  With optimize, the dispatch tables are written to a Python
+# module (lextab) together with a signature of the rules, and later builds with
+# the same rules load them instead of validating the rules again.
+# -----------------------------------------------------------------------------
+
+__tabversion__ = '2022.1'
+
+def lex_signature(linfo):
+    rules = {state: ([(fname, _get_regex(f)) for fname, f in linfo.funcsym[state]], linfo.strsym[state])
+             for state in linfo.stateinfo}
+    signature = repr((list(linfo.tokens), linfo.literals, linfo.stateinfo, rules, linfo.ignore,
+                      sorted(linfo.errorf), sorted(linfo.eoff), linfo.reflags))
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+def read_lextab(tabfile, signature):
+    if not os.path.exists(tabfile):
+        return None
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(tabfile))[0], tabfile)
+    lextab = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lextab)
+    if getattr(lextab, '_tabversion', None) != __tabversion__:
+        return None
+    if getattr(lextab, '_lexsignature', None) != signature:
+        return None
+    return lextab._lexstatedispatch
+
+def write_lextab(tabfile, signature, statedispatch):
+    os.makedirs(os.path.dirname(tabfile) or '.', exist_ok=True)
+    # Write to a temporary file first so that concurrent readers never see a
+    # partially written table module
+    tmpfile = '%s.%d.tmp' % (tabfile, os.getpid())
+    with open(tmpfile, 'w') as f:
+        f.write('# %s\n' % os.path.basename(tabfile))
+        f.write('# This file is automatically generated. Do not edit.\n')
+        f.write('_tabversion = %r\n' % __tabversion__)
+        f.write('_lexsignature = %r\n' % signature)
+        f.write('_lexstatedispatch = %r\n' % statedispatch)
+    os.replace(tmpfile, tabfile)
+
 # -----------------------------------------------------------------------------
 # LexerReflect()
 #
@@ -715,7 +966,8 @@ class LexerReflect(object):
 # Build all of the regular expression rules from definitions in the supplied module
 # -----------------------------------------------------------------------------
 def lex(*, module=None, object=None, debug=False,
-        reflags=int(re.VERBOSE), debuglog=None, errorlog=None):
+        reflags=int(re.VERBOSE), debuglog=None, errorlog=None,
+        optimize=False, lextab='lextab', outputdir=None):
 
     global lexer
 
@@ -748,7 +1000,19 @@ def lex(*, module=None, object=None, debug=False,
     # Collect parser information from the dictionary
     linfo = LexerReflect(ldict, log=errorlog, reflags=reflags)
     linfo.get_all()
-    if linfo.validate_all():
+
+    # Try to reuse the dispatch tables from a previous run, the rules were
+    # validated when they were written
+    statedispatch = None
+    signature = lex_signature(linfo) if optimize and not linfo.error else None
+    tabfile = os.path.join(outputdir or '.', lextab + '.py')
+    if signature:
+        try:
+            statedispatch = read_lextab(tabfile, signature)
+        except Exception as e:
+            errorlog.warning('There was a problem loading the table file: %r', e)
+
+    if statedispatch is None and linfo.validate_all():
         raise SyntaxError("Can't build lexer")
 
     # Dump some basic debugging information
@@ -792,6 +1056,28 @@ def lex(*, module=None, object=None, debug=False,
 
         regexs[state] = regex_list
 
+    # Inclusive states also use the rules of the INITIAL state, they are
+    # matched without dispatch tables
+    if statedispatch is None:
+        statedispatch = {}
+        for state, stype in stateinfo.items():
+            if state == 'INITIAL' or stype == 'exclusive':
+                rule_regexs = [_get_regex(f) for _, f in linfo.funcsym[state]] + [r for _, r in linfo.strsym[state]]
+                statedispatch[state] = _dispatch_indices(rule_regexs, reflags)
+        if signature:
+            try:
+                write_lextab(tabfile, signature, statedispatch)
+            except IOError as e:
+                errorlog.warning("Couldn't write lextab module %r. %s" % (tabfile, e))
+
+    for state, (indices, singles) in statedispatch.items():
+        lexobj.lexstatedispatch[state] = _form_dispatch(regexs[state], indices, reflags, ldict, linfo.toknames)
+        # Only simple rules (strings that are not ignored) can skip the regex
+        names = [fname for fname, _ in linfo.funcsym[state]] + [name for name, _ in linfo.strsym[state]]
+        nfuncs = len(linfo.funcsym[state])
+        lexobj.lexstatechars[state] = {c: linfo.toknames[names[i]] for c, i in singles.items()
+                                       if i >= nfuncs and names[i].find('ignore_') < 0}
+
     # Build the master regular expressions
 
     if debug:
@@ -816,6 +1102,8 @@ def lex(*, module=None, object=None, debug=False,
     lexobj.lexstateinfo = stateinfo
     lexobj.lexre = lexobj.lexstatere['INITIAL']
     lexobj.lexretext = lexobj.lexstateretext['INITIAL']
+    lexobj.lexdispatch = lexobj.lexstatedispatch.get('INITIAL', {})
+    lexobj.lexchars = lexobj.lexstatechars.get('INITIAL', {})
     lexobj.lexreflags = reflags
 
     # Set up ignore variables
@@ -884,6 +1172,34 @@ def runmain(lexer=None, data=None):
             break
         sys.stdout.write(f'({tok.type},{tok.value!r},{tok.lineno},{tok.lexpos})\n')
 
+# -----------------------------------------------------------------------------
+# @KEYWORDS(mapping)
+#
+# This decorator marks a rule whose function only looks up the token type of
+# the matched text in a dictionary (e.g. reserved words).  The lexer does the
+# lookup itself, with the rule's name as default, and never calls the function.
+# -----------------------------------------------------------------------------
+
+def KEYWORDS(mapping):
+    def set_keywords(f):
+        f.keywords = mapping
+        return f
+    return set_keywords
+
+# -----------------------------------------------------------------------------
+# @VALUE(convert)
+#
+# This decorator marks a rule whose function only converts the matched text to
+# the token value.  The lexer sets the value to convert(text) itself and never
+# calls the function.  Using a builtin (e.g. int) avoids any Python level call.
+# -----------------------------------------------------------------------------
+
+def VALUE(convert):
+    def set_convert(f):
+        f.convert = convert
+        return f
+    return set_convert
+
 # -----------------------------------------------------------------------------
 # @TOKEN(regex)
 #
@@ -64,7 +64,10 @@
 import re
 import types
 import sys
+import os
 import inspect
+import hashlib
+import importlib.util
 
 #-----------------------------------------------------------------------------
 #                     === User configurable parameters ===
@@ -76,6 +79,7 @@ yaccdebug   = False            # Debugging mode.  If set, yacc generates a
                                # a 'parser.out' file in the current directory
 
 debug_file  = 'parser.out'     # Default name of the debugging file
+tab_module  = 'parsetab'       # Default name of the table module
 error_count = 3                # Number of symbols that must be shifted to leave recovery mode
 resultlimit = 40               # Size limit of results when running in debug mode.
 
@@ -1300,6 +1304,83 @@ def traverse(x, N, stack, F, X, R, FP):
 class LALRError(YaccError):
     pass
 
+# -----------------------------------------------------------------------------
+#                          === Table module support ===
+#
+# The LALR tables only depend on the grammar, so they can be written out to a
+# Python module (parsetab) and loaded again by later processes.  A table module
+# is only used if the signature stored in it matches the signature of the
+# grammar being built.  Otherwise the tables are regenerated and rewritten.
+# -----------------------------------------------------------------------------
+
+__tabversion__ = '2022.1'
+
+# This class is a stand-in for Production when the tables are read back from a
+# table module.  It only carries the information needed by LRParser.
+class MiniProduction(object):
+    def __init__(self, str, name, len, func, file, line):
+        self.name     = name
+        self.len      = len
+        self.func     = func
+        self.callable = None
+        self.file     = file
+        self.line     = line
+        self.str      = str
+
+    def __str__(self):
+        return self.str
+
+    def __repr__(self):
+        return 'MiniProduction(%s)' % self.str
+
+    # Bind the production function name to a callable
+    def bind(self, pdict):
+        if self.func:
+            self.callable = pdict[self.func]
+
+class LRTableModule(object):
+    def __init__(self, action, goto, productions):
+        self.lr_action      = action
+        self.lr_goto        = goto
+        self.lr_productions = productions
+
+    def bind_callables(self, pdict):
+        for p in self.lr_productions:
+            p.bind(pdict)
+
+def table_signature(signature):
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+def read_table(tabfile, signature):
+    if not os.path.exists(tabfile):
+        return None
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(tabfile))[0], tabfile)
+    parsetab = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(parsetab)
+    if getattr(parsetab, '_tabversion', None) != __tabversion__:
+        return None
+    if getattr(parsetab, '_lr_signature', None) != table_signature(signature):
+        return None
+    productions = [MiniProduction(*p) for p in parsetab._lr_productions]
+    return LRTableModule(parsetab._lr_action, parsetab._lr_goto, productions)
+
+def write_table(lr, tabfile, signature):
+    os.makedirs(os.path.dirname(tabfile) or '.', exist_ok=True)
+    productions = [(p.str, p.name, p.len, p.func, os.path.basename(p.file), p.line)
+                   for p in lr.lr_productions]
+    # Write to a temporary file first so that concurrent readers never see a
+    # partially written table module
+    tmpfile = '%s.%d.tmp' % (tabfile, os.getpid())
+    with open(tmpfile, 'w') as f:
+        f.write('# %s\n' % os.path.basename(tabfile))
+        f.write('# This file is automatically generated. Do not edit.\n')
+        f.write('_tabversion = %r\n' % __tabversion__)
+        f.write('_lr_signature = %r\n' % table_signature(signature))
+        f.write('_lr_action = %r\n' % lr.lr_action)
+        f.write('_lr_goto = %r\n' % lr.lr_goto)
+        f.write('_lr_productions = %r\n' % productions)
+    os.replace(tmpfile, tabfile)
+
 
 # -----------------------------------------------------------------------------
 #                             == LRTable ==
@@ -2270,7 +2351,8 @@ class ParserReflect(object):
 
 def yacc(*, debug=yaccdebug, module=None, start=None,
          check_recursion=True, optimize=False, debugfile=debug_file,
-         debuglog=None, errorlog=None):
+         debuglog=None, errorlog=None, write_tables=False, tabmodule=tab_module,
+         outputdir=None):
 
     # Reference to the parsing method of the last built parser
     global parse
@@ -2303,6 +2385,20 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
     if pinfo.error:
         raise YaccError('Unable to build parser')
 
+    # Try to reuse the tables from a previous run
+    signature = pinfo.signature()
+    tabfile = os.path.join(outputdir or '.', tabmodule + '.py')
+    if write_tables and not debug:
+        try:
+            lr = read_table(tabfile, signature)
+            if lr:
+                lr.bind_callables(pinfo.pdict)
+                parser = LRParser(lr, pinfo.error_func)
+                parse = parser.parse
+                return parser
+        except Exception as e:
+            errorlog.warning('There was a problem loading the table file: %r', e)
+
     if debuglog is None:
         if debug:
             try:
@@ -2474,6 +2570,12 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
                 errorlog.warning('Rule (%s) is never reduced', rejected)
                 warned_never.append(rejected)
 
+    if write_tables:
+        try:
+            write_table(lr, tabfile, signature)
+        except IOError as e:
+            errorlog.warning("Couldn't create %r. %s" % (tabfile, e))
+
     # Build the parser
     lr.bind_callables(pinfo.pdict)
     parser = LRParser(lr, pinfo.error_func)
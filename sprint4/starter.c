@@ -1,55 +1,207 @@
-#include <stdio.h>
-#include <stdlib.h>
-#include <stdarg.h>
-#include <stdbool.h>
-#include <string.h>
-
-#define NONE_LITERAL 42
-#define MAX_ALLOCATED_OBJ_COUNT 256
-#define MAX_STR_LEN 99999
-
-typedef double float_t;
-typedef long long int_t;
-typedef char *str_t;
-typedef int bool_t;
-typedef int none_t;
-typedef struct list list_t;
-typedef union data data_t;
-
-struct list
-{
-  data_t *data;
-  int_t length;
-  int_t uninitialized_length;
+#include "starter.h"
+
+/***** Memory *****/
+
+// Every block starts with a header that records its size class and region
+typedef struct block block_t;
+struct block
+{
+  size_t size;
+  region_t *region;
+  block_t *prev; // links large blocks of the region, or free blocks of a size class
+  block_t *next;
 };
 
-union data
+typedef struct chunk chunk_t;
+struct chunk
 {
-  int_t int_v;
-  float_t float_v;
-  str_t str_v;
-  bool_t bool_v;
-  none_t none_v;
-  list_t list_v;
+  chunk_t *next;
+  size_t size;
+  size_t used;
 };
 
-str_t *allocated_str[MAX_ALLOCATED_OBJ_COUNT];
-int allocated_str_count = 0;
+#define BLOCK_HEADER_SIZE sizeof(block_t)
+#define CHUNK_HEADER_SIZE ((sizeof(chunk_t) + 15) & ~(size_t)15)
+#define MIN_CHUNK_SIZE (64 * 1024)
+#define MAX_CHUNK_SIZE (4 * 1024 * 1024)
 
-list_t *allocated_list[MAX_ALLOCATED_OBJ_COUNT];
-int allocated_list_count = 0;
+region_t str_region = {0};
+region_t list_region = {0};
 
-str_t allocate_str(int length)
+int_t heap_bytes = 0;
+int_t heap_peak_bytes = 0;
+int_t heap_allocations = 0;
+int_t heap_limit = 0;
+bool_t heap_report_stats = false;
+
+void heap_init(int_t max_bytes, bool_t report_stats)
 {
-  if (allocated_str_count == MAX_ALLOCATED_OBJ_COUNT)
+  heap_limit = max_bytes;
+  heap_report_stats = report_stats;
+}
+
+static void *heap_check(void *ptr)
+{
+  if (ptr == NULL)
   {
-    printf("Out of memory for string\n");
+    printf("Out of memory\n");
     exit(1);
   }
-  str_t str = (str_t)malloc(length);
-  allocated_str[allocated_str_count] = &str;
-  allocated_str_count++;
-  return str;
+  return ptr;
+}
+
+static int size_class(size_t size)
+{
+  int cls = 0;
+  while (((size_t)MIN_BLOCK_SIZE << cls) < size)
+    cls++;
+  return cls;
+}
+
+static block_t *region_bump(region_t *region, size_t size)
+{
+  chunk_t *chunk = region->chunks;
+  if (chunk == NULL || chunk->size - chunk->used < size)
+  {
+    // Chunks double in size so that the number of chunks stays logarithmic
+    size_t chunk_size = chunk == NULL ? MIN_CHUNK_SIZE : chunk->size * 2;
+    if (chunk_size > MAX_CHUNK_SIZE)
+      chunk_size = MAX_CHUNK_SIZE;
+    chunk = heap_check(malloc(chunk_size));
+    chunk->next = region->chunks;
+    chunk->size = chunk_size;
+    chunk->used = CHUNK_HEADER_SIZE;
+    region->chunks = chunk;
+  }
+  block_t *block = (block_t *)((char *)chunk + chunk->used);
+  chunk->used += size;
+  return block;
+}
+
+void *heap_alloc(region_t *region, size_t size)
+{
+  size_t block_size = size + BLOCK_HEADER_SIZE;
+  block_t *block;
+  if (block_size <= MAX_SMALL_BLOCK_SIZE)
+  {
+    int cls = size_class(block_size);
+    block_size = (size_t)MIN_BLOCK_SIZE << cls;
+    block = region->free[cls];
+    if (block != NULL)
+      region->free[cls] = block->next;
+    else
+      block = region_bump(region, block_size);
+  }
+  else
+  {
+    block = heap_check(malloc(block_size));
+    block->prev = NULL;
+    block->next = region->large;
+    if (region->large != NULL)
+      region->large->prev = block;
+    region->large = block;
+  }
+  if (heap_limit != 0 && heap_bytes + (int_t)block_size > heap_limit)
+  {
+    printf("RUNTIME ERROR: Heap limit of %lld bytes exceeded\n", heap_limit);
+    exit(1);
+  }
+  block->size = block_size;
+  block->region = region;
+  region->bytes += block_size;
+  heap_bytes += block_size;
+  heap_allocations++;
+  if (heap_bytes > heap_peak_bytes)
+    heap_peak_bytes = heap_bytes;
+  return (char *)block + BLOCK_HEADER_SIZE;
+}
+
+void heap_free(void *ptr)
+{
+  if (ptr == NULL)
+    return;
+  block_t *block = (block_t *)((char *)ptr - BLOCK_HEADER_SIZE);
+  region_t *region = block->region;
+  region->bytes -= block->size;
+  heap_bytes -= block->size;
+  if (block->size <= MAX_SMALL_BLOCK_SIZE)
+  {
+    int cls = size_class(block->size);
+    block->next = region->free[cls];
+    region->free[cls] = block;
+  }
+  else
+  {
+    if (block->prev != NULL)
+      block->prev->next = block->next;
+    else
+      region->large = block->next;
+    if (block->next != NULL)
+      block->next->prev = block->prev;
+    free(block);
+  }
+}
+
+void *heap_realloc(region_t *region, void *ptr, size_t size)
+{
+  if (ptr == NULL)
+    return heap_alloc(region, size);
+  block_t *block = (block_t *)((char *)ptr - BLOCK_HEADER_SIZE);
+  size_t old_size = block->size - BLOCK_HEADER_SIZE;
+  if (size <= old_size)
+    return ptr;
+  void *new_ptr = heap_alloc(region, size);
+  memcpy(new_ptr, ptr, old_size);
+  heap_free(ptr);
+  return new_ptr;
+}
+
+// Release everything allocated in the region at once
+void heap_release(region_t *region)
+{
+  while (region->chunks != NULL)
+  {
+    chunk_t *next = region->chunks->next;
+    free(region->chunks);
+    region->chunks = next;
+  }
+  while (region->large != NULL)
+  {
+    block_t *next = region->large->next;
+    free(region->large);
+    region->large = next;
+  }
+  memset(region->free, 0, sizeof(region->free));
+  heap_bytes -= region->bytes;
+  region->bytes = 0;
+}
+
+void heap_stats()
+{
+  fprintf(stderr, "heap: %lld allocations, peak %lld bytes, %lld bytes in use\n", heap_allocations, heap_peak_bytes, heap_bytes);
+}
+
+/***** Strings *****/
+
+// The string literals of the program live in one static array, they are
+// shared by every variable that holds them and are never freed
+static uintptr_t str_pool_start = 0;
+static uintptr_t str_pool_size = 0;
+
+void str_pool_init(char *pool, size_t size)
+{
+  str_pool_start = (uintptr_t)pool;
+  str_pool_size = size;
+}
+
+static bool_t is_str_literal(str_t str)
+{
+  return (uintptr_t)str - str_pool_start < str_pool_size;
+}
+
+str_t allocate_str(int length)
+{
+  return heap_alloc(&str_region, length);
 }
 
 str_t str_init(char *str)
@@ -70,25 +222,39 @@ str_t str_concat(str_t str1, str_t str2)
   return new_str;
 }
 
+void str_free(str_t str)
+{
+  if (!is_str_literal(str))
+    heap_free(str);
+}
+
+// Store a new value into a variable that owns its string, freeing the old one
+str_t str_reassign(str_t old, str_t new)
+{
+  if (old != new && !is_str_literal(old))
+    heap_free(old);
+  return new;
+}
+
+int print_str_and_free(str_t str)
+{
+  print_internal(1, 's', str);
+  heap_free(str);
+  return 0;
+}
+
 void str_clean_up()
 {
-  for (int i = 0; i < allocated_str_count; i++)
-  {
-    free(allocated_str[i]);
-  }
+  heap_release(&str_region);
 }
 
+/***** Lists *****/
+
 list_t *list_init(int_t length)
 {
-  list_t *list = malloc(sizeof(data_t));
-  list->data = malloc(length * sizeof(void *));
-  if (allocated_list_count == MAX_ALLOCATED_OBJ_COUNT)
-  {
-    printf("Out of memory for list\n");
-    exit(1);
-  }
-  allocated_list[allocated_list_count] = list;
-  allocated_list_count++;
+  list_t *list = heap_alloc(&list_region, sizeof(list_t));
+  list->data = length == 0 ? NULL : heap_alloc(&list_region, length * sizeof(data_t));
+  list->capacity = length;
   list->length = length;
   list->uninitialized_length = length;
   return list;
@@ -106,6 +272,18 @@ void list_init_add_internal(list_t *list, data_t value)
   list->uninitialized_length--;
 }
 
+// Capacity grows geometrically so that appending n elements is O(n)
+static void list_grow(list_t *list, int_t min_capacity)
+{
+  int_t capacity = list->capacity * 2;
+  if (capacity < MIN_LIST_CAPACITY)
+    capacity = MIN_LIST_CAPACITY;
+  if (capacity < min_capacity)
+    capacity = min_capacity;
+  list->data = heap_realloc(&list_region, list->data, capacity * sizeof(data_t));
+  list->capacity = capacity;
+}
+
 void list_add_internal(list_t *list, data_t value)
 {
   if (list->uninitialized_length != 0)
@@ -114,26 +292,43 @@ void list_add_internal(list_t *list, data_t value)
     exit(1);
   }
 
+  if (list->length == list->capacity)
+  {
+    list_grow(list, list->length + 1);
+  }
+  list->data[list->length] = value;
   list->length++;
-  list->data = realloc(list->data, list->length * sizeof(data_t));
-  data_t *addr = list->data + list->length - 1;
-  *addr = value;
+}
+
+// Make room for at least `additional` more elements without reallocating
+void list_reserve(list_t *list, int_t additional)
+{
+  if (list->length + additional > list->capacity)
+  {
+    list_grow(list, list->length + additional);
+  }
 }
 
 void list_free(list_t *list)
 {
   if (list == NULL)
     return;
-  free(list->data);
-  free(list);
+  heap_free(list->data);
+  heap_free(list);
+}
+
+list_t *list_reassign(list_t *old, list_t *new)
+{
+  if (old != new)
+    list_free(old);
+  return new;
 }
 
 void list_clean_up()
 {
-  for (int i = 0; i < allocated_list_count; i++)
-  {
-    list_free(allocated_list[i]);
-  }
+  heap_release(&list_region);
+  if (heap_report_stats)
+    heap_stats();
 }
 
 data_t list_get_internal(list_t *list, int_t index)
@@ -279,30 +474,3 @@ int print_internal(int items_count, ...)
   va_end(valist);
   return 0;
 }
-
-#define list_get(vname, list, index) \
-  list_get_internal(list, index).vname
-
-#define list_init_add(vname, list, value) \
-  list_init_add_internal(list, (data_t){.vname = value})
-
-#define list_add(vname, list, value) \
-  list_add_internal(list, (data_t){.vname = value})
-
-#define input(vname, prompt) \
-  input_internal(prompt, #vname[0]).vname
-
-#define input_int() input(int_v, "Enter a number")
-#define input_float() input(float_v, "Enter a number")
-#define input_bool() input(int_v, "Enter 0 or 1")
-#define input_str() input(str_v, "Enter a string")
-
-#define input_int_s(X) input(int_v, X)
-#define input_float_s(X) input(float_v, X)
-#define input_bool_s(X) input(int_v, X)
-#define input_str_s(X) input(str_v, X)
-
-#define print_int(X) print_internal(1, 'i', X)
-#define print_float(X) print_internal(1, 'f', X)
-#define print_bool(X) print_internal(1, 'b', X)
-#define print_str(X) print_internal(1, 's', X)
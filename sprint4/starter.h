@@ -0,0 +1,123 @@
+#ifndef STARTER_H
+#define STARTER_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdarg.h>
+#include <stdbool.h>
+#include <string.h>
+#include <stdint.h>
+
+#define NONE_LITERAL 42
+#define MAX_STR_LEN 99999
+#define MIN_LIST_CAPACITY 8
+
+// Blocks up to MAX_SMALL_BLOCK_SIZE come from chunks of the region and are
+// recycled through free lists per power of two size class
+#define MIN_BLOCK_SIZE 32
+#define SIZE_CLASS_COUNT 8
+#define MAX_SMALL_BLOCK_SIZE (MIN_BLOCK_SIZE << (SIZE_CLASS_COUNT - 1))
+
+// Set by the backend with -D, 0 means no limit
+#ifndef MAX_HEAP_BYTES
+#define MAX_HEAP_BYTES 0
+#endif
+#ifndef HEAP_STATS
+#define HEAP_STATS 0
+#endif
+
+typedef double float_t;
+typedef long long int_t;
+typedef char *str_t;
+typedef int bool_t;
+typedef int none_t;
+typedef struct list list_t;
+typedef union data data_t;
+typedef struct region region_t;
+
+struct region
+{
+  struct chunk *chunks;
+  struct block *free[SIZE_CLASS_COUNT];
+  struct block *large;
+  int_t bytes;
+};
+
+struct list
+{
+  data_t *data;
+  int_t length;
+  int_t capacity;
+  int_t uninitialized_length;
+};
+
+union data
+{
+  int_t int_v;
+  float_t float_v;
+  str_t str_v;
+  bool_t bool_v;
+  none_t none_v;
+  list_t *list_v;
+};
+
+void heap_init(int_t max_bytes, bool_t report_stats);
+void *heap_alloc(region_t *region, size_t size);
+void heap_free(void *ptr);
+void *heap_realloc(region_t *region, void *ptr, size_t size);
+void heap_release(region_t *region);
+void heap_stats();
+
+str_t allocate_str(int length);
+void str_pool_init(char *pool, size_t size);
+str_t str_init(char *str);
+str_t str_concat(str_t str1, str_t str2);
+void str_free(str_t str);
+str_t str_reassign(str_t old, str_t new);
+int print_str_and_free(str_t str);
+void str_clean_up();
+
+list_t *list_init(int_t length);
+void list_init_add_internal(list_t *list, data_t value);
+void list_add_internal(list_t *list, data_t value);
+void list_reserve(list_t *list, int_t additional);
+void list_free(list_t *list);
+list_t *list_reassign(list_t *old, list_t *new);
+void list_clean_up();
+data_t list_get_internal(list_t *list, int_t index);
+list_t *list_slice(list_t *list, int_t start, int_t end);
+
+void input_helper_invalid_input();
+data_t input_internal(char *prompt, char type);
+int print_internal(int items_count, ...);
+
+#define runtime_init() heap_init(MAX_HEAP_BYTES, HEAP_STATS)
+
+#define list_get(vname, list, index) \
+  list_get_internal(list, index).vname
+
+#define list_init_add(vname, list, value) \
+  list_init_add_internal(list, (data_t){.vname = value})
+
+#define list_add(vname, list, value) \
+  list_add_internal(list, (data_t){.vname = value})
+
+#define input(vname, prompt) \
+  input_internal(prompt, #vname[0]).vname
+
+#define input_int() input(int_v, "Enter a number")
+#define input_float() input(float_v, "Enter a number")
+#define input_bool() input(int_v, "Enter 0 or 1")
+#define input_str() input(str_v, "Enter a string")
+
+#define input_int_s(X) input(int_v, X)
+#define input_float_s(X) input(float_v, X)
+#define input_bool_s(X) input(int_v, X)
+#define input_str_s(X) input(str_v, X)
+
+#define print_int(X) print_internal(1, 'i', X)
+#define print_float(X) print_internal(1, 'f', X)
+#define print_bool(X) print_internal(1, 'b', X)
+#define print_str(X) print_internal(1, 's', X)
+
+#endif
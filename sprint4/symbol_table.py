@@ -1,10 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from AST import Type as A_Type
 from C_AST import Type as C_Type
-from typing import Union, List
-from AST import ParameterLst, PrimitiveType
-from copy import deepcopy
-import random
+from typing import Union, List, Dict, Tuple
+from AST import ParameterLst
+from type_table import primitive_type, to_c_type, STR, NONE
+from types import MappingProxyType
 
 class ParseError(Exception): pass
 
@@ -24,9 +24,38 @@ class C_Function():
     param_types: List[Union[A_Type,C_Type]]
     return_type: Union[Union[A_Type,C_Type], None]
 
+def signature(param_types):
+    """
+    The key of a parameter list in the overload index. Types are frozen
+    dataclasses, so the key hashes and compares them by value.
+    """
+    return tuple(param_types)
+
 @dataclass
 class Functions():
     functions: List[Union[Function, C_Function]]
+    # Overloads by signature and by parameter names, the first declared one wins
+    by_signature: Dict[Tuple, Union[Function, C_Function]] = field(default_factory=dict, repr=False, compare=False)
+    by_param_names: Dict[Tuple, Function] = field(default_factory=dict, repr=False, compare=False)
+
+    def __post_init__(self):
+        for f in self.functions:
+            self.index(f)
+
+    def index(self, f: Union[Function, C_Function]):
+        self.by_signature.setdefault(signature(f.param_types), f)
+        if isinstance(f, Function):
+            self.by_param_names.setdefault(tuple(f.param_names), f)
+
+    def add(self, f: Union[Function, C_Function]):
+        self.functions.append(f)
+        self.index(f)
+
+    def find(self, param_types):
+        return self.by_signature.get(signature(param_types))
+
+    def find_by_param_names(self, param_names):
+        return self.by_param_names.get(tuple(param_names))
 
 
 def generate_global_functions_for_typechecking():
@@ -34,130 +63,199 @@ def generate_global_functions_for_typechecking():
         'print': Functions([])
     }
     for type_name in ['int', 'float', 'bool', 'str']:
+        t = primitive_type(type_name)
         result['input_' + type_name] = Functions([
-            C_Function(hashed_name='input_' + type_name, param_types=[], return_type=A_Type(PrimitiveType(type_name))),
-            Function(param_names=[], param_types=[], return_type=A_Type(PrimitiveType(type_name))),
-            C_Function(hashed_name='input_' + type_name + '_s', param_types=[C_Type('str_t')], return_type=A_Type(PrimitiveType(type_name))),
-            Function(param_names=[], param_types=[A_Type(PrimitiveType('str'))], return_type=A_Type(PrimitiveType(type_name))),
-        ])
-        result['print'].functions.extend([
-            C_Function(hashed_name='print_' + type_name, param_types=[C_Type(type_name + '_t')], return_type=A_Type(PrimitiveType('none'))),
-            Function(param_names=[], param_types=[A_Type(PrimitiveType(type_name))], return_type=A_Type(PrimitiveType('none'))),
+            C_Function(hashed_name='input_' + type_name, param_types=[], return_type=t),
+            Function(param_names=[], param_types=[], return_type=t),
+            C_Function(hashed_name='input_' + type_name + '_s', param_types=[to_c_type(STR)], return_type=t),
+            Function(param_names=[], param_types=[STR], return_type=t),
         ])
+        result['print'].add(C_Function(hashed_name='print_' + type_name, param_types=[to_c_type(t)], return_type=NONE))
+        result['print'].add(Function(param_names=[], param_types=[t], return_type=NONE))
     return result
 
 
+def generate_builtins_scope():
+    """
+    Build the builtin functions once as a read-only scope that can be shared
+    by many symbol tables. Declarations never modify it, they go to the
+    global scope placed on top of it.
+    """
+    return MappingProxyType(generate_global_functions_for_typechecking())
+
+
+# Used by symbol tables that are not given builtins of their own
+BUILTINS = generate_builtins_scope()
+
+
 class SymbolTable(object):
     """
-    Base symbol table class
+    Base symbol table class. Every name maps to the stack of its entries, the
+    innermost last, each with the depth of the scope that declared it. Each
+    scope logs the names it declared, and popping the scope pops exactly
+    those entries, so a lookup only reads the top of one stack however deep
+    the scopes are nested.
     """
 
-    def __init__(self):
-        self.scope_stack = deepcopy([generate_global_functions_for_typechecking()])
+    def __init__(self, builtins=None):
+        self.entries = {}  # name to a list of (depth, Variable or Functions)
+        self.undo_logs = [[]]  # names declared by each scope above the base scope
+        # Shared read-only builtins below the global scope
+        self.base = BUILTINS if builtins is None else builtins
+        self.depth = 1
+        # scopes at or below this depth are never popped
+        self.global_scope_depth = self.depth
         self.func_call_stack = []
-        random.seed(9)
-        self.random = random.sample(range(1000,9999),1000)
+        self.name_count = 0
+        self.declared_names = set()  # every name declared in any scope, popped or not
+        self.taken_names = frozenset()  # other names create_name must not return
 
     def __repr__(self):
         from pprint import pformat
-        return pformat({ 'Scope': self.scope_stack, 'Function Call': self.func_call_stack })
+        scopes = [dict() for _ in range(self.depth + 1)]
+        scopes[0].update(self.base)
+        for name, stack in self.entries.items():
+            for depth, entry in stack:
+                scopes[depth][name] = entry
+        return pformat({ 'Scope': scopes, 'Function Call': self.func_call_stack })
 
     def push_scope(self):
-        self.scope_stack.append(dict())
+        self.depth += 1
+        self.undo_logs.append([])
 
     def pop_scope(self):
-        assert len(self.scope_stack) > 1
-        self.scope_stack.pop()
+        assert self.depth > self.global_scope_depth
+        for name in self.undo_logs.pop():
+            stack = self.entries[name]
+            stack.pop()
+            if not stack:
+                del self.entries[name]
+        self.depth -= 1
+
+    def add_entry(self, name: str, entry: Union[Variable, Functions]):
+        self.entries.setdefault(name, []).append((self.depth, entry))
+        self.declared_names.add(name)
+        self.undo_logs[-1].append(name)
+
+    def current_entry(self, name: str):
+        """ The entry of 'name' declared in the current scope, or None. """
+        stack = self.entries.get(name)
+        if stack and stack[-1][0] == self.depth:
+            return stack[-1][1]
+        return None
+
+    def declared_in_scope(self, name: str):
+        return self.current_entry(name) is not None
+
+    def visible_entries(self, name: str):
+        """ The entries of 'name' from the innermost scope out, ending with the base scope. """
+        for depth, entry in reversed(self.entries.get(name, ())):
+            yield entry
+        if name in self.base:
+            yield self.base[name]
 
     def create_name(self,name):
-        return name+str(self.random.pop())
+        # The count makes every overload of a function a different C function,
+        # and names declared by the program or taken by the runtime are skipped
+        while True:
+            self.name_count += 1
+            mangled = f"{name}_{self.name_count}"
+            if mangled not in self.declared_names and mangled not in self.taken_names:
+                return mangled
 
     def declare_variable(self, name: str, type: Union[A_Type,C_Type]):
         """
         Add a new variable.
         Need to do duplicate variable declaration error checking.
         """
-        if name in self.scope_stack[-1]:
+        if self.declared_in_scope(name):
             raise ParseError("Redeclaring variable named \"" + name + "\"")
-        self.scope_stack[-1][name] = Variable(type=type)
+        self.add_entry(name, Variable(type=type))
 
     def lookup_variable(self, name: str):
         """
         Return the type of the variable named 'name', or throw
         a ParseError if the variable is not declared in the scope.
         """
-        # You should traverse through the entire scope stack
-        for scope in reversed(self.scope_stack):
-            if name in scope:
-                found = scope[name]
-                assert isinstance(found, Variable), f"When looking for {name}, found function when expecting variable"
-                return found.type
-        raise ParseError("Referencing undefined variable \"" + name + "\"")
+        stack = self.entries.get(name)
+        found = stack[-1][1] if stack else self.base.get(name)
+        if found is None:
+            raise ParseError("Referencing undefined variable \"" + name + "\"")
+        assert isinstance(found, Variable), f"When looking for {name}, found function when expecting variable"
+        return found.type
+
 
+    def copy_builtin_functions(self, name: str):
+        """
+        Copy-on-write for the shared builtins scope. Before the global scope
+        declares an overload of a builtin function, it gets its own copy of
+        the builtin overloads.
+        """
+        if self.declared_in_scope(name) or self.depth != self.global_scope_depth:
+            return
+        for found in self.visible_entries(name):
+            self.add_entry(name, Functions(list(found.functions)))
+            return
 
     def declare_function(self, name: str, params: ParameterLst, return_type: Union[Union[A_Type,C_Type], None]):
+        self.copy_builtin_functions(name)
         param_types = [param.paramType for param in params]
         param_names = [param.var for param in params]
         function_to_be_declared = Function(param_names,param_types, return_type)
-        if name in self.scope_stack[-1]:
-            if isinstance(self.scope_stack[-1][name], Functions):
-                for scope in reversed(self.scope_stack):
-                    if name in scope:
-                        assert isinstance(scope[name], Functions), "Expect function, got probably Variable"
-                        for f in scope[name].functions:
-                            if repr(f.param_types) == repr(param_types) or f.param_names == param_names:
-                                raise ParseError("Re-declaring function with same param types \""+name+"\"")
-                self.scope_stack[-1][name].functions.append(function_to_be_declared)
+        current = self.current_entry(name)
+        if current is not None:
+            if isinstance(current, Functions):
+                for found in self.visible_entries(name):
+                    assert isinstance(found, Functions), "Expect function, got probably Variable"
+                    if found.find(param_types) or found.find_by_param_names(param_names):
+                        raise ParseError("Re-declaring function with same param types \""+name+"\"")
+                current.add(function_to_be_declared)
                 return
             else:
                 raise ParseError("Function \"" + name + "\" is previously declared as variable")
         self.func_call_stack.append(function_to_be_declared.return_type)
-        self.scope_stack[-1][name] = Functions([function_to_be_declared])
+        self.add_entry(name, Functions([function_to_be_declared]))
 
 
     def lookup_function(self, name: str, param_types: List[Union[A_Type,C_Type]]):
-        for scope in reversed(self.scope_stack):
-            if name in scope:
-                assert isinstance(scope[name], Functions), "Expect function, got probably Variable"
-                for f in scope[name].functions:
-                    if repr(f.param_types) == repr(param_types):
-                        return f.return_type
-                print('Failed:', repr(f.param_types), repr(param_types))
+        for found in self.visible_entries(name):
+            assert isinstance(found, Functions), "Expect function, got probably Variable"
+            f = found.find(param_types)
+            if f:
+                return f.return_type
 
         raise ParseError("Referencing undefined function \"" + name + "\"")
 
     def get_func_by_name(self,name:str,param_names:List[str]):
-        for scope in reversed(self.scope_stack):
-            if name in scope:
-                for f in scope[name].functions:
-                    if f.param_names == param_names:
-                        return [f.param_types,f.return_type]
+        for found in self.visible_entries(name):
+            f = found.find_by_param_names(param_names)
+            if f:
+                return [f.param_types,f.return_type]
         raise ParseError("C_Gen: Referencing undefined function \"" + name + "\"")
 
     def declare_C_function(self, name: str, param_types: List[Union[A_Type, C_Type]],
                          return_type: Union[Union[A_Type, C_Type], None]):
+        self.copy_builtin_functions(name)
         hash_name = self.create_name(name)
         function_to_be_declared = C_Function(hash_name,param_types, return_type)
-        if name in self.scope_stack[-1]:
-            self.scope_stack[-1][name].functions.append(function_to_be_declared)
+        current = self.current_entry(name)
+        if current is not None:
+            current.add(function_to_be_declared)
             return hash_name
-        self.scope_stack[-1][name] = Functions([function_to_be_declared])
+        self.add_entry(name, Functions([function_to_be_declared]))
         return hash_name
 
     # return the modified name and return type
     def get_C_function(self, name: str, param_types: List[C_Type]):
-        for scope in reversed(self.scope_stack):
-            if name in scope:
-                for f in scope[name].functions:
-                    if repr(f.param_types) == repr(param_types):
-                        return f.hashed_name, f.return_type
+        for found in self.visible_entries(name):
+            f = found.find(param_types)
+            if f:
+                return f.hashed_name, f.return_type
         raise ParseError("C_Gen: Referencing undefined function \"" + name + "\"")
 
     def update_variable(self, name: str, type: Union[A_Type, C_Type]):
         found = None
-        for scope in reversed(self.scope_stack):
-            if name in scope:
-                found = scope[name]
-                found.type = type
+        for found in self.visible_entries(name):
+            found.type = type
         if not found:
-            self.scope_stack[-1][name] = Variable(type=type)
+            self.add_entry(name, Variable(type=type))
@@ -1,6 +1,6 @@
 import pytest
 import os
-from compiler import read, compiler, execute_program
+from compiler import read, compiler, execute_program, CompilerSession
 
 test_names_compile = [f.replace('.py', '') for f in os.listdir(f'./tests/compile/') if f.endswith('.py')]
 @pytest.mark.parametrize("test_name", test_names_compile)
@@ -14,6 +14,218 @@ def test_compile(test_name):
         ir_tmp=f'{d}/{test_name}_IR.txt',
     )
 
+def test_session_reuse():
+    d = './tests/compile'
+    session = CompilerSession()
+    builtins = {name: list(f.functions) for name, f in session.builtins.items()}
+    for _ in range(2):
+        for test_name in test_names_compile:
+            received = session.compile_source(read(f'{d}/{test_name}.py'), opt_on='03_' in test_name)
+            expected = CompilerSession().compile_source(read(f'{d}/{test_name}.py'), opt_on='03_' in test_name)
+            assert received.code == expected.code, f"Output of {test_name} changed when reusing the session"
+    assert {name: list(f.functions) for name, f in session.builtins.items()} == builtins
+
+def test_overload_index():
+    from AST import Type, PrimitiveType, Parameter, Id
+    from C_AST import Type as C_Type
+    from symbol_table import SymbolTable, ParseError, generate_builtins_scope
+    int_t, float_t = Type(PrimitiveType('int')), Type(PrimitiveType('float'))
+    st = SymbolTable(generate_builtins_scope())
+    st.declare_function('g', [Parameter(int_t, Id('a'))], float_t)
+    st.declare_function('g', [Parameter(float_t, Id('b'))], int_t)
+    # Equal types built separately find the same overload
+    assert st.lookup_function('g', [Type(PrimitiveType('int'))]) == float_t
+    assert st.lookup_function('g', [Type(PrimitiveType('float'))]) == int_t
+    assert st.lookup_function('print', [Type(PrimitiveType('str'))]) == Type(PrimitiveType('none'))
+    assert st.get_C_function('print', [C_Type('float_t')])[0] == 'print_float'
+    assert st.get_func_by_name('g', [Id('b')]) == [[float_t], int_t]
+    with pytest.raises(ParseError):
+        st.declare_function('g', [Parameter(int_t, Id('c'))], int_t)
+    with pytest.raises(ParseError):
+        st.lookup_function('g', [Type(PrimitiveType('str'))])
+    # Mangled names do not run out and do not repeat
+    names = {st.declare_C_function('h', [C_Type('int_t')] * i, None) for i in range(2000)}
+    assert len(names) == 2000 and 'h_1' in names
+
+def test_mangled_names(tmp_path):
+    source = tmp_path / 'program.py'
+    # f_1 is declared after f, and would be the first name given to f
+    source.write_text('def f(a: int) -> int:\n\treturn a + 1\nf_1: int = 5\nprint(f(f_1))\n')
+    paths = dict(c=str(tmp_path / 'program.c'), executable=str(tmp_path / 'program'))
+    result = compiler(input_file=str(source), use_cache=False, **paths)
+    assert 'int_t f_1(' not in result.code
+    assert execute_program(paths['executable']) == (0, '6 \n')
+
+def test_symbol_table_scopes():
+    from symbol_table import SymbolTable, ParseError
+    from type_table import INT, STR
+    st = SymbolTable()
+    st.declare_variable('a', INT)
+    for _ in range(50):
+        st.push_scope()
+    st.declare_variable('a', STR)
+    st.declare_variable('b', STR)
+    assert st.lookup_variable('a') is STR and st.declared_in_scope('a')
+    with pytest.raises(ParseError):
+        st.declare_variable('b', INT)
+    st.pop_scope()
+    # The outer declaration is visible again, and the inner ones are gone
+    assert st.lookup_variable('a') is INT and not st.declared_in_scope('a')
+    with pytest.raises(ParseError):
+        st.lookup_variable('b')
+    for _ in range(49):
+        st.pop_scope()
+    with pytest.raises(AssertionError):
+        st.pop_scope()
+    # The builtins are shared below the global scope
+    assert st.declared_in_scope('a') and not st.declared_in_scope('print')
+    assert st.lookup_function('print', [INT]) is not None
+
+def test_compile_many():
+    from compile_many import collect_inputs, compile_many, main
+    inputs = collect_inputs(['./tests/compile'])
+    assert len(inputs) == len(test_names_compile)
+    outcomes = compile_many(inputs, jobs=2, use_cache=False, report=lambda line: None)
+    assert [outcome.input_file for outcome in outcomes] == inputs
+    for outcome in outcomes:
+        assert outcome.error is None, f"{outcome.input_file}: {outcome.error}"
+        assert 'cc' in outcome.timings
+
+    assert main(['-j', '2', './tests/error/01_*.py', './tests/compile/01_*.py']) == 1
+
+def test_compile_cache(tmp_path, monkeypatch):
+    import compiler as compiler_module
+    from build_cache import CompileCache
+    cache = CompileCache(str(tmp_path / 'cache'))
+    monkeypatch.setattr(compiler_module, 'default_cache', cache)
+
+    source = tmp_path / 'program.py'
+    source.write_text('a: int = 1\nprint(a)\n')
+    paths = dict(c=str(tmp_path / 'program.c'), executable=str(tmp_path / 'program'), ir_tmp=str(tmp_path / 'program_IR.txt'))
+
+    first = compiler(input_file=str(source), **paths)
+    assert not first.cached
+    os.remove(paths['executable'])
+    second = compiler(input_file=str(source), **paths)
+    assert second.cached and second.code == first.code
+    assert execute_program(paths['executable']) == (0, '1 \n')
+    assert not compiler(input_file=str(source), opt_on=True, **paths).cached
+    assert not compiler(input_file=str(source), use_cache=False, **paths).cached
+
+    source.write_text('a: int = 2\nprint(a)\n')
+    assert not compiler(input_file=str(source), **paths).cached
+    assert execute_program(paths['executable']) == (0, '2 \n')
+    assert len(cache.entries()) == 3
+
+    # Using the first entry again leaves the optimized one as least recently used
+    source.write_text('a: int = 1\nprint(a)\n')
+    assert compiler(input_file=str(source), **paths).cached
+    cache.max_bytes = sum(size for _, size, _ in cache.entries()) - 1
+    cache.evict()
+    assert len(cache.entries()) == 2
+    assert compiler(input_file=str(source), **paths).cached
+    assert not compiler(input_file=str(source), opt_on=True, **paths).cached
+
+def test_backend_flags(tmp_path):
+    from backend import BackendConfig
+    source = tmp_path / 'program.py'
+    source.write_text('a: int = 1\nprint(a)\n')
+    paths = dict(c=str(tmp_path / 'program.c'), executable=str(tmp_path / 'program'))
+    assert BackendConfig.for_opt(False).cflags() == ['-O0']
+    assert BackendConfig.for_opt(True).cflags() == ['-O2']
+    result = compiler(input_file=str(source), use_cache=False, backend=BackendConfig(opt_level=3, lto=True), **paths)
+    assert result.backend.endswith('-O3 -flto')
+    assert execute_program(paths['executable']) == (0, '1 \n')
+
+def test_list_reserve(tmp_path):
+    source = tmp_path / 'program.py'
+    source.write_text('c: [int] = []\nfor i in range(100000):\n\tc.append(i)\n\tfor j in range(0, 6, 2):\n\t\tc.append(j)\nprint(c[399999])\n')
+    paths = dict(c=str(tmp_path / 'program.c'), executable=str(tmp_path / 'program'))
+    result = compiler(input_file=str(source), use_cache=False, **paths)
+    assert 'list_reserve(c, 400000);' in result.code
+    assert execute_program(paths['executable']) == (0, '4 \n')
+
+def test_runtime_heap(tmp_path):
+    import subprocess
+    from backend import BackendConfig
+    source = tmp_path / 'program.py'
+    # More live objects than the old fixed allocation table could hold
+    source.write_text('a: [int] = [1, 2, 3, 4]\nfor i in range(1000):\n\tb: [int] = a[1:3]\nprint(a[0])\n')
+    paths = dict(c=str(tmp_path / 'program.c'), executable=str(tmp_path / 'program'))
+    compiler(input_file=str(source), use_cache=False, backend=BackendConfig(heap_stats=True), **paths)
+    proc = subprocess.run([paths['executable']], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert (proc.returncode, proc.stdout) == (0, '1 \n')
+    assert 'heap: 2002 allocations' in proc.stderr
+
+    source.write_text('c: [int] = []\nfor i in range(3000):\n\tc.append(i)\nprint(c[0])\n')
+    compiler(input_file=str(source), use_cache=False, backend=BackendConfig(max_heap=16 * 1024), **paths)
+    returncode, output = execute_program(paths['executable'])
+    assert returncode == 1 and 'Heap limit of 16384 bytes exceeded' in output
+
+def test_free_temporaries(tmp_path):
+    import re
+    import subprocess
+    from backend import BackendConfig
+    peaks = []
+    for n in [10, 1000]:
+        source = tmp_path / 'program.py'
+        source.write_text(f'a: [int] = [1, 2, 3, 4]\ns: str = "abc"\nfor i in range({n}):\n\tt: str = s + "x"\n\tb: [int] = a[1:3]\n\tt = t + "y"\n\tprint(t + "z")\nprint(a[0])\n')
+        paths = dict(c=str(tmp_path / 'program.c'), executable=str(tmp_path / 'program'))
+        compiler(input_file=str(source), use_cache=False, backend=BackendConfig(heap_stats=True), **paths)
+        proc = subprocess.run([paths['executable']], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        assert proc.returncode == 0
+        assert proc.stdout == 'abcxyz \n' * n + '1 \n'
+        peaks.append(int(re.search(r'peak (\d+) bytes', proc.stderr).group(1)))
+    # Memory does not grow with the number of iterations
+    assert peaks[0] == peaks[1]
+
+def test_string_pool(tmp_path):
+    import subprocess
+    from backend import BackendConfig
+    source = tmp_path / 'program.py'
+    source.write_text('s: str = "a;b"\nfor i in range(1000):\n\ts = s + "é"\n\ts = "a;b"\nprint(s + "a;b")\n')
+    paths = dict(c=str(tmp_path / 'program.c'), executable=str(tmp_path / 'program'))
+    result = compiler(input_file=str(source), use_cache=False, backend=BackendConfig(heap_stats=True), **paths)
+    # Equal literals are stored once and assigned without a copy
+    assert result.code.count('"a;b\\0"') == 1 and 'str_init' not in result.code
+    proc = subprocess.run([paths['executable']], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert (proc.returncode, proc.stdout) == (0, 'a;ba;b \n')
+    assert 'heap: 1001 allocations' in proc.stderr
+
+    # The pool does not take a name that programs can use
+    source.write_text('str_pool: str = "hello"\nprint(str_pool)\n')
+    compiler(input_file=str(source), use_cache=False, **paths)
+    assert execute_program(paths['executable']) == (0, 'hello \n')
+
+def test_constant_folding(tmp_path):
+    from constant_folding import fold_binary, fold_unary, to_int, c_literal
+    # Ints follow C, not Python
+    assert fold_binary('int_t', '%', 7, -3) == 1 and fold_binary('int_t', '/', -7, 2) == -3
+    assert fold_binary('int_t', '+', 2 ** 63 - 1, 1) == -2 ** 63 == to_int(2 ** 63)
+    assert fold_binary('int_t', '<', 1, 2) == 1 and fold_binary('float_t', '*', 2, 3) == 6.0
+    assert fold_binary('bool_t', '==', 3, 3) is True and fold_unary('bool_t', '!', True) is False
+    # Left to the program
+    assert fold_binary('int_t', '/', 1, 0) is None and fold_binary('float_t', '*', 1e308, 10.0) is None
+    assert fold_binary('int_t', '+', 'x', 1) is None and fold_unary('int_t', '-', 'x') is None
+    assert c_literal(True) == 'true' and c_literal(-0.5) == '-0.5'
+    assert c_literal(-2 ** 63) == '(-9223372036854775807 - 1)' and c_literal(-2 ** 63 + 1) == '-9223372036854775807'
+
+    source = tmp_path / 'program.py'
+    source.write_text('x: int = 1 == 1\ny: int = 7 % -3\nz: int = -7 / 2\ntotal: int = 0\n'
+                      'for i in range(0, 10):\n\ttotal = total + i * y\n'
+                      'm: int = -9223372036854775807 - 1\ns: str = "ab" + "c" + "d"\n'
+                      'print(x)\nprint(y)\nprint(z)\nprint(total)\nprint(m)\nprint(s)\n')
+    outputs = []
+    for opt_on in (True, False):
+        paths = dict(c=str(tmp_path / f'program_{opt_on}.c'), executable=str(tmp_path / f'program_{opt_on}'))
+        compiler(input_file=str(source), opt_on=opt_on, use_cache=False, **paths)
+        outputs.append(execute_program(paths['executable'], input='')[1])
+    code = read(str(tmp_path / 'program_True.c'))
+    assert 'y = 1;' in code and '(-9223372036854775807 - 1)' in code
+    # The concatenation of literals is a literal
+    assert '"abcd\\0"' in code and 'str_concat' not in code
+    assert outputs[0] == outputs[1] == 'true \n1 \n-3 \n45 \n-9223372036854775808 \nabcd \n'
+
 test_names_error = [f.replace('.py', '') for f in os.listdir(f'./tests/error/') if f.endswith('.py')]
 @pytest.mark.parametrize("test_name", test_names_error)
 def test_error(test_name):
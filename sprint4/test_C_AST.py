@@ -8,10 +8,12 @@ case1 = Block([
 ])
 
 case1_out = """
-#include "../starter.c"
+#include "starter.h"
 
 
 int main() {
+    runtime_init();
+
 /***** Main *****/
 int_t var1;
 var1 = var1 + var2;
@@ -37,10 +39,12 @@ case2 = Block([
 ])
 
 case2_out = """
-#include "../starter.c"
+#include "starter.h"
 
 
 int main() {
+    runtime_init();
+
 /***** Main *****/
 int_t var1;
 var1 = var1 + var1;
@@ -75,7 +79,7 @@ case3 = Block([
 ])
 
 case3_out = """
-#include "../starter.c"
+#include "starter.h"
 
 /***** Function declarations *****/
 int_t func1(int_t arg1, int_t arg2);
@@ -88,6 +92,8 @@ int_t func1(int_t arg1, int_t arg2) {
 /***** End of function definitions *****/
 
 int main() {
+    runtime_init();
+
 /***** Main *****/
 
 /***** End of main *****/
@@ -18,7 +18,9 @@ test_names = [f.replace('_input.py', '') for f in files if f.endswith('_input.py
 
 def format_parser_output(o):
     import json
-    return json.dumps(o, default=lambda x: { 'NODE': x.__class__.__name__, **x.__dict__}, indent=2)
+    from dataclasses import fields
+    # The nodes have slots instead of a __dict__, their fields are in the same order
+    return json.dumps(o, default=lambda x: { 'NODE': x.__class__.__name__, **{f.name: getattr(x, f.name) for f in fields(x)}}, indent=2)
 
 
 @pytest.mark.parametrize("test_name", test_names)
@@ -60,3 +62,91 @@ def test_main_ir_gen(parser, test_name):
                 pass
     else:
         raise AssertionError(f'Missing output file')
+
+
+def test_ir_code_roundtrip(parser, tmp_path):
+    from ir_gen import IRCode
+    for test_name in sorted(test_names):
+        with open(f'./{test_dir}/{test_name}_input.py', 'r') as f:
+            received = parser.parse(f.read())
+        ir_generator = IRGen()
+        ir_generator.generate_IR(received)
+        ir = ir_generator.IR
+        with open(tmp_path / 'program.ir', 'wb') as f:
+            ir.write(f)
+        with open(tmp_path / 'program.ir', 'rb') as f:
+            loaded = IRCode.read(f)
+        assert [repr(i) for i in loaded] == [repr(i) for i in ir], test_name
+
+
+def test_ir_code_size():
+    from ir_gen import IRCode, REG, IR_PrimitiveLiteral, IR_BinaryOperation, IR_Assignment
+    ir = IRCode()
+    for i in range(10000):
+        ir.append(IR_PrimitiveLiteral(reg=f'_t{i}_', val=i % 7))
+        ir.append(IR_BinaryOperation(result_reg=f'_t{i + 1}_', left_reg=f'_t{i}_', right_reg='x', operator='+'))
+        ir.append(IR_Assignment(name='x', val=f'_t{i + 1}_'))
+    size = ir.opcodes.itemsize * len(ir.opcodes) + sum(column.itemsize * len(column) for column in ir.operands)
+    assert size <= 20 * len(ir)
+    # Names and literals are stored once
+    assert ir.strings[0] == ['x', '+'] and ir.constants[0] == list(range(7))
+    assert ir[4] == IR_BinaryOperation(result_reg='_t2_', left_reg='_t1_', right_reg='x', operator='+')
+    assert ir.encode(REG, '_t007_') < 0 and ir.decode(REG, ir.encode(REG, '_t007_')) == '_t007_'
+
+
+def test_ir_cursor():
+    from ir_gen import IRCursor, IR_Label, IR_Goto, IR_ElifStmt, IR_PrimitiveLiteral
+    ir = IRCursor([
+        IR_PrimitiveLiteral(reg='_t1_', val=1),
+        IR_ElifStmt(elif_false=IR_Goto('L_2'), cond_reg='_t1_'),
+        IR_Label('L_2'),
+        IR_Label('L_1'),
+    ])
+    assert len(ir) == 4 and ir.find_label('L_1') == 3 and ir.find_elif() == 1
+    assert ir.popleft() == IR_PrimitiveLiteral(reg='_t1_', val=1)
+    assert ir.find_label('L_1') == 2 and ir.find_elif(-1) == 0 and ir.peek(1) == IR_Label('L_2')
+    ir.popleft()
+    assert ir.find_elif() is None
+    ir.popleft()
+    ir.popleft()
+    assert not ir
+    with pytest.raises(IndexError):
+        ir.popleft()
+
+
+def test_nested_if_labels(parser):
+    from ir_gen import IR_Label, IR_Goto, IR_IfStmt, IR_ElifStmt
+    # The inner if has no else, the elif still belongs to the outer if
+    received = parser.parse('a: int = 3\nif a > 1:\n\tif a > 2:\n\t\ta = 1\nelif a > 0:\n\ta = 2\nelse:\n\ta = 3\n')
+    ir_generator = IRGen()
+    ir = list(ir_generator.generate_IR(received))
+    labels = [i.value for i in ir if isinstance(i, IR_Label)]
+    assert len(labels) == len(set(labels))
+    outer_if = next(i for i in ir if isinstance(i, IR_IfStmt))
+    elif_stmt = next(i for i in ir if isinstance(i, IR_ElifStmt))
+    # The true body of the outer if and the elif body both jump to the end of the outer if
+    outer_end = ir[ir.index(IR_Label(outer_if.if_false.label)) - 1]
+    elif_end = ir[ir.index(IR_Label(elif_stmt.elif_false.label)) - 1]
+    assert isinstance(outer_end, IR_Goto) and outer_end == elif_end
+    assert ir[-1] == IR_Label(outer_end.label)
+
+
+def test_visitor_dispatch(parser):
+    import AST
+    from type_checker import TypeChecker
+
+    class CountingIRGen(IRGen):
+        def gen_PrimitiveLiteral(self, node):
+            self.literals = getattr(self, 'literals', 0) + 1
+            return super().gen_PrimitiveLiteral(node)
+
+    received = parser.parse('a: int = 1 + 2\nprint(a)\n')
+    ir_generator = CountingIRGen()
+    ir_generator.generate_IR(received)
+    # The subclass has a table of its own, with its override
+    assert ir_generator.literals == 2 and IRGen.methods[AST.PrimitiveLiteral] is IRGen.gen_PrimitiveLiteral
+    assert [repr(i) for i in ir_generator.IR] == [repr(i) for i in IRGen().generate_IR(received)]
+    with pytest.raises(AttributeError):
+        IRGen().generate(AST.Type(AST.PrimitiveType('int')))
+    with pytest.raises(Exception, match='Missing function check_Type'):
+        TypeChecker().typecheck(AST.Type(AST.PrimitiveType('int')))
@@ -58,3 +58,68 @@ def test_lex_simple_token(lexer, input_data, expected):
         result = lexer.test(input_data)
         assert len(result) == 1, f"Expect 1, got {len(result)}: {[x.type for x in result]}"
         assert result[0].type == expected, f"Expect {expected}, got {result[0].type}"
+
+def test_tab_count(lexer):
+    lexer.test("a = 1\n\tb = 2\n\t\tc = 3\t\td\n\n\te\n")
+    assert [lexer.getTabCount(line) for line in range(1, 7)] == [0, 1, 2, 0, 1, 0]
+
+def test_blank_and_comment_lines(lexer):
+    result = lexer.test("# comment\n\na = 1 # comment\n\n\t# comment\n  \nb\n# comment")
+    assert [x.type for x in result] == ['ID', 'ASSIGN', 'INTEGER', 'NEWLINE', 'ID', 'NEWLINE']
+    assert result[0].lineno == 3 and result[-2].lineno == 7
+
+def test_leading_spaces():
+    lexer = pythonLexer(strict_indentation=True)
+    lexer.build()
+    lexer.clone().test("a = 1\n  # comment\n\t  b\n")
+    with pytest.raises(Exception, match="Leading spaces detected at line 2"):
+        lexer.clone().test("a = 1\n  b = 2\n")
+    with pytest.raises(Exception, match="Leading spaces detected at line 1"):
+        lexer.clone().test(" a = 1\n")
+
+def test_lexer_table_cache(tmp_path, monkeypatch):
+    from ply import lex
+    first = pythonLexer()
+    first.build(cache_dir=str(tmp_path))
+    assert (tmp_path / 'lextab.py').exists()
+
+    # The rules are not validated again when the table is used
+    monkeypatch.setattr(lex.LexerReflect, 'validate_all', lambda self: pytest.fail('rules validated'))
+    second = pythonLexer()
+    second.build(cache_dir=str(tmp_path))
+    assert second.lexer.lexchars == first.lexer.lexchars
+
+    class ChangedLexer(pythonLexer):
+        t_COLON = r':|;'
+    with pytest.raises(pytest.fail.Exception, match='rules validated'):
+        ChangedLexer().build(cache_dir=str(tmp_path))
+
+def test_dispatch_tables(lexer):
+    import glob
+    # Trying only the rules that can start with each character gives the same
+    # tokens as trying all of them
+    full = pythonLexer()
+    full.build()
+    full.lexer.lexstatedispatch = {}
+    full.lexer.lexstatechars = {}
+    for filename in sorted(glob.glob('tests*/**/*.py', recursive=True)):
+        with open(filename) as f:
+            data = f.read()
+        full_clone = full.clone()
+        assert full_clone.lexer.lexdispatch == {}
+        expected = [(t.type, t.value, t.lineno, t.lexpos) for t in full_clone.test(data)]
+        assert [(t.type, t.value, t.lineno, t.lexpos) for t in lexer.clone().test(data)] == expected, filename
+
+def test_token_stream(lexer):
+    # Clones scan their own input, and the end of the input stays the end
+    first, second = lexer.clone(), lexer.clone()
+    first.input("a = 1\n")
+    second.input("b\n")
+    assert first.lexer.token().value == 'a'
+    assert second.lexer.token().value == 'b'
+    assert first.lexer.token().type == 'ASSIGN'
+    first.lexer.skip(2)
+    assert first.lexer.token().type == 'NEWLINE'
+    assert second.lexer.token().type == 'NEWLINE'
+    assert first.lexer.token() is None
+    assert first.lexer.token() is None
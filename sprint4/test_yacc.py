@@ -16,7 +16,9 @@ test_names = [f.replace('_input.py', '') for f in files if f.endswith('_input.py
 
 def format_parser_output(o):
     import json
-    return json.dumps(o, default=lambda x: { 'NODE': x.__class__.__name__, **x.__dict__}, indent=2)
+    from dataclasses import fields
+    # The nodes have slots instead of a __dict__, their fields are in the same order
+    return json.dumps(o, default=lambda x: { 'NODE': x.__class__.__name__, **{f.name: getattr(x, f.name) for f in fields(x)}}, indent=2)
 
 
 @pytest.mark.parametrize("test_name", test_names)
@@ -49,3 +51,178 @@ def test_main_yacc(parser, test_name):
                 pass
     else:
         raise AssertionError(f'Missing output file')
+
+
+def test_parse_table_cache(tmp_path):
+    from ply.yacc import MiniProduction
+    first = pythonParser()
+    first.build(cache_dir=str(tmp_path))
+    assert (tmp_path / 'parsetab.py').exists()
+    assert not isinstance(first.parser.productions[1], MiniProduction)
+
+    second = pythonParser()
+    second.build(cache_dir=str(tmp_path))
+    assert isinstance(second.parser.productions[1], MiniProduction)
+    assert format_parser_output(second.parse('x: int = 1 + 2\n')) == format_parser_output(first.parse('x: int = 1 + 2\n'))
+
+
+def test_parse_table_cache_rebuilds_on_grammar_change(tmp_path):
+    from ply.yacc import MiniProduction
+    pythonParser().build(cache_dir=str(tmp_path))
+    tables = (tmp_path / 'parsetab.py').read_text()
+
+    class ChangedParser(pythonParser):
+        precedence = pythonParser.precedence[:4] + (('left', 'ASSIGN'),) + pythonParser.precedence[5:]
+
+    changed = ChangedParser()
+    changed.build(cache_dir=str(tmp_path))
+    assert not isinstance(changed.parser.productions[1], MiniProduction)
+    assert (tmp_path / 'parsetab.py').read_text() != tables
+
+
+def test_concurrent_parse():
+    import sys
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    inputs = []
+    for test_name in sorted(test_names):
+        with open(f'./{test_dir}/{test_name}_input.py', 'r') as f:
+            inputs.append(f.read())
+
+    serial_parser = pythonParser()
+    serial_parser.build()
+    expected = [format_parser_output(serial_parser.parse(input_str)) for input_str in inputs]
+
+    local = threading.local()
+    def parse(input_str):
+        if not hasattr(local, 'parser'):
+            local.parser = pythonParser()
+            local.parser.build()
+        return format_parser_output(local.parser.parse(input_str))
+
+    # Switch threads as often as possible to interleave the parses
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            received = list(executor.map(parse, inputs * 10))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert received == expected * 10
+
+
+def test_nested_blocks(parser):
+    input_str = 'def f(a: int) -> int:\n\tfor i in range(a):\n\t\twhile a > 0:\n\t\t\tif a > 1:\n\t\t\t\ta = a - 2\n\t\t\telse:\n\t\t\t\ta = a - 1\n\treturn a\nx: int = f(3)\n'
+    result = parser.parse(input_str)
+    assert [s.__class__.__name__ for s in result] == ['FunctionDef', 'Assignment']
+    function_body = result[0].body.lst
+    assert [s.__class__.__name__ for s in function_body] == ['ForLoopRange', 'ReturnStmt']
+    while_body = function_body[0].body.lst[0].body.lst
+    assert [s.__class__.__name__ for s in while_body] == ['IfStmt', 'ElseStmt']
+    assert len(while_body[0].body.lst) == 1 and len(while_body[1].body.lst) == 1
+
+
+def test_parse_stream(parser):
+    for test_name in sorted(test_names):
+        with open(f'./{test_dir}/{test_name}_input.py', 'r') as f:
+            expected = format_parser_output(parser.parse(f.read()))
+        with open(f'./{test_dir}/{test_name}_input.py', 'r') as f:
+            assert format_parser_output(list(parser.parse_stream(f))) == expected, test_name
+
+
+def test_parse_stream_memory(parser):
+    import tracemalloc
+    from bench_parse import generate_program
+
+    def peak_memory(lines):
+        source = generate_program(lines).splitlines(True)
+        tracemalloc.start()
+        try:
+            for statement in parser.parse_stream(iter(source)):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # The peak stays the same when the program is ten times longer
+    assert peak_memory(5000) < peak_memory(500) * 1.5
+
+
+def test_slotted_nodes(parser):
+    import dataclasses
+    import AST
+
+    def nodes(o):
+        if isinstance(o, list):
+            for x in o:
+                yield from nodes(x)
+        elif dataclasses.is_dataclass(o):
+            yield o
+            for f in dataclasses.fields(o):
+                yield from nodes(getattr(o, f.name))
+
+    for test_name in sorted(test_names):
+        with open(f'./{test_dir}/{test_name}_input.py', 'r') as f:
+            for node in nodes(parser.parse(f.read())):
+                assert not hasattr(node, '__dict__'), node
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        AST.Id(name='a').name = 'b'
+
+
+def test_interned_types(parser):
+    from AST import Type, PrimitiveType, NonPrimitiveType
+    from C_AST import Type as C_Type, NonPrimitiveType as C_NonPrimitiveType
+    from type_table import INT, intern_type, non_primitive_type, to_c_type, to_ast_type
+    a, b = parser.parse('a: [[int]] = [[1]]\nb: [[int]] = [[2]]\n')
+    # Equal types are the same object, down to the element types
+    assert a.type is b.type and a.type.value.value.value.value is INT
+    assert intern_type(Type(NonPrimitiveType('list', Type(NonPrimitiveType('list', Type(PrimitiveType('int'))))))) is a.type
+    assert non_primitive_type('list', INT) is a.type.value.value
+    assert to_c_type(a.type) == C_Type(C_NonPrimitiveType('list', C_Type(C_NonPrimitiveType('list', C_Type('int_t')))))
+    assert to_c_type(INT) is to_c_type(Type(PrimitiveType('int')))
+    assert to_ast_type(C_Type('int_t')) is INT and to_ast_type(to_c_type(a.type)) is a.type
+
+
+def test_interned_types_threads():
+    import sys
+    import threading
+    from type_table import non_primitive_type, to_c_type, to_ast_type, FLOAT
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        element = non_primitive_type('tuple', FLOAT)
+        for _ in range(64):
+            # Every round interns a type no thread has seen yet
+            results = [None] * 8
+            start = threading.Barrier(len(results))
+
+            def intern(i, element=element):
+                start.wait()
+                results[i] = non_primitive_type('list', element)
+
+            threads = [threading.Thread(target=intern, args=(i,)) for i in range(len(results))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert all(t is results[0] for t in results)
+            assert to_ast_type(to_c_type(results[0])) is results[0]
+            element = results[0]
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_parse_keeps_gc_state(parser):
+    import gc
+    # The collector belongs to the host application, parsing leaves it as it is
+    gc.disable()
+    try:
+        parser.parse('a: int = 1\n')
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+    parser.parse('a: int = 1\n')
+    assert gc.isenabled()
@@ -1,4 +1,4 @@
 # Using space for indent
-# Leading spaces detected at line 1
+# Leading spaces detected at line 4
 if True:
     a: int = 1
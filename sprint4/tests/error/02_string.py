@@ -1,3 +1,3 @@
 # Unterminated string
-# Parser Error: Unable to parse at line=1 col=1.
+# Parser Error: Unable to parse at line=3 col=3.
 a: str = "
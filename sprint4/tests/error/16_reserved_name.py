@@ -0,0 +1,4 @@
+# Declaring a name the generated code uses for its string literals
+# Type Checker Error: Name "__str_pool" is reserved by the compiler
+__str_pool: str = "hello"
+print(__str_pool)
@@ -1 +0,0 @@
-../starter.c
\ No newline at end of file
@@ -1,23 +1,32 @@
 import AST
 from AST import Type, PrimitiveType, NonPrimitiveType
+from type_table import primitive_type, non_primitive_type, INT, FLOAT, BOOL
 from symbol_table import SymbolTable, ParseError
 from typing import Union
+from visitor import Visitor
+from C_AST import RESERVED_NAMES
 
-class TypeChecker:
+class TypeChecker(Visitor, prefix='check_'):
 
     def do_typecheck(self,nodes,st=None):
         for node in nodes:
             self.typecheck(node,st)
 
     def typecheck(self, node, st=None) -> Union[Type, None]:
-        method = 'check_' + node.__class__.__name__
-        result_type = getattr(self, method, self.generic_typecheck)(node, st)
+        result_type = self.methods[node.__class__](self, node, st)
         assert isinstance(result_type, AST.Type) or result_type is None, f"Got: {result_type}"
         return result_type
 
     def generic_typecheck(self, node, st=None):
         raise Exception(f"Missing function check_{node.__class__.__name__}. Trying to process {node}")
 
+    default_method = generic_typecheck
+
+    def check_name(self, name):
+        """ Rejects the names of declarations that the generated code needs for itself. """
+        if name in RESERVED_NAMES:
+            raise ParseError(f'Name "{name}" is reserved by the compiler')
+
     def check_FunctionDef(self, node: AST.FunctionDef, st: SymbolTable):
         param_lst = node.lst.lst or []
 
@@ -26,10 +35,12 @@ class TypeChecker:
         else:
             return_type = None
 
+        self.check_name(node.name.name)
         st.declare_function(node.name.name, param_lst, return_type)
         st.func_call_stack.append(return_type)
         st.push_scope()
         for param in param_lst:
+            self.check_name(param.var.name)
             st.declare_variable(param.var.name,param.paramType)
 
         for function_body_statement in node.body.lst:
@@ -78,7 +89,7 @@ class TypeChecker:
                 not (isinstance(t1.value, AST.NonPrimitiveType) and isinstance(t2.value, AST.NonPrimitiveType)):
             raise ParseError(f"Different class type: t1={t1.__class__.__name__} t2={t2.__class__.__name__}")
 
-        if repr(t1.value) != repr(t2.value): # Handles nested types
+        if t1 is not t2: # Types are interned, nested ones too
             if context:
                 raise ParseError(f"Encountered different type while {context}: t1={t1} t2={t2}")
             else:
@@ -92,7 +103,7 @@ class TypeChecker:
                 not (isinstance(t1.value, AST.NonPrimitiveType) and isinstance(t2.value, AST.NonPrimitiveType)):
             raise ParseError(f"Different class type: t1={t1.__class__.__name__} t2={t2.__class__.__name__}")
 
-        if repr(t1.value) != repr(t2.value): # Handles nested types
+        if t1 is not t2:
             raise ParseError(f"Expect {friendly_name} to be {t2}, but got {t1}")
 
     def check_Assignment(self, node: AST.Assignment, st: SymbolTable) -> Type:
@@ -103,9 +114,10 @@ class TypeChecker:
             # Variable does not exist, declare it now, and check RHS type
             variable_type = node.type
             assert variable_type is not None, f"When declaring {node.left.name}, type is missing"
+            self.check_name(variable_name)
             st.declare_variable(variable_name, variable_type)
             rhs_type = self.typecheck(node.right, st)
-            if variable_type != rhs_type:
+            if variable_type is not rhs_type:
                 # TODO: RHS could have None if the list is empty
                 if (isinstance(variable_type.value, NonPrimitiveType) and isinstance(rhs_type.value, NonPrimitiveType)) and variable_type.value.name == rhs_type.value.name:
                     return variable_type
@@ -113,19 +125,18 @@ class TypeChecker:
         else:
             # Variable already exists, check the type of RHS
             rhs_type = self.typecheck(node.right, st)
-            if variable_type != rhs_type:
+            if variable_type is not rhs_type:
                 raise ParseError(f'Assignment type mismatch. RHS should be {variable_type} instead of {rhs_type}.\nProcessing {node}')
 
         return variable_type
 
 
     def check_RangeValues(self, node: AST.RangeValues, st: SymbolTable) -> None:
-        int_type = Type(PrimitiveType('int'))
-        self.assert_expect_type_to_be(self.typecheck(node.start.value, st), int_type, 'range start')
+        self.assert_expect_type_to_be(self.typecheck(node.start.value, st), INT, 'range start')
         if node.stop is not None:
-            self.assert_expect_type_to_be(self.typecheck(node.stop.value, st), int_type, 'range stop')
+            self.assert_expect_type_to_be(self.typecheck(node.stop.value, st), INT, 'range stop')
         if node.step is not None:
-            self.assert_expect_type_to_be(self.typecheck(node.step.value, st), int_type, 'range step')
+            self.assert_expect_type_to_be(self.typecheck(node.step.value, st), INT, 'range step')
         return None
 
 
@@ -135,8 +146,9 @@ class TypeChecker:
         try:
             var_t = st.lookup_variable(node.var.name)
         except Exception:
+            self.check_name(node.var.name)
             st.declare_variable(node.var.name, list_type.value.value)
-        if var_t and var_t != list_type.value.value:
+        if var_t and var_t is not list_type.value.value:
             raise ParseError(f'For loop variant type mismatch. Got {var_t}, list type is {list_type.value.value}.\nProcessing {node}')
         for body_statement in node.body.lst:
             self.typecheck(body_statement, st)
@@ -144,14 +156,15 @@ class TypeChecker:
 
 
     def check_ForLoopRange(self, node: AST.ForLoopRange, st: SymbolTable) -> None:
-        list_type = Type(PrimitiveType('int'))
+        list_type = INT
         st.push_scope()
         var_t = None
         try:
             var_t = st.lookup_variable(node.var.name)
         except Exception:
+            self.check_name(node.var.name)
             st.declare_variable(node.var.name, list_type)
-        if var_t and var_t != list_type:
+        if var_t and var_t is not list_type:
             raise ParseError(f'For loop variant type mismatch. Got {var_t}, list type is {list_type}.\nProcessing {node}')
         for body_statement in node.body.lst:
             self.typecheck(body_statement, st)
@@ -159,7 +172,7 @@ class TypeChecker:
         return None
 
     def check_PrimitiveLiteral(self, node: AST.PrimitiveLiteral, st: SymbolTable) -> Type:
-        return Type(PrimitiveType(node.name))
+        return primitive_type(node.name)
 
     def check_NonPrimitiveLiteral(self, node: AST.NonPrimitiveLiteral, st: SymbolTable) -> Type:
         first_elem_type = None
@@ -176,12 +189,12 @@ class TypeChecker:
                 except ParseError:
                     raise ParseError(f'Mismatched types in list literal, first element is of type {first_elem_type}, {i}-th element is of type {t}')
 
-        return Type(NonPrimitiveType(node.name, first_elem_type))
+        return non_primitive_type(node.name, first_elem_type)
 
     #assert two node values are either int or float type
     def assert_both_numbers(self, left: Type, right:Type) -> Type:
-        int_type = Type(PrimitiveType('int'))
-        float_type = Type(PrimitiveType('float'))
+        int_type = INT
+        float_type = FLOAT
         is_float = False
         try:
             self.assert_same_type(left, int_type)
@@ -224,9 +237,9 @@ class TypeChecker:
                     raise ParseError(f"Type mismatch on Binary Operator left={left} right={right}")
 
     def check_UnaryOperation(self, node: AST.UnaryOperation, st: SymbolTable) -> Type:
-        int_type = Type(PrimitiveType('int'))
-        float_type = Type(PrimitiveType('float'))
-        cond_type = Type(PrimitiveType('bool'))
+        int_type = INT
+        float_type = FLOAT
+        cond_type = BOOL
 
         right = self.typecheck(node.right, st)
 
@@ -279,7 +292,7 @@ class TypeChecker:
         val_type = self.typecheck(node.val,st)
         assert isinstance(obj_type.value,NonPrimitiveType)
         if obj_type.value.name != 'list': raise Exception(f'Cannot use append on type {obj_type.value.name}')
-        assert obj_type.value.value == val_type
+        assert obj_type.value.value is val_type
 
     def check_NonPrimitiveIndex(self,node:AST.NonPrimitiveIndex,st:SymbolTable):
         obj_type = self.typecheck(node.obj,st)
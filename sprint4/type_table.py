@@ -0,0 +1,95 @@
+"""
+Interned types. Every distinct type, including nested ones like list of list
+of int, is built once and shared by the parser, the type checker and the C
+AST generator, so types can be compared with `is`. Each AST type also keeps
+its C type, computed once when the type is first built.
+
+Parsers in different threads intern types at the same time. Lookups do not
+lock, a new type is built outside of the lock and published under it, and the
+first one published is the one every thread gets.
+"""
+
+import threading
+from AST import Type, PrimitiveType, NonPrimitiveType
+import C_AST
+
+PRIMITIVE_NAMES = ['str', 'int', 'float', 'bool', 'none']
+
+# AST types by name, and by (list or tuple, id of the element type)
+_primitive_types = {}
+_non_primitive_types = {}
+# C types by value, the value of a list type is a C_AST.NonPrimitiveType
+_c_types = {}
+# Between the AST and C types, by id of the interned type
+_ast_to_c = {}
+_c_to_ast = {}
+_lock = threading.Lock()  # held while publishing a new type
+
+
+def c_type(value) -> C_AST.Type:
+    """ The interned C type for 'int_t', 'str_t', ... or a C_AST.NonPrimitiveType. """
+    t = _c_types.get(value)
+    if t is None:
+        candidate = C_AST.Type(value)
+        with _lock:
+            t = _c_types.setdefault(value, candidate)
+    return t
+
+
+def c_non_primitive_type(name, element) -> C_AST.Type:
+    return c_type(C_AST.NonPrimitiveType(type=name, value=element))
+
+
+def _add(t: Type, c: C_AST.Type):
+    _ast_to_c[id(t)] = c
+    _c_to_ast.setdefault(id(c), t)
+    return t
+
+
+def primitive_type(name) -> Type:
+    return _primitive_types[name]
+
+
+def non_primitive_type(name, element: Type) -> Type:
+    """ The interned type of a list or tuple of element, which must be interned or None. """
+    key = (name, id(element))
+    t = _non_primitive_types.get(key)
+    if t is None:
+        candidate = Type(NonPrimitiveType(name=name, value=element))
+        # The element of an empty list literal is not known yet
+        c_element = None if element is None else to_c_type(element)
+        c = c_non_primitive_type(name, c_element)
+        with _lock:
+            t = _non_primitive_types.get(key)
+            if t is None:
+                # Mapped to its C type before any other thread can see it
+                t = _non_primitive_types[key] = _add(candidate, c)
+    return t
+
+
+def intern_type(t: Type) -> Type:
+    """ The interned type equal to t, which can be built anywhere. """
+    if id(t) in _ast_to_c:
+        return t
+    if isinstance(t.value, PrimitiveType):
+        return primitive_type(t.value.value)
+    element = t.value.value
+    return non_primitive_type(t.value.name, None if element is None else intern_type(element))
+
+
+def to_c_type(t: Type) -> C_AST.Type:
+    return _ast_to_c[id(intern_type(t))]
+
+
+def to_ast_type(t: C_AST.Type) -> Type:
+    return _c_to_ast[id(c_type(t.value))]
+
+
+for _name in PRIMITIVE_NAMES:
+    _primitive_types[_name] = _add(Type(PrimitiveType(_name)), c_type(_name + '_t'))
+
+INT = primitive_type('int')
+FLOAT = primitive_type('float')
+BOOL = primitive_type('bool')
+STR = primitive_type('str')
+NONE = primitive_type('none')
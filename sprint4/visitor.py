@@ -0,0 +1,39 @@
+"""
+Dispatch of visitor methods by node class. A visitor names its methods after
+the nodes they handle, like check_Assignment or gen_IR_Label. Instead of
+building that name and calling getattr for every node, each visitor class
+keeps a table from node class to method, filled in the first time a node
+class is visited.
+"""
+
+
+class DispatchTable(dict):
+    def __init__(self, visitor_class, prefix, default=None):
+        super().__init__()
+        self.visitor_class = visitor_class
+        self.prefix = prefix
+        self.default = default
+
+    def __missing__(self, node_class):
+        name = self.prefix + node_class.__name__
+        method = getattr(self.visitor_class, name, self.default)
+        if method is None:
+            raise AttributeError(f"'{self.visitor_class.__name__}' has no method '{name}'")
+        self[node_class] = method
+        return method
+
+
+class Visitor:
+    """
+    Base class of the visitors. A subclass passes the prefix of its methods,
+    e.g. `class TypeChecker(Visitor, prefix='check_')`, and visits a node with
+    `self.methods[node.__class__](self, node, ...)`. A subclass of a visitor
+    gets a table of its own, so its methods override the inherited ones.
+    """
+    methods: DispatchTable
+    default_method = None
+
+    def __init_subclass__(cls, prefix=None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        prefix = prefix or cls.methods.prefix
+        cls.methods = DispatchTable(cls, prefix, cls.default_method)
@@ -1,56 +1,67 @@
 from ply import yacc
 from lex import pythonLexer
 from lex import tokens
-from dataclasses import dataclass
+from lex import default_cache_dir
 import argparse
 import AST
-
-
-@dataclass
-class statementNode():
-    lineNo: int
-    tabCount: int
-    astNode: AST.Node
-
-    def __init__(self, lineNo, tabCount, astNode):
-        self.lineNo = lineNo
-        self.tabCount = tabCount
-        self.astNode = astNode
-
-
-lst_stack = []
-tup_stack = []
-
-statementNodeLst = []
-
-final_result = []
-
-
-def statementBodyGenerator():
-    stack = []
-    current_statement_with_body = None  # the statement that is being considered for any child statements
-    expected_tab_count = 0
-    statements_with_body = ["IfStmt", "ElifStmt", "ElseStmt", "WhileStmt", "ForLoopRange", "ForLoopList", "FunctionDef"]
-    for statement in statementNodeLst:
-        if statement.tabCount == expected_tab_count and current_statement_with_body != None:
-            current_statement_with_body.astNode.body.lst.append(statement.astNode)
-        elif statement.tabCount < expected_tab_count:
-            while stack and statement.tabCount <= current_statement_with_body.tabCount:
-                current_statement_with_body = stack.pop()
-            if statement.tabCount > current_statement_with_body.tabCount:
-                expected_tab_count = statement.tabCount
-                current_statement_with_body.astNode.body.lst.append(statement.astNode)
-                stack.append(current_statement_with_body)
-
-        if statement.tabCount == 0:
-            final_result.append(statement.astNode)
-        if statement.astNode.__class__.__name__ in statements_with_body:
-            stack.append(statement)
-            current_statement_with_body = statement
-            if current_statement_with_body.astNode.body == None:
-                current_statement_with_body.astNode.body = AST.Block(lst=[])
-            expected_tab_count += 1
-    return final_result
+from type_table import intern_type
+
+
+class ParseContext():
+    """
+    Everything that changes while parsing one input. A new context is created
+    for every call to pythonParser.parse(), so parses never share state.
+    """
+
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.lst_stack = []
+        self.tup_stack = []
+        self.blocks = BlockBuilder()
+
+
+# Statements whose body is made of the more indented statements that follow them
+STATEMENTS_WITH_BODY = (AST.IfStmt, AST.ElifStmt, AST.ElseStmt, AST.WhileStmt, AST.ForLoopRange, AST.ForLoopList, AST.FunctionDef)
+
+
+# First characters of lines that can not start a top level statement
+STATEMENT_CONTINUATIONS = ('\t', ' ', '\n', '#', '')
+
+
+class BlockBuilder():
+    """
+    The grammar only sees a flat list of statements, their nesting comes from
+    the indentation. The builder receives every statement as soon as the
+    parser reduces it, together with its tab count, and attaches it to the
+    body of the statement it belongs to, so the program is built in a single
+    pass over the statements.
+    """
+
+    def __init__(self):
+        self.result = []  # top level statements
+        self.stack = []  # (tab count, statement) of the statements with an open body
+        self.current = None  # the statement that is being considered for any child statements
+        self.expected_tab_count = 0
+
+    def add(self, tabCount, astNode):
+        if tabCount == self.expected_tab_count and self.current is not None:
+            self.current[1].body.lst.append(astNode)
+        elif tabCount < self.expected_tab_count:
+            while self.stack and tabCount <= self.current[0]:
+                self.current = self.stack.pop()
+            if tabCount > self.current[0]:
+                self.expected_tab_count = tabCount
+                self.current[1].body.lst.append(astNode)
+                self.stack.append(self.current)
+
+        if tabCount == 0:
+            self.result.append(astNode)
+        if isinstance(astNode, STATEMENTS_WITH_BODY):
+            self.current = (tabCount, astNode)
+            self.stack.append(self.current)
+            if astNode.body is None:
+                astNode.body = AST.Block(lst=[])
+            self.expected_tab_count += 1
 
 
 class pythonParser:
@@ -65,6 +76,8 @@ class pythonParser:
 
     start = 'program'
 
+    context = None
+
     def p_program(self, p):
         """program  : block"""
         p[0] = p[1]
@@ -72,10 +85,8 @@ class pythonParser:
     def p_block(self, p):
         """block    : block statement
                      | statement"""
-        if len(p) == 3:
-            p[0] = p[1] + [p[2]]
-        else:
-            p[0] = [p[1]]
+        # The statements are collected by the block builder as they are reduced
+        p[0] = None
 
     def p_expression(self, p):
         """expression : ID
@@ -88,7 +99,7 @@ class pythonParser:
     def p_type(self, p):
         """type     : primitive_type
                     | non_primitive_type"""
-        p[0] = AST.Type(p[1])
+        p[0] = intern_type(AST.Type(p[1]))
 
     def p_primitive_type(self, p):
         """primitive_type   : TINT
@@ -152,7 +163,7 @@ class pythonParser:
         """
         list    : LBRACKET expression
         """
-        global lst_stack
+        lst_stack = self.context.lst_stack
         if not p[2]:
             lst = AST.NonPrimitiveLiteral(name='list', children=[lst_stack[-1].children.pop()])
         else:
@@ -163,7 +174,7 @@ class pythonParser:
         """
         list    : list COMMA expression
         """
-        global lst_stack
+        lst_stack = self.context.lst_stack
         if p[3]:
             lst_stack[-1].children.append(p[3])
 
@@ -171,7 +182,7 @@ class pythonParser:
         """
         expression      : list RBRACKET
         """
-        global lst_stack
+        lst_stack = self.context.lst_stack
         if len(lst_stack) > 1:
             lst_stack[-2].children.append(lst_stack.pop())
         else:
@@ -188,7 +199,7 @@ class pythonParser:
         tuple   : LPAREN expression COMMA expression
         """
         # tuple must have either 0 or more than 1 expression
-        global tup_stack
+        tup_stack = self.context.tup_stack
         if not p[2]:
             tup = AST.NonPrimitiveLiteral(name='tuple', children=[tup_stack[-1].children.pop()])
         else:
@@ -199,7 +210,7 @@ class pythonParser:
         """
         tuple   : tuple COMMA expression
         """
-        global tup_stack
+        tup_stack = self.context.tup_stack
         if p[3]:
             tup_stack[-1].children.append(p[3])
 
@@ -207,7 +218,7 @@ class pythonParser:
         """
         expression      : tuple RPAREN
         """
-        global tup_stack
+        tup_stack = self.context.tup_stack
         if len(tup_stack) > 1:
             tup_stack[-2].children.append(tup_stack.pop())
         else:
@@ -226,11 +237,12 @@ class pythonParser:
                      | expression NEWLINE
         """
         # get current line number
-        lineNo = self.lexer.lexLineNo[0]
-        tabCount = self.lexer.getTabCount(lineNo)
-        statementNodeLst.append(statementNode(lineNo, tabCount, p[1]))
+        lexer = self.context.lexer
+        lineNo = lexer.lexLineNo[0]
+        tabCount = lexer.getTabCount(lineNo)
+        self.context.blocks.add(tabCount, p[1])
         # update current line number
-        self.lexer.lexLineNo[0] = self.lexer.lexLineNo[1]
+        lexer.lexLineNo[0] = lexer.lexLineNo[1]
         p[0] = p[1]
 
     def p_statement_no_new_line(self, p):
@@ -375,21 +387,76 @@ class pythonParser:
         pass
 
     def p_error(self, p):
-        raise Exception(f"Unable to parse at line={self.lexer.lexLineNo[1]} col={self.lexer.lexLineNo[0]}. At token" + str(p))
+        lexer = self.context.lexer
+        raise Exception(f"Unable to parse at line={lexer.lexLineNo[1]} col={lexer.lexLineNo[0]}. At token" + str(p))
 
-    def build(self, **kwargs):
+    def build(self, cache_dir=None, debug=False, strict_indentation=False, **kwargs):
         self.tokens = tokens
-        self.lexer = pythonLexer()
-        self.lexer.build()
-        self.parser = yacc.yacc(module=self, debug=True, **kwargs)
+        self.lexer = pythonLexer(strict_indentation)
+        self.lexer.build(cache_dir)
+        # The LALR tables are written to cache_dir/parsetab.py and reused as long
+        # as the grammar signature (rule docstrings, precedence, tokens) matches
+        self.parser = yacc.yacc(module=self, debug=debug, write_tables=True,
+                                outputdir=cache_dir or default_cache_dir(), **kwargs)
 
     def parse(self, data):
-        statementNodeLst.clear()
-        final_result.clear()
-        result = self.parser.parse(data)
-        statementBodyGenerator()
-        self.lexer.clearTabCount()
-        return final_result
+        lexer = self.lexer.clone()
+        try:
+            return self.parse_with_lexer(data, lexer)
+        finally:
+            # The cloned lexer and its rules refer to each other, breaking the
+            # cycle frees it (and the source) without waiting for a collection
+            lexer.lexer = None
+
+    def parse_stream(self, lines):
+        """
+        Parse a program given as an iterable of lines, usually an open file,
+        and yield its top level statements one at a time. Only one top level
+        statement (with the body nested in it) is kept in memory at once, so
+        the size of the program does not matter.
+        """
+        lexer = self.lexer.clone()
+        try:
+            for first_line, source in top_level_sources(lines):
+                lexer.lexer.lineno = first_line
+                lexer.clearTabCount()
+                yield from self.parse_with_lexer(source, lexer)
+        finally:
+            lexer.lexer = None
+
+    def parse_with_lexer(self, data, lexer):
+        # Each parse gets its own context. The previous context is restored
+        # afterwards in case parse() is called while already parsing.
+        outer_context = self.context
+        self.context = ParseContext(lexer)
+        try:
+            lexer.input(data)
+            self.parser.parse(lexer=lexer.lexer)
+            return self.context.blocks.result
+        finally:
+            self.context = outer_context
+
+
+def top_level_sources(lines):
+    """
+    Group lines into the source of each top level statement, that is a line
+    starting with code followed by all the indented, blank and comment lines
+    after it. Yields (line number of the first line, source) pairs. Iterating
+    a file reads it in buffered chunks, so the whole file is never read.
+    """
+    group = []
+    first_line = 1
+    has_code = False
+    for lineno, line in enumerate(lines, 1):
+        starts_statement = line[:1] not in STATEMENT_CONTINUATIONS
+        if starts_statement and has_code:
+            yield first_line, ''.join(group)
+            group = []
+            first_line = lineno
+        has_code = has_code or starts_statement
+        group.append(line)
+    if group:
+        yield first_line, ''.join(group)
 
 
 if __name__ == "__main__":